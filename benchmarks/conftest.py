@@ -0,0 +1,92 @@
+"""
+Timing for the benchmark suite.
+
+With pytest-benchmark installed the `bench` fixture hands the engines to its
+`benchmark` fixture (all of its options, --benchmark-autosave and
+--benchmark-compare, apply). Without it every engine is timed with
+time.perf_counter (best of --bench-rounds), the timings are written to
+benchmarks/.timings/latest.json and printed after the run. Package imports
+are done before the first engine runs and are not timed.
+
+    python -m pytest benchmarks --bench-save=before
+    ... change an engine ...
+    python -m pytest benchmarks --bench-compare=before
+"""
+
+import json
+import os
+import platform
+import time
+
+import pytest
+
+TIMINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".timings")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("bench", "engine benchmarks")
+    group.addoption("--bench-rounds", type=int, default=1, help="timed runs per engine (best is kept)")
+    group.addoption("--bench-save", default=None, help="also save the timings as .timings/<name>.json")
+    group.addoption("--bench-compare", default=None, help="print speedups against .timings/<name>.json")
+
+
+def pytest_configure(config):
+    config._bench_timings = {}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_imports():
+    """Import the heavy packages once, so no engine is charged with them."""
+    import CoolProp.CoolProp  # noqa: F401
+    import pandas  # noqa: F401
+    import scipy.interpolate  # noqa: F401
+
+
+@pytest.fixture
+def bench(request):
+    """bench(fn) runs fn timed and returns its result."""
+    rounds = request.config.getoption("--bench-rounds")
+    if request.config.pluginmanager.hasplugin("benchmark"):
+        benchmark = request.getfixturevalue("benchmark")
+        return lambda fn: benchmark.pedantic(fn, rounds=rounds, iterations=1)
+
+    def run(fn):
+        best = float("inf")
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+        request.config._bench_timings[request.node.callspec.id] = best
+        return result
+
+    return run
+
+
+def _load(name):
+    path = os.path.join(TIMINGS_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["timings"]
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    timings = config._bench_timings
+    if not timings:
+        return
+    record = {"machine": platform.node(), "python": platform.python_version(),
+              "date": time.strftime("%Y-%m-%d %H:%M:%S"), "timings": timings}
+    os.makedirs(TIMINGS_DIR, exist_ok=True)
+    names = ["latest"] + ([config.getoption("--bench-save")] if config.getoption("--bench-save") else [])
+    for name in names:
+        with open(os.path.join(TIMINGS_DIR, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+
+    compare = config.getoption("--bench-compare")
+    baseline = _load(compare) if compare else None
+    terminalreporter.section("engine timings")
+    for engine, seconds in sorted(timings.items()):
+        line = f"{engine:<22} {seconds:9.3f} s"
+        if baseline and engine in baseline:
+            line += f"   {compare}: {baseline[engine]:9.3f} s   speedup {baseline[engine] / seconds:6.2f}x"
+        terminalreporter.write_line(line)
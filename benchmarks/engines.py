@@ -0,0 +1,284 @@
+"""
+Benchmark Engines
+
+The heavy calculation paths of the repository, each wrapped as a function
+that runs the current code and returns its result as a dict of named numpy
+arrays. The benchmarks time these functions and compare the arrays with the
+golden outputs in benchmarks/golden (written by make_golden.py), so a faster
+engine can be dropped in and shown to give the same numbers.
+
+The golden tank schedule was recorded by executing the simulation cell of
+Tank_Levels_simple.ipynb headless, before it was ported to tank_levels.py;
+the golden headspace output was recorded from reactor_headspace_simulation.py
+when it still ran as a script at import. The goldens of obx_cycle,
+permco2_sizing, phase_diagram_grid and feed_ratio_recipes are recorded from
+the original script, notebook cell or module by make_golden.py (see
+originals.py). Where an engine changes the original's results on purpose,
+expected_deltas gives the expected value from the golden one.
+
+Long time series are stored subsampled (every `stride` step) plus their
+sums over the full length, which keeps the golden files small while any
+change anywhere in the run still shows up.
+
+Required packages:
+pip install numpy pandas CoolProp
+(pint and paebbl for the FeedRatios engine)
+"""
+
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def fingerprint(name, values, stride):
+    """Every stride-th sample of values along axis 0 and the sum over axis 0 (NaN skipped)."""
+    values = np.asarray(values, dtype=float)
+    return {f"{name}": values[::stride], f"{name}_sum": np.nansum(values, axis=0)}
+
+
+# -----------------------------
+# Engines
+# -----------------------------
+def phase_diagram_grid():
+    """
+    The 200 x 200 CoolProp density and enthalpy grid of
+    phase_diagram.generate_property_grid.
+
+    generate_property_grid itself raises with current CoolProp versions
+    (PT inputs below the triple point pressure at low temperature), so the
+    same grid is evaluated with the same PropsSI calls point by point and
+    failed points are NaN, as in co2_property_tables.
+    """
+    import CoolProp.CoolProp as CP
+
+    temperatures = np.linspace(-100 + 273.15, 250 + 273.15, 200)
+    pressures = np.linspace(0.01 * 1e5, 120 * 1e5, 200)
+    T, P = np.meshgrid(temperatures, pressures)
+
+    def props(output, T, P):
+        try:
+            return CP.PropsSI(output, "T", T, "P", P, "CO2")
+        except ValueError:
+            return np.nan
+
+    densities = np.vectorize(props, otypes=[float])("D", T, P)
+    enthalpies = np.vectorize(props, otypes=[float])("H", T, P) / 1000
+    out = {"T": temperatures, "P": pressures}
+    out.update(fingerprint("density", densities, 4))
+    out.update(fingerprint("enthalpy", enthalpies, 4))
+    return out
+
+
+def headspace_run():
+    """reactor_headspace_simulation.simulate: 300 h of N2 / H2 build-up at dt = 1 min."""
+    import reactor_headspace_simulation
+
+    results = reactor_headspace_simulation.simulate()
+    out = {"time_h": results["time_h"][::60]}
+    for name, key in (("vol_pct_N2", "vol_pct_N2"), ("vol_pct_H2", "vol_pct_H2"), ("purge_weights", "purge_weight_kgph")):
+        out.update(fingerprint(name, results[key], 60))
+    return out
+
+
+def headspace_species():
+    """
+    reactor_headspace_simulation.simulate_species: 300 h at dt = 1 min with the
+    Peng-Robinson mixture, the default feed and 20 scenarios of purge and
+    temperature with N2 / O2 / Ar in the CO2 feed, solved together.
+    """
+    import reactor_headspace_simulation
+
+    impurities = {"N2": 0.002, "O2": 0.0005, "Ar": 0.0005}
+    scenarios = [{"CO2_purge_wt_fraction": purge, "temperature_C": T, "feed_impurities": impurities}
+                 for purge, T in zip(np.linspace(0.005, 0.05, 20), np.linspace(150, 200, 20))]
+    out = {}
+    for label, args in (("default", None), ("sweep", scenarios)):
+        results = reactor_headspace_simulation.simulate_species(args)
+        out[f"{label}_species"] = np.array(results["species"])
+        for name in ("vol_pct", "Z", "purge_weight_kgph"):
+            out.update(fingerprint(f"{label}_{name}", results[name], 60))
+    return out
+
+
+def headspace_trajectory():
+    """reactor_headspace_simulation.simulate_trajectory over the default OBX cycle (6 h, dt = 60 s)."""
+    import obx_heat_model
+    import reactor_headspace_simulation
+
+    cycle = obx_heat_model.run()
+    results = reactor_headspace_simulation.simulate_trajectory(cycle)
+    out = {}
+    for name in ("temperature_C", "vol_pct_N2", "vol_pct_H2", "purge_weight_kgph", "CO2_feed_molph", "Vmol_CO2"):
+        out.update(fingerprint(name, results[name], 30))
+    return out
+
+
+def headspace_uq():
+    """headspace_uncertainty.sobol_indices: 2**14 scrambled Sobol base samples (98,304 evaluations, seed 0)."""
+    import headspace_uncertainty
+
+    table = headspace_uncertainty.sobol_indices(2 ** 14, "sobol", 0)
+    peak = headspace_uncertainty.h2_peak(**headspace_uncertainty.sample(2 ** 14, "sobol", 0))
+    return {
+        "first_order": table["first_order"].to_numpy(),
+        "total": table["total"].to_numpy(),
+        "exceedance_probability": np.array(table.attrs["exceedance_probability"]),
+        **fingerprint("vol_pct_H2", peak["vol_pct_H2"], 64),
+        **fingerprint("hours_to_threshold", np.minimum(peak["hours_to_threshold"], 1e9), 64),
+    }
+
+
+def headspace_twin():
+    """headspace_twin.HeadspaceTwin over 12 h of synthetic 1 Hz data (h2_yield 0.008, purge effectiveness 0.8, seed 0)."""
+    import headspace_twin
+
+    twin = headspace_twin.HeadspaceTwin()
+    estimates = twin.run(headspace_twin.synthetic_measurements(12, h2_yield=0.008, purge_effectiveness=0.8), 600)
+    out = {"samples": np.array(twin.samples)}
+    for name in headspace_twin.estimate_columns[1:]:
+        out.update(fingerprint(name, estimates[name].to_numpy(), 6))
+    return out
+
+
+def carbonation_kinetics():
+    """carbonation_kinetics: batch conversion at 150/175/200 °C, reactor rates on a residence time x temperature grid."""
+    import carbonation_kinetics
+
+    batch = carbonation_kinetics.simulate(temperature_C=[150, 175, 200])
+    residence, temperatures = np.linspace(0.25, 6, 24)[:, None], np.linspace(120, 220, 51)[None, :]
+    rates = carbonation_kinetics.reactor_rates(residence, temperatures)
+    out = {name: rates[name] for name in ("forsterite_conversion", "fayalite_conversion", "CO2_needed_molph",
+                                          "H2_feed_molph")}
+    for name in ("forsterite_conversion", "fayalite_conversion", "CO2_mol_per_kg_h", "H2_mol_per_kg_h"):
+        out.update(fingerprint(f"batch_{name}", batch[name].T, 10))
+    return out
+
+
+def obx_cycle():
+    """
+    OBX 6 h heat-up / reaction / cool-down cycle at dt = 60 s as the V2
+    script computes it: obx_heat_model with exchanger_model="limits" and
+    reproduce_script=True.
+    """
+    import obx_heat_model
+
+    results = obx_heat_model.simulate(exchanger_model="limits", reproduce_script=True)
+    columns = obx_heat_model.temperature_columns + obx_heat_model.duty_columns + obx_heat_model.limit_columns
+    return {name: results[name][:, 0] for name in columns}
+
+
+def obx_cycle_ntu():
+    """
+    The same cycle with the e-NTU exchangers and the script's quirks fixed
+    (obx_heat_model defaults). Compared with the V2 script in
+    test_benchmarks.test_obx_ntu_against_script.
+    """
+    import obx_heat_model
+
+    results = obx_heat_model.simulate()
+    columns = obx_heat_model.temperature_columns + obx_heat_model.duty_columns + obx_heat_model.limit_columns
+    return {name: results[name][:, 0] for name in columns + ["status"]}
+
+
+def tank_schedule():
+    """The 48 h tank level schedule of Tank_Levels_simple.ipynb at a 5 min step (tank_levels.py)."""
+    import tank_levels
+
+    results = tank_levels.simulate()
+    start = results["time"][0]
+    triggers = results["triggers"]
+    return {
+        "minutes": np.array([(time - start).total_seconds() / 60 for time in results["time"]]),
+        "level_perc": results["level_perc"],
+        "n_active": np.array([len(active) for active in results["active"]]),
+        "tanks": np.array(tank_levels.tank_names),
+        "trigger_minutes": np.array([(time - start).total_seconds() / 60 for time, _ in triggers]),
+        "trigger_labels": np.array([label for _, label in triggers]),
+    }
+
+
+def feed_ratio_recipes():
+    """The FeedRatios example of feed_ratio.py: mass percentages, slurry density and recipe addition."""
+    from feed_ratio import FeedRatios, units
+
+    r = FeedRatios({additive: 0.0 * units.percent for additive in
+                    ("NaHCO3", "ascorbic_acid", "water", "crap", "fayalite", "forsterite")})
+    old = (5 * units.percent, 0.65 * units.mol / units.litre, 0.01 * units.mol / units.litre,
+           55 * units.percent, 95 * units.percent)
+    new = (35 * units.percent,) + old[1:]
+    ratios = r.calculate_mass_percentages_from_mols_feedrate(*old)
+    density = r.calculate_slurry_density_per_litre(ratios)
+    recipe = r.calculate_recipe_addition(6000 * units.litre / units.hour, 3000 * units.litre / units.hour,
+                                         5000 * units.litre / units.hour, *old, *new)
+    out = {name: np.float64(value.to(units.percent).magnitude) for name, value in ratios.items()}
+    out["slurry_density_kg_per_l"] = np.float64(density.to(units.kilogram / units.litre).magnitude)
+    out.update({f"add_{name}_kg_per_h": np.float64(value.to(units.kilogram / units.hour).magnitude)
+                for name, value in recipe.items()})
+    return out
+
+
+def permco2_sizing():
+    """permco2_sizing.size_coils: the design point and a 10 x 9 flow / subcooling sweep."""
+    import permco2_sizing
+
+    columns = ["duty_kW", "T_CO2_in_C", "T_CO2_out_C", "T_medium_C",
+               "area_bath_m2", "coil_length_bath_m", "area_counter_m2", "coil_length_counter_m"]
+    flows, subcooling = np.meshgrid(np.linspace(60, 240, 10) / 3600, np.linspace(4, 12, 9))
+    out = {}
+    for label, overrides in (("design", {}), ("sweep", {"mass_flow_CO2": flows, "subcooling_target": subcooling})):
+        table = permco2_sizing.size_coils(**overrides)
+        out.update({f"{label}_{name}": table[name].to_numpy(dtype=float) for name in columns})
+        out[f"{label}_exchanger"] = table["exchanger"].to_numpy(dtype=str)
+    return out
+
+
+# -----------------------------
+# Intended changes
+# -----------------------------
+def _bath_lmtd_factor(golden, label):
+    """
+    permco2_sizing sizes the bath coils with the log mean temperature
+    difference of an isothermal-side exchanger, the notebook with the driving
+    force at the CO2 inlet for the whole coil: the area grows by dT_in / LMTD.
+    """
+    T_medium = golden[f"{label}_T_medium_C"]
+    dT_in, dT_out = T_medium - golden[f"{label}_T_CO2_in_C"], T_medium - golden[f"{label}_T_CO2_out_C"]
+    return dT_in * np.log(dT_in / dT_out) / (dT_in - dT_out)
+
+
+# engine: {key: function(golden) -> expected value}, for keys that differ from the original on purpose
+expected_deltas = {
+    "permco2_sizing": {
+        f"{label}_{name}": (lambda golden, label=label, name=name:
+                            golden[f"{label}_{name}"] * _bath_lmtd_factor(golden, label))
+        for label in ("design", "sweep") for name in ("area_bath_m2", "coil_length_bath_m")
+    },
+}
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+# name: (function, packages needed beyond requirements.txt, rtol against golden)
+engines = {
+    "phase_diagram_grid": (phase_diagram_grid, (), 1e-9),
+    "headspace_run": (headspace_run, (), 1e-9),
+    "headspace_species": (headspace_species, (), 1e-9),
+    "headspace_trajectory": (headspace_trajectory, (), 1e-9),
+    "headspace_uq": (headspace_uq, (), 1e-9),
+    "headspace_twin": (headspace_twin, (), 1e-9),
+    "carbonation_kinetics": (carbonation_kinetics, (), 1e-9),
+    "obx_cycle": (obx_cycle, (), 1e-9),
+    "obx_cycle_ntu": (obx_cycle_ntu, (), 1e-9),
+    "tank_schedule": (tank_schedule, (), 1e-12),
+    "feed_ratio_recipes": (feed_ratio_recipes, ("pint", "paebbl"), 1e-12),
+    "permco2_sizing": (permco2_sizing, (), 1e-9),
+}
@@ -0,0 +1,65 @@
+"""
+Write the golden outputs of the benchmark engines.
+
+    python benchmarks/make_golden.py                  # every engine that can run here
+    python benchmarks/make_golden.py obx_cycle ...    # selected engines
+
+Engines listed in originals.references are recorded from the original
+script, notebook cell or module they replace; the others from the engine
+itself, on the code whose results are the reference. Commit
+benchmarks/golden/*.npz; rerun an engine only when a change of its results
+is intended. Engines whose packages are not installed are skipped.
+"""
+
+import argparse
+import importlib.util
+import os
+import time
+
+import numpy as np
+
+from engines import engines
+from originals import references
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+
+def golden_path(name):
+    return os.path.join(GOLDEN_DIR, f"{name}.npz")
+
+
+def missing_packages(name, record=False):
+    """Packages of an engine (and of its original, when recording) that are not installed."""
+    packages = engines[name][1] + (references[name][1] if record and name in references else ())
+    return [package for package in dict.fromkeys(packages) if importlib.util.find_spec(package) is None]
+
+
+def write_golden(name):
+    """Run the original of one engine, or the engine, and save its arrays; returns the elapsed seconds."""
+    start = time.perf_counter()
+    result = references[name][0]() if name in references else engines[name][0]()
+    elapsed = time.perf_counter() - start
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    np.savez_compressed(golden_path(name), **result)
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help=f"engines (default all): {', '.join(engines)}")
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(engines)
+    if unknown:
+        parser.error(f"Unknown engines: {sorted(unknown)}")
+    for name in args.names or engines:
+        missing = missing_packages(name, record=True)
+        if missing:
+            print(f"{name:<22} skipped, not installed: {', '.join(missing)}")
+            continue
+        elapsed = write_golden(name)
+        source = "original" if name in references else "engine"
+        print(f"{name:<22} {elapsed:8.2f} s ({source}) -> {os.path.relpath(golden_path(name))}")
+
+
+if __name__ == "__main__":
+    main()
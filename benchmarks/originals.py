@@ -0,0 +1,158 @@
+"""
+Original Reference Runs
+
+The original scripts and notebook cells that the engines replace, executed
+headless, with their results in the layout of the engine of the same name in
+engines.py. make_golden.py records the golden output of these engines from
+the original run instead of from the engine, so the engines are checked
+against the code they replace rather than against themselves.
+
+- obx_cycle: "OBX heating/OBX heat up and down simulation V2.py" run as a
+  script; the HTML page is not written.
+- permco2_sizing: the permanent skid parameter cell and the calculation cell
+  of PermCO2system.ipynb, at the design point and at every point of the
+  sweep (the cell's mass_flow_CO2 and subcooling_target lines replaced).
+- phase_diagram_grid: phase_diagram.generate_property_grid, with the PropsSI
+  calls that current CoolProp versions reject (below the triple point
+  pressure in the solid region) returning NaN instead of raising.
+- feed_ratio_recipes: the __main__ example of feed_ratio.py.
+
+Print output of the originals is discarded.
+
+Required packages:
+pip install numpy pandas plotly CoolProp
+(pint and paebbl for feed_ratio.py)
+"""
+
+import contextlib
+import io
+import json
+import os
+import re
+import runpy
+from unittest import mock
+
+import numpy as np
+
+from engines import ROOT, fingerprint
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _run_quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _notebook_cells(path):
+    with open(path, encoding="utf-8") as f:
+        cells = json.load(f)["cells"]
+    return ["".join(cell["source"]) for cell in cells]
+
+
+# -----------------------------
+# References
+# -----------------------------
+def obx_cycle():
+    """The V2 script's results table, limits as heat_exchanger codes (obx_cycle engine layout)."""
+    import obx_heat_model
+    from heat_exchanger import limit_names
+
+    path = os.path.join(ROOT, "OBX heating", "OBX heat up and down simulation V2.py")
+    with mock.patch("plotly.io.write_html"):
+        df = _run_quiet(runpy.run_path, path, run_name="__main__")["df"]
+    out = {name: df[name].to_numpy(dtype=float)
+           for name in obx_heat_model.temperature_columns + obx_heat_model.duty_columns}
+    codes = {label: code for code, label in limit_names.items()}
+    out.update({name: df[name].map(codes).to_numpy(dtype=np.int8) for name in obx_heat_model.limit_columns})
+    return out
+
+
+def _permco2_cell(cells, mass_flow_CO2, subcooling_target):
+    """Run the parameter cell (with these two inputs) and the calculation cell; rows per exchanger."""
+    import math
+
+    import CoolProp.CoolProp as CP
+    import pandas as pd
+
+    params = re.sub(r"^mass_flow_CO2 = .*$", f"mass_flow_CO2 = {mass_flow_CO2!r}", cells[2], flags=re.M)
+    params = re.sub(r"^subcooling_target = .*$", f"subcooling_target = {subcooling_target!r}", params,
+                    flags=re.M)
+    # The imports of the first cell (tabulate and the pip install are not used by these cells)
+    ns = {"np": np, "PropsSI": CP.PropsSI, "CP": CP, "math": math, "pd": pd}
+    _run_quiet(exec, params, ns)
+    _run_quiet(exec, cells[3], ns)
+    rows = {}
+    for name, T_in, T_out, T_medium in (
+            ("chiller", "temp_CO2_sat", "temp_CO2_chiller", "temp_glycol_chiller"),
+            ("heater1", "temp_CO2_chiller", "temp_CO2_heater1", "temp_water_heater1"),
+            ("heater2", "temp_CO2_transport", "temp_CO2_heater2", "temp_water_heater2")):
+        bath, counter = ns[f"coil_length_{name}_bath"], ns[f"coil_length_{name}_counter"]
+        rows[name] = {
+            "duty_kW": ns[f"Q_{name}_actual"] / 1000,
+            "T_CO2_in_C": ns[T_in] - 273.15,
+            "T_CO2_out_C": ns[T_out] - 273.15,
+            "T_medium_C": ns[T_medium] - 273.15,
+            "area_bath_m2": bath * np.pi * ns["coil_diameter"],
+            "coil_length_bath_m": bath,
+            "area_counter_m2": counter * np.pi * ns["coil_diameter"],
+            "coil_length_counter_m": counter,
+        }
+    return rows
+
+
+def permco2_sizing():
+    """The notebook's duties, temperatures and coil sizes (permco2_sizing engine layout)."""
+    cells = _notebook_cells(os.path.join(ROOT, "PermCO2system.ipynb"))
+    flows, subcooling = np.meshgrid(np.linspace(60, 240, 10) / 3600, np.linspace(4, 12, 9))
+    out = {}
+    for label, points in (("design", [(120 / 3600, 8)]), ("sweep", zip(flows.ravel(), subcooling.ravel()))):
+        # Rows in the order of size_coils: by case, then exchanger name
+        rows = [row for flow, sub in points for _, row in sorted(_permco2_cell(cells, flow, sub).items())]
+        for name in rows[0]:
+            out[f"{label}_{name}"] = np.array([row[name] for row in rows], dtype=float)
+        out[f"{label}_exchanger"] = np.array(["chiller", "heater1", "heater2"] * (len(rows) // 3))
+    return out
+
+
+def phase_diagram_grid():
+    """phase_diagram.generate_property_grid, failed points NaN."""
+    import CoolProp.CoolProp as CP
+
+    import phase_diagram
+
+    props_si = CP.PropsSI
+
+    def props(*args):
+        try:
+            return props_si(*args)
+        except ValueError:
+            return np.nan
+
+    with mock.patch.object(CP, "PropsSI", props):
+        T, P, densities, enthalpies = phase_diagram.generate_property_grid()
+    out = {"T": T[0], "P": P[:, 0]}
+    out.update(fingerprint("density", densities, 4))
+    out.update(fingerprint("enthalpy", enthalpies, 4))
+    return out
+
+
+def feed_ratio_recipes():
+    """The example of feed_ratio.py run as a script (feed_ratio_recipes engine layout)."""
+    ns = _run_quiet(runpy.run_path, os.path.join(ROOT, "feed_ratio.py"), run_name="__main__")
+    units = ns["units"]
+    out = {name: np.float64(value.to(units.percent).magnitude) for name, value in ns["out"].items()}
+    out["slurry_density_kg_per_l"] = np.float64(ns["slurry_density"].to(units.kilogram / units.litre).magnitude)
+    out.update({f"add_{name}_kg_per_h": np.float64(value.to(units.kilogram / units.hour).magnitude)
+                for name, value in ns["recipe_addition"].items()})
+    return out
+
+
+# engine name: (function recording its golden output from the original code, packages the original needs)
+references = {
+    "obx_cycle": (obx_cycle, ("plotly",)),
+    "permco2_sizing": (permco2_sizing, ()),
+    "phase_diagram_grid": (phase_diagram_grid, ()),
+    "feed_ratio_recipes": (feed_ratio_recipes, ("pint", "paebbl")),
+}
@@ -0,0 +1,47 @@
+"""
+Import cost of the calculation modules for compute-only use (batch workers).
+
+Each module is imported in a fresh interpreter after numpy (which every
+worker needs anyway). The import must not pull in pandas, scipy, matplotlib,
+plotly or CoolProp, which the modules import when a table, fit, plot or
+property call needs them, and must stay within import_budget_ms.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+import_budget_ms = 100
+heavy_packages = ("pandas", "scipy", "matplotlib", "plotly", "CoolProp")
+compute_modules = [
+    "carbonation_kinetics", "co2_property_tables", "co2_saturation", "co2_solubility", "headspace_twin",
+    "headspace_uncertainty", "heat_exchanger", "milling_cost_optimizer", "milling_kinetics", "model_cli",
+    "obx_controller", "obx_cycle_planner", "obx_heat_model", "obx_instrumentation", "obx_scenarios",
+    "peng_robinson", "permco2_sizing", "phase_diagram", "plot_decimation", "psd_fitting", "pump_cooldown",
+    "reactor_headspace_simulation", "result_store", "tank_levels", "telca_energy_model", "vessel_cooldown",
+]
+
+PROBE = """
+import json, sys, time
+import numpy
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "heavy": [p for p in {heavy!r} if p in sys.modules]}}))
+"""
+
+
+@pytest.mark.parametrize("module", compute_modules)
+def test_import_time(module):
+    probe = PROBE.format(module=module, heavy=heavy_packages)
+    # Best of three cold starts, so a busy machine does not fail the budget
+    runs = [json.loads(subprocess.run([sys.executable, "-c", probe], cwd=ROOT, check=True,
+                                      capture_output=True, text=True).stdout.splitlines()[-1])
+            for _ in range(3)]
+    assert runs[0]["heavy"] == [], f"{module} imports {runs[0]['heavy']} at import time"
+    assert min(run["ms"] for run in runs) < import_budget_ms
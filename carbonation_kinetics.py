@@ -0,0 +1,322 @@
+"""
+Carbonation Kinetics over a Particle Size Distribution
+
+Conversion of forsterite and fayalite in the carbonation reactor from a
+shrinking-core model, integrated over the particle size distribution,
+instead of the fixed forsterite_conversion / fayalite_conversion of
+reactor_headspace_simulation.py and the single-size k ∝ 1/d of
+milling_kinetics.py.
+
+PSD: a log-normal distribution (by volume, i.e. mass) through the D10 / D50 /
+D90 of a milling test (D50 is the median, D10 and D90 set the spread),
+discretized into log-spaced size bins; psd_fitting.py fits the same
+quantiles over milling time.
+
+Shrinking core with surface reaction and product-layer diffusion in series
+(Levenspiel): the time to reach conversion X in a particle of diameter d is
+
+    t = tau_r [1 - (1 - X)**(1/3)] + tau_d [1 - 3 (1 - X)**(2/3) + 2 (1 - X)]
+    tau_r = tau_r,ref (d / d_ref) exp(Ea_r / R (1/T - 1/T_ref))
+    tau_d = tau_d,ref (d / d_ref)**2 exp(Ea_d / R (1/T - 1/T_ref))
+
+so the reaction-controlled rate scales with 1/d as in milling_kinetics.
+t(X) is inverted by a bracketed Newton on xi = (1 - X)**(1/3) for all
+(temperature, time, bin) points at once. The time constants below are
+example values: with the Sweco test PSD at 175 °C and 2 h residence time
+they give the headspace model's fixed conversions (0.98 and 0.33).
+
+A continuous reactor sees the conversion after the residence time (plug
+flow) or averaged over the residence time distribution (CSTR, Gauss-Laguerre
+quadrature); reactor_rates() turns that into the CO2 consumption and H2
+generation of the headspace model's feed balance for any grid of residence
+times and temperatures.
+
+    results = simulate(temperature_C=[150, 175, 200])            # batch conversion vs time
+    reactor_rates(residence_time_h=np.linspace(0.5, 4, 8)[:, None], temperature_C=[150, 175, 200])
+    reactor_headspace_simulation.simulate(**headspace_conversions())
+
+Units: µm, °C, h; rates in mol/h (continuous) or mol/(kg mineral h) (batch).
+
+Required packages:
+pip install numpy (pandas for the result table, coolprop for the CO2 solubility in reactor_rates)
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+import reactor_headspace_simulation as headspace
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+R = 8.314  # J/(mol K)
+
+config = {
+    # PSD by volume [µm]: Sweco AFS120 test, 60 min
+    "D10_um": 1.311,
+    "D50_um": 8.09,
+    "D90_um": 23.38,
+    "bins": 40,
+    "temperature_C": 175,
+    "batch_time_h": 6,
+    "time_points": 361,
+    "residence_time_h": 2.0,  # continuous reactor: reactor_rates, headspace_conversions
+    "reactor": "plug",  # residence time distribution: "plug" or "cstr"
+    # Time to full conversion of a d_ref particle at T_ref by reaction / product-layer diffusion alone [h]
+    "T_ref_C": 180,
+    "d_ref_um": 20,
+    "forsterite_tau_reaction_h": 0.58,
+    "forsterite_tau_diffusion_h": 0.29,
+    "fayalite_tau_reaction_h": 27.0,
+    "fayalite_tau_diffusion_h": 180.0,  # iron-rich product layer passivates the fayalite
+    "Ea_reaction": 82.6e3,  # J/mol, as milling_kinetics
+    "Ea_diffusion": 50e3,  # J/mol
+    "cstr_nodes": 40,  # Gauss-Laguerre nodes for reactor = "cstr"
+}
+
+minerals = ("forsterite", "fayalite")
+CO2_per_mineral = 2  # Mg2SiO4 / Fe2SiO4 + 2 CO2, as in the headspace feed balance
+
+
+def resolve(**overrides):
+    """config with overrides."""
+    unknown = set(overrides) - set(config)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {sorted(unknown)}")
+    c = dict(config)
+    c.update(overrides)
+    return c
+
+
+def _split(overrides):
+    """Overrides of this config and of the headspace config (which rejects unknown keys)."""
+    own = {k: v for k, v in overrides.items() if k in config}
+    return resolve(**own), headspace.resolve(**{k: v for k, v in overrides.items() if k not in config})
+
+
+# -----------------------------
+# Particle Size Distribution
+# -----------------------------
+def psd_bins(D10, D50, D90, bins=None):
+    """
+    Log-normal PSD through D10 / D50 / D90 in log-spaced bins from its 0.1 to
+    99.9 % quantiles (the tails are added to the end bins).
+
+    Returns:
+    --------
+    d_um (bins,) geometric bin centres and mass_fraction (bins,) summing to 1.
+    """
+    bins = bins or config["bins"]
+    if not 0 < D10 < D50 < D90:
+        raise ValueError(f"Need 0 < D10 < D50 < D90, got {D10}, {D50}, {D90}")
+    normal = NormalDist()
+    sigma = math.log(D90 / D10) / (2 * normal.inv_cdf(0.9))
+    z = np.linspace(normal.inv_cdf(0.001), normal.inv_cdf(0.999), bins + 1)
+    edges = D50 * np.exp(sigma * z)
+    cdf = np.array([normal.cdf(v) for v in z])
+    cdf[0], cdf[-1] = 0.0, 1.0
+    return np.sqrt(edges[:-1] * edges[1:]), np.diff(cdf)
+
+
+# -----------------------------
+# Shrinking Core
+# -----------------------------
+def time_constants(mineral, T_C, d_um, c=None):
+    """tau_r and tau_d [h] of a mineral at temperatures T_C and diameters d_um (broadcast)."""
+    c = c or config
+    if mineral not in minerals:
+        raise KeyError(f"Unknown mineral: {mineral} (known: {list(minerals)})")
+    inv_T = 1 / (np.asarray(T_C, dtype=float) + 273.15) - 1 / (c["T_ref_C"] + 273.15)
+    size = np.asarray(d_um, dtype=float) / c["d_ref_um"]
+    tau_r = c[f"{mineral}_tau_reaction_h"] * size * np.exp(c["Ea_reaction"] / R * inv_T)
+    tau_d = c[f"{mineral}_tau_diffusion_h"] * size ** 2 * np.exp(c["Ea_diffusion"] / R * inv_T)
+    return tau_r, tau_d
+
+
+def shrinking_core(t_h, tau_r, tau_d):
+    """
+    Conversion X and its rate dX/dt [1/h] after t_h hours for particles with
+    time constants tau_r, tau_d (all broadcast against each other).
+    """
+    t, tau_r, tau_d = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (t_h, tau_r, tau_d)))
+    # Only the particles not yet fully converted (t < tau_r + tau_d) need solving
+    xi = np.zeros(t.shape)
+    active = t < tau_r + tau_d
+    t_a, r, d = t[active], tau_r[active], tau_d[active]
+    # t(xi) = tau_r (1 - xi) + tau_d (1 - 3 xi**2 + 2 xi**3) falls from tau_r + tau_d at xi = 0 to 0 at xi = 1
+    lo, hi = np.zeros(t_a.shape), np.ones(t_a.shape)
+    x = 1 - t_a / (r + d)
+    for _ in range(60):
+        f = r * (1 - x) + d * (1 - 3 * x ** 2 + 2 * x ** 3) - t_a
+        lo = np.where(f > 0, x, lo)
+        hi = np.where(f > 0, hi, x)
+        new = x + f / (r + 6 * d * x * (1 - x))
+        new = np.where((new >= lo) & (new <= hi), new, (lo + hi) / 2)
+        change = np.max(np.abs(new - x), initial=0.0)
+        x = new
+        if change < 1e-13:
+            break
+    xi[active] = x
+    rate = np.divide(3 * xi ** 2, tau_r + 6 * tau_d * xi * (1 - xi), out=np.zeros(t.shape),
+                     where=xi > 0)
+    return 1 - xi ** 3, rate
+
+
+def _psd_conversion(mineral, t_h, T_C, d_um, mass_fraction, c):
+    """Mass-weighted X and dX/dt over the bins; t_h and T_C broadcast, bins on a new last axis."""
+    tau_r, tau_d = time_constants(mineral, np.asarray(T_C, dtype=float)[..., None], d_um, c)
+    X, rate = shrinking_core(np.asarray(t_h, dtype=float)[..., None], tau_r, tau_d)
+    return X @ mass_fraction, rate @ mass_fraction
+
+
+# -----------------------------
+# Batch and Continuous Reactor
+# -----------------------------
+def simulate(time_h=None, temperature_C=None, **overrides):
+    """
+    Batch conversion of every mineral over time, at one or more temperatures.
+
+    Parameters:
+    -----------
+    time_h : array, optional
+        Times [h], default time_points from 0 to batch_time_h.
+    temperature_C : float or array, optional
+        Temperatures [°C], default config temperature_C.
+    overrides :
+        Keys of config, and of reactor_headspace_simulation.config for the
+        mineral composition and H2 yield.
+
+    Returns:
+    --------
+    dict with time_h (n_t,), temperature_C (n_T,), d_um and mass_fraction
+    (bins,), "<mineral>_conversion" and "<mineral>_rate_per_h" (n_T, n_t),
+    and CO2_mol_per_kg_h and H2_mol_per_kg_h (n_T, n_t): CO2 taken up and H2
+    generated per kg of mineral charged.
+    """
+    c, h = _split(overrides)
+    t = np.linspace(0, c["batch_time_h"], c["time_points"]) if time_h is None else np.asarray(time_h, float)
+    T = np.atleast_1d(np.asarray(c["temperature_C"] if temperature_C is None else temperature_C, dtype=float))
+    d_um, mass_fraction = psd_bins(c["D10_um"], c["D50_um"], c["D90_um"], c["bins"])
+
+    out = {"time_h": t, "temperature_C": T, "d_um": d_um, "mass_fraction": mass_fraction}
+    for mineral in minerals:
+        X, rate = _psd_conversion(mineral, t[None, :], T[:, None], d_um, mass_fraction, c)
+        out[f"{mineral}_conversion"], out[f"{mineral}_rate_per_h"] = X, rate
+    mol_per_kg = {m: 1000 * h[f"{m}_frac"] / h[f"{m}_M"] for m in minerals}
+    out["CO2_mol_per_kg_h"] = CO2_per_mineral * sum(mol_per_kg[m] * out[f"{m}_rate_per_h"] for m in minerals)
+    out["H2_mol_per_kg_h"] = mol_per_kg["fayalite"] * out["fayalite_rate_per_h"] * h["h2_yield_per_fayalite"]
+    return out
+
+
+def residence_conversion(residence_time_h=None, temperature_C=None, **overrides):
+    """
+    Conversion of every mineral leaving a continuous reactor (config reactor:
+    plug flow or CSTR) for residence times and temperatures (broadcast).
+
+    Returns a dict {mineral: array}.
+    """
+    c, _ = _split(overrides)
+    tau, T = np.broadcast_arrays(
+        np.asarray(c["residence_time_h"] if residence_time_h is None else residence_time_h, dtype=float),
+        np.asarray(c["temperature_C"] if temperature_C is None else temperature_C, dtype=float))
+    d_um, mass_fraction = psd_bins(c["D10_um"], c["D50_um"], c["D90_um"], c["bins"])
+    if c["reactor"] == "plug":
+        return {m: _psd_conversion(m, tau, T, d_um, mass_fraction, c)[0] for m in minerals}
+    if c["reactor"] == "cstr":
+        # Mean over E(t) = exp(-t/tau)/tau: sum_i w_i X(tau * x_i) with Gauss-Laguerre nodes x_i
+        x, w = np.polynomial.laguerre.laggauss(c["cstr_nodes"])
+        return {m: _psd_conversion(m, tau[..., None] * x, T[..., None], d_um, mass_fraction, c)[0] @ w
+                for m in minerals}
+    raise ValueError(f"Unknown reactor: {c['reactor']} (use 'plug' or 'cstr')")
+
+
+def headspace_conversions(**overrides):
+    """forsterite_conversion and fayalite_conversion for reactor_headspace_simulation at the configured point."""
+    conversion = residence_conversion(**overrides)
+    return {f"{m}_conversion": float(conversion[m]) for m in minerals}
+
+
+def reactor_rates(residence_time_h=None, temperature_C=None, **overrides):
+    """
+    CO2 consumption and H2 generation of the continuous reactor with the
+    kinetic conversions, for residence times and temperatures (broadcast;
+    e.g. a column of residence times against a row of temperatures).
+
+    The headspace model's feed balance with the conversions from
+    residence_conversion() and, unless CO2_solubility_kg_per_100L is fixed,
+    the CO2 solubility at each temperature (co2_solubility table, at the
+    headspace pressure_bar).
+
+    Returns:
+    --------
+    dict with residence_time_h, temperature_C, forsterite_conversion,
+    fayalite_conversion and the feed_balance() entries (CO2_needed_molph is
+    the CO2 consumed by the reaction, H2_feed_molph the H2 generated).
+    """
+    c, h = _split(overrides)
+    tau, T = np.broadcast_arrays(
+        np.asarray(c["residence_time_h"] if residence_time_h is None else residence_time_h, dtype=float),
+        np.asarray(c["temperature_C"] if temperature_C is None else temperature_C, dtype=float))
+    conversion = residence_conversion(tau, T, **{k: v for k, v in overrides.items() if k in config})
+    h.update({f"{m}_conversion": conversion[m] for m in minerals})
+    if h["CO2_solubility_kg_per_100L"] is None:
+        from co2_solubility import solubility_kg_per_100L
+
+        h["CO2_solubility_kg_per_100L"] = solubility_kg_per_100L(T, h["pressure_bar"], h["salinity_molal"])
+    return {"residence_time_h": tau, "temperature_C": T, **{f"{m}_conversion": conversion[m] for m in minerals},
+            **headspace.feed_balance(h)}
+
+
+def to_dataframe(results, temperature=0):
+    """One temperature of simulate(): Time (h), conversion and rate per mineral, CO2 and H2 per kg."""
+    import pandas as pd
+
+    df = pd.DataFrame({"Time (h)": results["time_h"]})
+    for mineral in minerals:
+        df[f"{mineral} conversion"] = results[f"{mineral}_conversion"][temperature]
+        df[f"{mineral} rate (1/h)"] = results[f"{mineral}_rate_per_h"][temperature]
+    df["CO2 (mol/kg/h)"] = results["CO2_mol_per_kg_h"][temperature]
+    df["H2 (mol/kg/h)"] = results["H2_mol_per_kg_h"][temperature]
+    df.attrs["temperature_C"] = float(results["temperature_C"][temperature])
+    return df
+
+
+def run(**overrides):
+    """Batch conversion at the configured temperature as a table."""
+    return to_dataframe(simulate(**overrides))
+
+
+def main(argv=None):
+    """Command line entry point (carbonation): batch conversion vs time with --set overrides."""
+    import model_cli
+
+    return model_cli.run(run, "Shrinking-core carbonation of the milled mineral over its PSD", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    d_um, mass_fraction = psd_bins(config["D10_um"], config["D50_um"], config["D90_um"])
+    print(f"PSD: {len(d_um)} bins, {d_um[0]:.2f}..{d_um[-1]:.1f} µm")
+    print(f"Conversions at {config['residence_time_h']} h, {config['temperature_C']} °C: "
+          f"{headspace_conversions()} "
+          f"(headspace config: forsterite {headspace.config['forsterite_conversion']}, "
+          f"fayalite {headspace.config['fayalite_conversion']})")
+
+    results = simulate(temperature_C=[150, 175, 200])
+    table = to_dataframe(results, 1)
+    print(table.iloc[::60].round(4).to_string(index=False))
+
+    # Sweep: residence time x temperature, with the CO2 solubility at each temperature
+    residence = np.linspace(0.25, 6, 24)[:, None]
+    temperatures = np.linspace(120, 220, 51)[None, :]
+    reactor_rates(residence, temperatures)
+    start = time.perf_counter()
+    rates = reactor_rates(residence, temperatures)
+    elapsed = time.perf_counter() - start
+    print(f"\n{residence.size * temperatures.size} operating points in {elapsed * 1000:.0f} ms; "
+          f"at 175 °C: CO2 consumed {rates['CO2_needed_molph'][[3, 7, 23], 27].round(1)} mol/h, "
+          f"H2 {rates['H2_feed_molph'][[3, 7, 23], 27].round(3)} mol/h after {residence[[3, 7, 23], 0]} h")
@@ -0,0 +1,343 @@
+"""
+CO2 Property Table Generator
+
+Generalises the "Enthalpy table" cell of CO2 properties.ipynb (h(T,P) for a
+handful of temperatures and pressures, rendered as co2_table.png) to any
+CoolProp property on any T-P grid.
+
+- The grid is split into row chunks that are filled in a process pool.
+- Tables are stored compactly: .npz (numpy only) or .parquet (pandas + pyarrow).
+- A saved table can be loaded and queried (bilinear interpolation) without
+  CoolProp installed; CoolProp is only imported when a table is built.
+- Table images are only rendered on request, matplotlib is imported then.
+
+Units: temperatures in °C, pressures in bar absolute, properties in SI as
+returned by CoolProp (e.g. H in J/kg, D in kg/m³).
+
+Example:
+    table = build_property_table(["H", "D"], np.arange(-40, 161, 0.5), np.arange(10, 121, 0.5))
+    table.save("co2_handbook.npz")
+    PropertyTable.load("co2_handbook.npz").lookup("H", 25.0, 60.0)
+
+Required packages:
+pip install coolprop numpy scipy (pandas/pyarrow for parquet, matplotlib for images)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+property_units = {
+    "H": "J/kg",
+    "U": "J/kg",
+    "S": "J/kg/K",
+    "D": "kg/m3",
+    "C": "J/kg/K",
+    "CVMASS": "J/kg/K",
+    "V": "Pa.s",
+    "L": "W/m/K",
+    "Q": "-",
+    "A": "m/s",
+}
+
+default_chunk_points = 20_000  # grid points per worker task
+
+
+# -----------------------------
+# Worker (must be top level to be picklable)
+# -----------------------------
+def _fill_chunk(args):
+    """Evaluate props for a block of temperature rows; failed points become NaN."""
+    import CoolProp
+    import CoolProp.CoolProp as CP
+
+    fluid, backend, props, T_K, P_Pa = args
+    state = CoolProp.AbstractState(backend, fluid)
+    keys = [CP.get_parameter_index(prop) for prop in props]
+    out = np.full((len(props), T_K.size, P_Pa.size), np.nan)
+    for i, T in enumerate(T_K):
+        for j, P in enumerate(P_Pa):
+            try:
+                state.update(CoolProp.PT_INPUTS, P, T)
+                for k, key in enumerate(keys):
+                    out[k, i, j] = state.keyed_output(key)
+            except ValueError:
+                pass
+    return out
+
+
+# -----------------------------
+# Table
+# -----------------------------
+class PropertyTable:
+    """Property values on a regular T-P grid with interpolated lookups."""
+
+    def __init__(self, fluid, T_C, P_bar, values, units=None):
+        self.fluid = fluid
+        self.T_C = np.asarray(T_C, dtype=float)
+        self.P_bar = np.asarray(P_bar, dtype=float)
+        self.values = {prop: np.asarray(v, dtype=float) for prop, v in values.items()}
+        self.units = units or {prop: property_units.get(prop, "") for prop in self.values}
+        self._interpolators = {}
+
+    def __repr__(self):
+        props = ", ".join(self.values)
+        return (f"PropertyTable({self.fluid}: {props} on {self.T_C.size} x {self.P_bar.size} "
+                f"grid, {self.T_C[0]:g}..{self.T_C[-1]:g} °C, {self.P_bar[0]:g}..{self.P_bar[-1]:g} bar)")
+
+    @property
+    def size(self):
+        return self.T_C.size * self.P_bar.size * len(self.values)
+
+    def lookup(self, prop, T_C, P_bar):
+        """
+        Bilinear interpolation of prop at (T_C, P_bar); scalars or broadcastable arrays.
+
+        Points outside the grid return NaN. Near the saturation line the
+        interpolation smears the liquid/vapour jump over one grid cell.
+        """
+        from scipy.interpolate import RegularGridInterpolator
+
+        if prop not in self._interpolators:
+            self._interpolators[prop] = RegularGridInterpolator(
+                (self.T_C, self.P_bar), self.values[prop], bounds_error=False, fill_value=np.nan
+            )
+        T_C, P_bar = np.broadcast_arrays(np.asarray(T_C, dtype=float), np.asarray(P_bar, dtype=float))
+        result = self._interpolators[prop](np.stack([T_C.ravel(), P_bar.ravel()], axis=-1))
+        return result.reshape(T_C.shape) if T_C.ndim else float(result[0])
+
+    def to_dataframe(self, prop=None, scale=1.0):
+        """
+        Return a DataFrame view.
+
+        With prop: a T x P table like the notebook (rows °C, columns bar), values
+        multiplied by scale (1/3600 gives Wh/kg for enthalpy). Without prop: long
+        format with one row per grid point and one column per property.
+        """
+        import pandas as pd
+
+        if prop is not None:
+            return pd.DataFrame(
+                self.values[prop] * scale,
+                index=[f"{t:g}°C" for t in self.T_C],
+                columns=[f"{p:g} bar" for p in self.P_bar],
+            )
+        T, P = np.meshgrid(self.T_C, self.P_bar, indexing="ij")
+        data = {"T_C": T.ravel(), "P_bar": P.ravel()}
+        data.update({k: v.ravel() for k, v in self.values.items()})
+        df = pd.DataFrame(data)
+        # Kept in the parquet schema metadata by to_parquet (pandas >= 2.1) and restored by load()
+        df.attrs["fluid"] = self.fluid
+        df.attrs["units"] = dict(self.units)
+        return df
+
+    # -----------------------------
+    # Storage
+    # -----------------------------
+    def save(self, path):
+        """Write to .npz (compressed) or .parquet, chosen by file extension."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".npz":
+            np.savez_compressed(
+                path,
+                fluid=np.array(self.fluid),
+                T_C=self.T_C,
+                P_bar=self.P_bar,
+                props=np.array(list(self.values)),
+                units=np.array([self.units[p] for p in self.values]),
+                **{f"value_{p}": v.astype(np.float32 if self._fits_float32(v) else np.float64)
+                   for p, v in self.values.items()},
+            )
+        elif ext == ".parquet":
+            self.to_dataframe().to_parquet(path, index=False)
+        else:
+            raise ValueError(f"Unsupported table format: {ext} (use .npz or .parquet)")
+        return path
+
+    @staticmethod
+    def _fits_float32(v):
+        finite = v[np.isfinite(v)]
+        if finite.size == 0:
+            return True
+        # Keep float64 when float32 would lose more than 1e-6 relative accuracy
+        return np.max(np.abs(finite.astype(np.float32) - finite) / np.maximum(np.abs(finite), 1e-30)) < 1e-6
+
+    @classmethod
+    def load(cls, path):
+        """Load a table written by save(); does not need CoolProp."""
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".npz":
+            with np.load(path) as f:
+                props = [str(p) for p in f["props"]]
+                return cls(
+                    str(f["fluid"]),
+                    f["T_C"],
+                    f["P_bar"],
+                    {p: f[f"value_{p}"].astype(float) for p in props},
+                    dict(zip(props, (str(u) for u in f["units"]))),
+                )
+        if ext == ".parquet":
+            import pandas as pd
+
+            df = pd.read_parquet(path)
+            T_C = np.unique(df["T_C"].to_numpy())
+            P_bar = np.unique(df["P_bar"].to_numpy())
+            df = df.sort_values(["T_C", "P_bar"])
+            props = [c for c in df.columns if c not in ("T_C", "P_bar")]
+            values = {p: df[p].to_numpy().reshape(T_C.size, P_bar.size) for p in props}
+            units = df.attrs.get("units") or {}
+            return cls(df.attrs.get("fluid", "CO2"), T_C, P_bar, values,
+                       {p: units.get(p, property_units.get(p, "")) for p in props})
+        raise ValueError(f"Unsupported table format: {ext} (use .npz or .parquet)")
+
+    # -----------------------------
+    # Rendering (only on request)
+    # -----------------------------
+    def render_png(self, path, prop, scale=1.0, title=None, decimals=2, max_cells=400):
+        """
+        Render one property as a table image, like co2_table.png.
+
+        Only meant for small tables; larger grids should be queried or plotted instead.
+        """
+        if self.T_C.size * self.P_bar.size > max_cells:
+            raise ValueError(
+                f"Table has {self.T_C.size * self.P_bar.size} cells, more than max_cells={max_cells}; "
+                "render a sub-table instead"
+            )
+        from matplotlib.figure import Figure  # no pyplot: never opens a GUI window
+
+        df = self.to_dataframe(prop, scale=scale)
+        fig = Figure(figsize=(max(6, 1.1 * df.shape[1] + 1.5), 0.35 * df.shape[0] + 1.2))
+        ax = fig.subplots()
+        ax.axis("off")
+        table = ax.table(cellText=np.round(df.values, decimals), rowLabels=df.index,
+                         colLabels=df.columns, loc="center", cellLoc="center")
+        table.auto_set_font_size(False)
+        table.set_fontsize(10)
+        table.scale(1.2, 1.2)
+        ax.set_title(title or f"{self.fluid} {prop}", fontsize=14)
+        fig.savefig(path, dpi=300, bbox_inches="tight")
+        return path
+
+    def subtable(self, T_C, P_bar):
+        """Interpolate a smaller table, e.g. to render a handful of points from a large handbook."""
+        T, P = np.meshgrid(T_C, P_bar, indexing="ij")
+        values = {prop: self.lookup(prop, T, P) for prop in self.values}
+        return PropertyTable(self.fluid, T_C, P_bar, values, self.units)
+
+
+# -----------------------------
+# Builder
+# -----------------------------
+def build_property_table(props, T_C, P_bar, fluid="CO2", backend="HEOS", processes=None,
+                         chunk_points=default_chunk_points):
+    """
+    Fill a property table on the T_C x P_bar grid using a process pool.
+
+    Parameters:
+    -----------
+    props : str or list of str
+        CoolProp output keys, e.g. "H", ["H", "D", "C"]
+    T_C, P_bar : array-like
+        Grid axes in °C and bar absolute, must be increasing
+    backend : str
+        CoolProp backend; "BICUBIC&HEOS" is an order of magnitude faster but
+        approximate near the saturation line
+    processes : int, optional
+        Number of worker processes (default: all cores, 1 runs in-process)
+    chunk_points : int
+        Grid points per worker task
+
+    Returns:
+    --------
+    PropertyTable
+    """
+    props = [props] if isinstance(props, str) else list(props)
+    T_C = np.asarray(T_C, dtype=float)
+    P_bar = np.asarray(P_bar, dtype=float)
+    if np.any(np.diff(T_C) <= 0) or np.any(np.diff(P_bar) <= 0):
+        raise ValueError("T_C and P_bar must be strictly increasing")
+
+    rows_per_chunk = max(1, chunk_points // max(P_bar.size, 1))
+    P_Pa = P_bar * 1e5
+    tasks = [
+        (fluid, backend, props, T_C[i:i + rows_per_chunk] + 273.15, P_Pa)
+        for i in range(0, T_C.size, rows_per_chunk)
+    ]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(tasks) == 1:
+        blocks = [_fill_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(processes, len(tasks))) as pool:
+            blocks = list(pool.map(_fill_chunk, tasks))
+    data = np.concatenate(blocks, axis=1)
+    return PropertyTable(fluid, T_C, P_bar, {prop: data[k] for k, prop in enumerate(props)})
+
+
+def _axis(values):
+    """Grid axis from a list of values or a (start, stop, step) tuple, stop included."""
+    if isinstance(values, tuple) and len(values) == 3:
+        start, stop, step = values
+        return np.arange(start, stop + step / 2, step)
+    return np.atleast_1d(np.asarray(values, dtype=float))
+
+
+def main(argv=None):
+    """
+    Command line entry point (co2-property-tables): build a table and print
+    it, or save it with --output (.npz / .parquet as PropertyTable.save,
+    .csv / .json in long format). Keys: props, T_C and P_bar (lists or
+    (start, stop, step)), fluid, backend, processes.
+    """
+    import model_cli
+
+    p = model_cli.parser("CoolProp property table on a T-P grid (°C, bar absolute, SI properties)")
+    args = p.parse_args(argv)
+    try:
+        overrides = model_cli.parse_overrides(args.overrides)
+    except ValueError as e:
+        p.error(str(e))
+    settings = {"props": "H", "T_C": (-40, 160, 20), "P_bar": (10, 120, 10), "fluid": "CO2", "backend": "HEOS",
+                "processes": None}
+    unknown = set(overrides) - set(settings)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {sorted(unknown)}")
+    settings.update(overrides)
+    table = build_property_table(settings["props"], _axis(settings["T_C"]), _axis(settings["P_bar"]),
+                                 settings["fluid"], settings["backend"], settings["processes"])
+    if args.output and os.path.splitext(args.output)[1].lower() in (".npz", ".parquet"):
+        table.save(args.output)
+    elif args.output:
+        model_cli.write_result(table.to_dataframe(), args.output)
+    else:
+        for prop in table.values:
+            print(f"{table.fluid} {prop} ({table.units[prop]}):")
+            print(table.to_dataframe(prop).to_string(float_format=lambda x: f"{x:.6g}"))
+    return table
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    # The notebook's enthalpy table, in Wh/kg
+    temps_C = np.array([-35, -28, -20, 5, 15, 25, 50, 60, 80, 90, 160])
+    pressures_bar = np.array([18, 20, 25, 40, 60, 80, 100])
+    table = build_property_table("H", temps_C, pressures_bar, processes=1)
+    print("CO2 Specific Enthalpy (Wh/kg):")
+    print(table.to_dataframe("H", scale=1 / 3600).to_string(float_format=lambda x: f"{x:7.2f}"))
+
+    # A plant-wide handbook: ~10^6 entries
+    start = time.perf_counter()
+    handbook = build_property_table(["H", "D", "C"], np.arange(-50, 200.01, 0.5),
+                                    np.arange(5, 150.01, 0.25), backend="BICUBIC&HEOS")
+    print(f"\nBuilt {handbook} ({handbook.size} entries) in {time.perf_counter() - start:.1f} s")
+    path = handbook.save(os.path.join(tempfile.gettempdir(), "co2_handbook.npz"))
+    print(f"Saved to {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    loaded = PropertyTable.load(path)
+    print(f"h(25 °C, 60 bar) = {loaded.lookup('H', 25.0, 60.0) / 3600:.2f} Wh/kg")
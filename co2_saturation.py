@@ -0,0 +1,268 @@
+"""
+CO2 Saturation Service
+
+The ad-hoc cells in CO2 properties.ipynb call CP.PropsSI(..., 'Q', 0/1, ...)
+once per question and use fsolve for inversions (e.g. the subcooling needed
+for a given NPSH). This module samples the saturation line once, from the
+triple point to the critical point, and fits monotone (PCHIP) splines, so
+that all of these become vectorized array lookups:
+
+- P_sat(T), T_sat(P)
+- saturated liquid/vapour density and enthalpy at T or P
+- quality(h, P) and subcooling(T, P)
+- classify(...) into liquid / vapour / two-phase / supercritical
+- subcooling_for_npsh(...) without fsolve
+
+Units are SI throughout (K, Pa, J/kg, kg/m³), like CoolProp.
+
+Required packages:
+pip install coolprop numpy scipy
+"""
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+saturation_settings = {
+    "fluid": "CO2",
+    "n_points": 600,  # nodes along the saturation line, clustered near the critical point
+}
+
+# Phase codes returned by classify()
+SOLID = -1  # below the triple point, outside the table
+LIQUID = 0
+VAPOR = 1
+TWO_PHASE = 2
+SUPERCRITICAL = 3
+phase_names = {
+    SOLID: "solid/out of range",
+    LIQUID: "liquid",
+    VAPOR: "vapor",
+    TWO_PHASE: "two-phase",
+    SUPERCRITICAL: "supercritical",
+}
+
+g = 9.81  # m/s²
+
+
+# -----------------------------
+# Saturation table
+# -----------------------------
+class SaturationTable:
+    """Monotone splines along the saturation line of one fluid."""
+
+    def __init__(self, T, P, rho_liq, rho_vap, h_liq, h_vap, T_crit, P_crit, h_crit, T_triple):
+        from scipy.interpolate import PchipInterpolator
+
+        self.T = T
+        self.P = P
+        self.rho_liq = rho_liq
+        self.rho_vap = rho_vap
+        self.h_liq = h_liq
+        self.h_vap = h_vap
+        self.T_crit = T_crit
+        self.P_crit = P_crit
+        self.h_crit = h_crit
+        self.T_triple = T_triple
+        self.P_triple = P[0]
+
+        lnP = np.log(P)
+        self._lnP_of_T = PchipInterpolator(T, lnP, extrapolate=False)
+        self._T_of_lnP = PchipInterpolator(lnP, T, extrapolate=False)
+        self._of_T = {
+            "rho_liq": PchipInterpolator(T, rho_liq, extrapolate=False),
+            "rho_vap": PchipInterpolator(T, rho_vap, extrapolate=False),
+            "h_liq": PchipInterpolator(T, h_liq, extrapolate=False),
+            "h_vap": PchipInterpolator(T, h_vap, extrapolate=False),
+        }
+
+    @classmethod
+    def from_coolprop(cls, fluid=None, n_points=None):
+        """Sample the saturation line with CoolProp (a few hundred calls, done once)."""
+        from CoolProp.CoolProp import PropsSI
+
+        fluid = fluid or saturation_settings["fluid"]
+        n_points = n_points or saturation_settings["n_points"]
+        T_triple = PropsSI("Ttriple", fluid)
+        T_crit = PropsSI("Tcrit", fluid)
+        P_crit = PropsSI("pcrit", fluid)
+        h_crit = PropsSI("H", "T", T_crit, "D", PropsSI("rhocrit", fluid), fluid)
+
+        # Quadratic clustering towards the critical point, where properties bend sharply
+        u = np.linspace(0.0, 1.0, n_points)
+        T = T_crit - (T_crit - T_triple) * (1 - u) ** 2
+        T[-1] = T_crit - 1e-4
+        P = PropsSI("P", "T", T, "Q", 0, fluid)
+        rho_liq = PropsSI("D", "T", T, "Q", 0, fluid)
+        rho_vap = PropsSI("D", "T", T, "Q", 1, fluid)
+        h_liq = PropsSI("H", "T", T, "Q", 0, fluid)
+        h_vap = PropsSI("H", "T", T, "Q", 1, fluid)
+        return cls(T, P, rho_liq, rho_vap, h_liq, h_vap, T_crit, P_crit, h_crit, T_triple)
+
+    # -----------------------------
+    # Saturation line
+    # -----------------------------
+    def P_sat(self, T):
+        """Saturation pressure [Pa] at T [K]; NaN outside triple..critical."""
+        return np.exp(self._lnP_of_T(np.asarray(T, dtype=float)))
+
+    def T_sat(self, P):
+        """Saturation temperature [K] at P [Pa]; NaN outside triple..critical."""
+        return self._T_of_lnP(np.log(np.asarray(P, dtype=float)))
+
+    def saturated(self, prop, T=None, P=None):
+        """
+        Saturated property at T [K] or P [Pa].
+
+        prop is one of "rho_liq", "rho_vap", "h_liq", "h_vap".
+        """
+        if (T is None) == (P is None):
+            raise ValueError("Give exactly one of T or P")
+        if T is None:
+            T = self.T_sat(P)
+        return self._of_T[prop](np.asarray(T, dtype=float))
+
+    # -----------------------------
+    # Derived quantities
+    # -----------------------------
+    def quality(self, h, P):
+        """
+        Vapour quality from enthalpy [J/kg] and pressure [Pa].
+
+        Not clipped: < 0 means subcooled liquid, > 1 superheated vapour.
+        NaN at or above the critical pressure.
+        """
+        T = self.T_sat(P)
+        h_l = self._of_T["h_liq"](T)
+        h_v = self._of_T["h_vap"](T)
+        return (np.asarray(h, dtype=float) - h_l) / (h_v - h_l)
+
+    def subcooling(self, T, P):
+        """T_sat(P) - T [K]; positive when the liquid is subcooled."""
+        return self.T_sat(P) - np.asarray(T, dtype=float)
+
+    def classify(self, P, T=None, h=None, tol=1e-4):
+        """
+        Phase code for each operating point, see phase_names.
+
+        With h: two-phase when 0 < quality < 1; above the critical pressure the
+        split is supercritical (h > h_crit) or liquid. With T: the state is
+        liquid/vapour by comparing P with P_sat(T); points within a relative
+        tolerance tol of the line are reported as two-phase.
+        """
+        if (T is None) == (h is None):
+            raise ValueError("Give exactly one of T or h")
+        P = np.asarray(P, dtype=float)
+
+        if h is not None:
+            P, h = np.broadcast_arrays(P, np.asarray(h, dtype=float))
+            x = self.quality(h, P)
+            above_crit = P >= self.P_crit
+            phase = np.select(
+                [P < self.P_triple, above_crit & (h > self.h_crit), above_crit,
+                 x <= 0, x >= 1],
+                [SOLID, SUPERCRITICAL, LIQUID, LIQUID, VAPOR],
+                default=TWO_PHASE,
+            )
+            return phase
+
+        P, T = np.broadcast_arrays(P, np.asarray(T, dtype=float))
+        P_sat = self.P_sat(np.minimum(T, self.T[-1]))
+        supercritical_T = T >= self.T_crit
+        near_line = np.abs(P - P_sat) <= tol * P_sat
+        phase = np.select(
+            [T < self.T_triple,
+             supercritical_T & (P >= self.P_crit), supercritical_T,
+             P >= self.P_crit,
+             near_line, P > P_sat],
+            [SOLID, SUPERCRITICAL, VAPOR, LIQUID, TWO_PHASE, LIQUID],
+            default=VAPOR,
+        )
+        return phase
+
+    def subcooling_for_npsh(self, T_initial, NPSHr, iterations=60):
+        """
+        Temperature [K] a saturated liquid at T_initial must be subcooled to,
+        at constant pressure P_sat(T_initial), to give NPSHa = NPSHr [m].
+
+        Same definition as the Subcooling cell of the notebook:
+            NPSHa(T) = (P_inlet - P_sat(T)) / (rho_liq(T) * g)
+        NPSHa falls monotonically with T, so instead of fsolve per point the
+        root is bracketed between the triple point and T_initial and found by
+        bisection on whole arrays at once. NaN when even the triple point
+        does not give enough NPSH.
+        """
+        T_initial, NPSHr = np.broadcast_arrays(np.asarray(T_initial, dtype=float),
+                                               np.asarray(NPSHr, dtype=float))
+        P_inlet = self.P_sat(T_initial)
+
+        def npsh(T):
+            return (P_inlet - self.P_sat(T)) / (self._of_T["rho_liq"](T) * g)
+
+        low = np.full(T_initial.shape, self.T_triple)
+        high = T_initial.copy()
+        for _ in range(iterations):
+            mid = 0.5 * (low + high)
+            too_warm = npsh(mid) < NPSHr
+            high = np.where(too_warm, mid, high)
+            low = np.where(too_warm, low, mid)
+        T_target = np.where(npsh(np.full(T_initial.shape, self.T_triple)) >= NPSHr, 0.5 * (low + high), np.nan)
+        return T_target if T_target.ndim else float(T_target)
+
+
+_default_table = None
+
+
+def get_saturation_table():
+    """Module-wide CO2 table, built with CoolProp on first use."""
+    global _default_table
+    if _default_table is None:
+        _default_table = SaturationTable.from_coolprop()
+    return _default_table
+
+
+def main(argv=None):
+    """
+    Command line entry point (co2-saturation): saturation properties at
+    --set T_C=... or --set P_bar=... (bar absolute; numbers or lists).
+    """
+    import model_cli
+    import pandas as pd
+
+    def query(T_C=None, P_bar=None):
+        sat = get_saturation_table()
+        if (T_C is None) == (P_bar is None):
+            raise ValueError("Give exactly one of T_C or P_bar")
+        T = np.ravel(T_C) + 273.15 if P_bar is None else sat.T_sat(np.ravel(P_bar) * 1e5)
+        table = {"T_C": T - 273.15, "P_bar": sat.P_sat(T) / 1e5}
+        table.update({prop: sat.saturated(prop, T=T) for prop in ("rho_liq", "rho_vap", "h_liq", "h_vap")})
+        return pd.DataFrame(table)
+
+    return model_cli.run(query, "CO2 saturation line (°C, bar absolute, kg/m³, J/kg)", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    sat = get_saturation_table()
+
+    # Cell "Define pressure": T_sat at 50 barg
+    P = (50 + 1.01325) * 1e5
+    print(f"Saturation temperature at {P/1e5:.2f} bara: {sat.T_sat(P) - 273.15:.2f} °C")
+
+    # Cell "Subcooling": NPSHr 5 m from saturated liquid at -20 °C
+    T_target = sat.subcooling_for_npsh(-20 + 273.15, 5.0)
+    print(f"Required subcooling for NPSHa 5 m at -20 °C: {-20 + 273.15 - T_target:.2f} K")
+
+    # Classify a cloud of operating points in one call
+    rng = np.random.default_rng(0)
+    n = 100_000
+    P_pts = rng.uniform(5e5, 120e5, n)
+    h_pts = rng.uniform(100e3, 550e3, n)
+    start = time.perf_counter()
+    phases = sat.classify(P_pts, h=h_pts)
+    elapsed = time.perf_counter() - start
+    counts = {phase_names[k]: int(np.sum(phases == k)) for k in phase_names}
+    print(f"\nClassified {n} (P, h) points in {elapsed * 1000:.1f} ms: {counts}")
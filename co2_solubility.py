@@ -0,0 +1,319 @@
+"""
+CO2 Solubility in Water and Brine
+
+Replaces the placeholder scaling in Solubility-errored.ipynb
+(0.5 mol/kg * P/30 * 50/T) and the fixed CO2_solubility_kg_per_100L = 3 of
+reactor_headspace_simulation.py with the Duan & Sun (2003) model:
+
+    ln m_CO2 = ln(y_CO2 * phi_CO2 * P) - mu_l0/RT - 2*lambda*m_NaCl - zeta*m_NaCl**2
+
+    Duan, Z., Sun, R. (2003). An improved model calculating CO2 solubility in
+    pure water and aqueous NaCl solutions from 273 to 533 K and from 0 to
+    2000 bar. Chemical Geology 193, 257-271.
+
+- phi_CO2 (fugacity coefficient of the gas phase) comes from CoolProp (HEOS,
+  pure CO2) instead of the Duan (1992) EOS fit used in the paper.
+- y_CO2 = (P - P_sat,water(T)) / P, with the water vapour pressure from CoolProp.
+- m_NaCl is the salinity in mol/kg water.
+
+The CoolProp part is the expensive one. It is evaluated once on a T-P grid
+(ln phi_CO2 - mu_l0/RT plus the lambda and zeta terms, all smooth in T and
+P) and queries interpolate bilinearly on that grid with plain index
+arithmetic. ln(y_CO2 * P) = ln(P - P_sat,water) is evaluated per query, with
+ln P_sat,water interpolated along the temperature axis, so the solubility
+stays accurate just above the water vapour pressure (where it falls steeply
+to zero). The salinity dependence is analytic, so the salinity axis of the
+table is exact. A query is a few microseconds per point; a built table can be
+saved to .npz and loaded without CoolProp.
+
+At or below the water vapour pressure there is no CO2-rich gas phase and
+both the direct model and the table return 0.
+
+Units: °C, bar absolute, mol/kg water (molality).
+
+Required packages:
+pip install coolprop numpy
+"""
+
+import math
+import os
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+solubility_settings = {
+    "T_min_C": 0.0,
+    "T_max_C": 260.0,  # upper limit of the Duan-Sun fit (533 K)
+    "T_step_C": 2.0,
+    "P_min_bar": 1.0,
+    "P_max_bar": 401.0,
+    "P_step_bar": 2.0,
+}
+
+CO2_M = 44.01  # g/mol
+water_density_kg_per_L = 1.0  # feed water, as in the headspace model
+
+# Duan & Sun (2003) Table 2: Par(T, P) = c1 + c2*T + c3/T + c4*T**2 + c5/(630 - T)
+#   + c6*P + c7*P*ln(T) + c8*P/T + c9*P/(630 - T) + c10*P**2/(630 - T)**2 + c11*T*ln(P)
+duan_sun_parameters = {
+    "mu_l0_RT": [28.9447706, -0.0354581768, -4770.67077, 1.02782768e-5, 33.8126098,
+                 9.04037140e-3, -1.14934031e-3, -0.307405726, -0.0907301486, 9.32713393e-4, 0.0],
+    "lambda_CO2_Na": [-0.411370585, 6.07632013e-4, 97.5347708, 0.0, 0.0,
+                      0.0, 0.0, -0.0237622469, 0.0170656236, 0.0, 1.41335834e-5],
+    "zeta_CO2_Na_Cl": [3.36389723e-4, -1.98298980e-5, 0.0, 0.0, 0.0,
+                       0.0, 0.0, 2.12220830e-3, -5.24873303e-3, 0.0, 0.0],
+}
+
+
+def _par(name, T_K, P_bar):
+    c = duan_sun_parameters[name]
+    return (c[0] + c[1] * T_K + c[2] / T_K + c[3] * T_K**2 + c[4] / (630 - T_K)
+            + c[5] * P_bar + c[6] * P_bar * np.log(T_K) + c[7] * P_bar / T_K
+            + c[8] * P_bar / (630 - T_K) + c[9] * P_bar**2 / (630 - T_K)**2
+            + c[10] * T_K * np.log(P_bar))
+
+
+# -----------------------------
+# Direct model (CoolProp, slow)
+# -----------------------------
+def fugacity_coefficient(T_K, P_bar):
+    """Fugacity coefficient of pure CO2 from CoolProp; NaN where CoolProp fails."""
+    import CoolProp
+
+    T_K, P_bar = np.broadcast_arrays(np.asarray(T_K, dtype=float), np.asarray(P_bar, dtype=float))
+    state = CoolProp.AbstractState("HEOS", "CO2")
+    phi = np.full(T_K.shape, np.nan)
+    for idx in np.ndindex(T_K.shape):
+        try:
+            state.update(CoolProp.PT_INPUTS, P_bar[idx] * 1e5, T_K[idx])
+            phi[idx] = state.fugacity_coefficient(0)
+        except ValueError:
+            pass
+    return phi
+
+
+def water_vapour_pressure(T_K):
+    """Saturation pressure of water [bar] (0 below the triple point, used as an approximation)."""
+    from CoolProp.CoolProp import PropsSI
+
+    T_K = np.asarray(T_K, dtype=float)
+    T_crit = PropsSI("Tcrit", "Water")
+    P = PropsSI("P", "T", np.clip(T_K, 273.16, T_crit - 1e-3).ravel(), "Q", 0, "Water")
+    return np.reshape(P, T_K.shape) / 1e5
+
+
+def duan_sun_molality(T_C, P_bar, m_NaCl=0.0):
+    """
+    CO2 solubility [mol/kg water] straight from the model (one CoolProp call per point).
+
+    Use SolubilityTable / solubility_molality for repeated queries.
+    """
+    T_C, P_bar, m_NaCl = np.broadcast_arrays(np.asarray(T_C, dtype=float),
+                                             np.asarray(P_bar, dtype=float),
+                                             np.asarray(m_NaCl, dtype=float))
+    T_K = T_C + 273.15
+    phi = fugacity_coefficient(T_K, P_bar)
+    return np.exp(_ln_m_pure(T_K, P_bar, phi) - _salting_out(T_K, P_bar, m_NaCl))
+
+
+def _ln_m_pure(T_K, P_bar, phi):
+    y_CO2 = (P_bar - water_vapour_pressure(T_K)) / P_bar
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Below the water vapour pressure there is no CO2-rich gas phase: no solubility
+        return np.where(y_CO2 > 0, np.log(y_CO2 * P_bar), -np.inf) + _ln_phi_mu(T_K, P_bar, phi)
+
+
+def _ln_phi_mu(T_K, P_bar, phi):
+    """ln phi_CO2 - mu_l0/RT: the part of ln m_CO2 that is smooth down to the water vapour pressure."""
+    return np.log(phi) - _par("mu_l0_RT", T_K, P_bar)
+
+
+def _salting_out(T_K, P_bar, m_NaCl):
+    return (2 * _par("lambda_CO2_Na", T_K, P_bar) * m_NaCl
+            + _par("zeta_CO2_Na_Cl", T_K, P_bar) * m_NaCl**2)
+
+
+# -----------------------------
+# Precomputed table (fast)
+# -----------------------------
+class SolubilityTable:
+    """
+    ln phi_CO2 - mu_l0/RT, lambda and zeta on a uniform T-P grid with bilinear
+    lookups, and ln P_sat,water [bar] on the temperature axis.
+    """
+
+    def __init__(self, T_C, P_bar, ln_phi_mu, ln_P_water, lam, zeta):
+        self.T_C = np.asarray(T_C, dtype=float)
+        self.P_bar = np.asarray(P_bar, dtype=float)
+        self.ln_phi_mu = np.asarray(ln_phi_mu, dtype=float)
+        self.ln_P_water = np.asarray(ln_P_water, dtype=float)
+        self.lam = np.asarray(lam, dtype=float)
+        self.zeta = np.asarray(zeta, dtype=float)
+        self._T0, self._dT = self.T_C[0], self.T_C[1] - self.T_C[0]
+        self._P0, self._dP = self.P_bar[0], self.P_bar[1] - self.P_bar[0]
+        self._ln_phi_mu_list = self.ln_phi_mu.tolist()
+        self._ln_P_water_list = self.ln_P_water.tolist()
+        self._lam_list = self.lam.tolist()
+        self._zeta_list = self.zeta.tolist()
+
+    def __repr__(self):
+        return (f"SolubilityTable({self.T_C[0]:g}..{self.T_C[-1]:g} °C x "
+                f"{self.P_bar[0]:g}..{self.P_bar[-1]:g} bar, {self.T_C.size} x {self.P_bar.size})")
+
+    @classmethod
+    def build(cls, **overrides):
+        """Evaluate the CoolProp part of the model on the grid of solubility_settings."""
+        s = dict(solubility_settings)
+        s.update(overrides)
+        T_C = np.arange(s["T_min_C"], s["T_max_C"] + s["T_step_C"] / 2, s["T_step_C"])
+        P_bar = np.arange(s["P_min_bar"], s["P_max_bar"] + s["P_step_bar"] / 2, s["P_step_bar"])
+        T_K, P = np.meshgrid(T_C + 273.15, P_bar, indexing="ij")
+        return cls(T_C, P_bar, _ln_phi_mu(T_K, P, fugacity_coefficient(T_K, P)),
+                   np.log(water_vapour_pressure(T_C + 273.15)), _par("lambda_CO2_Na", T_K, P),
+                   _par("zeta_CO2_Na_Cl", T_K, P))
+
+    def save(self, path):
+        np.savez_compressed(path, T_C=self.T_C, P_bar=self.P_bar, ln_phi_mu=self.ln_phi_mu,
+                            ln_P_water=self.ln_P_water, lam=self.lam, zeta=self.zeta)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Load a table written by save(); does not need CoolProp."""
+        with np.load(path) as f:
+            return cls(f["T_C"], f["P_bar"], f["ln_phi_mu"], f["ln_P_water"], f["lam"], f["zeta"])
+
+    def _bilinear(self, grid, T_C, P_bar):
+        x = (T_C - self._T0) / self._dT
+        y = (P_bar - self._P0) / self._dP
+        inside = (x >= 0) & (x <= self.T_C.size - 1) & (y >= 0) & (y <= self.P_bar.size - 1)
+        i = np.clip(np.floor(x).astype(int), 0, self.T_C.size - 2)
+        j = np.clip(np.floor(y).astype(int), 0, self.P_bar.size - 2)
+        fx = x - i
+        fy = y - j
+        value = ((grid[i, j] * (1 - fx) + grid[i + 1, j] * fx) * (1 - fy)
+                 + (grid[i, j + 1] * (1 - fx) + grid[i + 1, j + 1] * fx) * fy)
+        return np.where(inside, value, np.nan)
+
+    def _scalar(self, T_C, P_bar, m_NaCl):
+        # Same interpolation in plain floats: numpy call overhead dominates single queries
+        x = (T_C - self._T0) / self._dT
+        y = (P_bar - self._P0) / self._dP
+        if not (0 <= x <= self.T_C.size - 1 and 0 <= y <= self.P_bar.size - 1):
+            return math.nan
+        i = min(int(x), self.T_C.size - 2)
+        j = min(int(y), self.P_bar.size - 2)
+        fx, fy = x - i, y - j
+        P_water = math.exp(self._ln_P_water_list[i] * (1 - fx) + self._ln_P_water_list[i + 1] * fx)
+        if P_bar <= P_water:
+            return 0.0
+        w = ((1 - fx) * (1 - fy), fx * (1 - fy), (1 - fx) * fy, fx * fy)
+        ln_m = math.log(P_bar - P_water)
+        for grid, factor in ((self._ln_phi_mu_list, 1.0), (self._lam_list, -2 * m_NaCl),
+                             (self._zeta_list, -m_NaCl * m_NaCl)):
+            if factor:
+                ln_m += factor * (w[0] * grid[i][j] + w[1] * grid[i + 1][j]
+                                  + w[2] * grid[i][j + 1] + w[3] * grid[i + 1][j + 1])
+        return math.exp(ln_m)
+
+    def molality(self, T_C, P_bar, m_NaCl=0.0):
+        """CO2 solubility [mol/kg water]; NaN outside the table, 0 at or below the water vapour pressure."""
+        if all(isinstance(v, (int, float)) for v in (T_C, P_bar, m_NaCl)):
+            return self._scalar(float(T_C), float(P_bar), float(m_NaCl))
+        T_C, P_bar, m_NaCl = np.broadcast_arrays(np.asarray(T_C, dtype=float),
+                                                 np.asarray(P_bar, dtype=float),
+                                                 np.asarray(m_NaCl, dtype=float))
+        P_water = np.exp(np.interp(T_C, self.T_C, self.ln_P_water))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ln_y_P = np.where(P_bar > P_water, np.log(P_bar - P_water), -np.inf)
+        ln_m = (ln_y_P + self._bilinear(self.ln_phi_mu, T_C, P_bar)
+                - 2 * self._bilinear(self.lam, T_C, P_bar) * m_NaCl
+                - self._bilinear(self.zeta, T_C, P_bar) * m_NaCl**2)
+        m = np.exp(ln_m)
+        return m if m.ndim else float(m)
+
+
+_default_table = None
+
+
+def get_solubility_table(path=None):
+    """
+    Module-wide table, built with CoolProp on first use.
+
+    With path: loaded from there if the file exists, otherwise built and saved there.
+    """
+    global _default_table
+    if _default_table is None:
+        if path is not None and os.path.exists(path):
+            _default_table = SolubilityTable.load(path)
+        else:
+            _default_table = SolubilityTable.build()
+            if path is not None:
+                _default_table.save(path)
+    return _default_table
+
+
+# -----------------------------
+# Convenience for the process models
+# -----------------------------
+def solubility_molality(T_C, P_bar, m_NaCl=0.0):
+    """CO2 solubility [mol/kg water] from the module-wide table."""
+    return get_solubility_table().molality(T_C, P_bar, m_NaCl)
+
+
+def solubility_kg_per_100L(T_C, P_bar, m_NaCl=0.0):
+    """kg CO2 dissolved per 100 L of feed water (the unit of the headspace config)."""
+    return solubility_molality(T_C, P_bar, m_NaCl) * CO2_M / 1000 * 100 * water_density_kg_per_L
+
+
+def dissolved_CO2_molph(water_feed_Lph, T_C, P_bar, m_NaCl=0.0):
+    """mol/h of CO2 taken up by a water feed saturated at (T, P), i.e. CO2_dissolved_molph."""
+    return solubility_molality(T_C, P_bar, m_NaCl) * np.asarray(water_feed_Lph) * water_density_kg_per_L
+
+
+def main(argv=None):
+    """
+    Command line entry point (co2-solubility): solubility at --set T_C=...
+    --set P_bar=... --set m_NaCl=... (numbers or lists, broadcast together).
+    """
+    import model_cli
+    import pandas as pd
+
+    def query(T_C=175.0, P_bar=100.0, m_NaCl=0.0):
+        T_C, P_bar, m_NaCl = (np.ravel(a) for a in np.broadcast_arrays(T_C, P_bar, m_NaCl))
+        return pd.DataFrame({"T_C": T_C, "P_bar": P_bar, "m_NaCl": m_NaCl,
+                             "molality_mol_per_kg": solubility_molality(T_C, P_bar, m_NaCl),
+                             "kg_per_100L": solubility_kg_per_100L(T_C, P_bar, m_NaCl)})
+
+    return model_cli.run(query, "CO2 solubility in water and NaCl brine (Duan & Sun table)", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    table = get_solubility_table()
+    print(f"Built {table} in {time.perf_counter() - start:.1f} s")
+
+    # Reactor conditions of the headspace model
+    print(f"\n175 °C, 100 bar: {solubility_kg_per_100L(175, 100):.2f} kg CO2 / 100 L "
+          f"(headspace config used 3), direct model {duan_sun_molality(175, 100):.3f} mol/kg, "
+          f"table {solubility_molality(175, 100):.3f} mol/kg")
+    for T, P, S in ((25, 100, 0), (50, 100, 0), (100, 200, 0), (50, 100, 1.0), (50, 100, 4.0)):
+        print(f"{T:4d} °C {P:4d} bar {S:.1f} m NaCl: {solubility_molality(T, P, S):.3f} mol/kg")
+
+    # The notebook's chart range, now from the model
+    T_grid, P_grid = np.meshgrid(np.arange(20, 81, 10), np.arange(10, 61, 10), indexing="ij")
+    print("\nkg CO2 / 100 kg water (rows °C, columns bar):")
+    print(np.round(solubility_kg_per_100L(T_grid, P_grid), 2))
+
+    # Query cost inside a sweep
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    T_q, P_q, S_q = rng.uniform(20, 250, n), rng.uniform(10, 400, n), rng.uniform(0, 3, n)
+    start = time.perf_counter()
+    solubility_molality(T_q, P_q, S_q)
+    print(f"\n{n} queries in {(time.perf_counter() - start) * 1000:.0f} ms")
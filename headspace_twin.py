@@ -0,0 +1,268 @@
+"""
+Headspace Digital Twin
+
+Replays plant historian data (timestamp, CO2 feed, purge flow and the
+headspace gas analyser's H2 / N2) through the headspace model of
+reactor_headspace_simulation.py one sample at a time, and estimates online
+what the model takes as fixed: the H2 yield per fayalite and the purge
+effectiveness (the fraction of the metered purge that actually removes
+headspace gas at headspace composition).
+
+State: N2 and H2 in the headspace [mol], h2_yield_per_fayalite and the purge
+effectiveness, tracked with an extended Kalman filter:
+
+    dn_N2/dt = F_N2(CO2 feed) - eta * Q(purge) * n_N2 / N
+    dn_H2/dt = yield * R_H2 - eta * Q(purge) * n_H2 / N
+
+with N the headspace inventory as in simulate() (CO2 fills the rest of the
+volume) and yield, eta random walks. The analyser vol% is linear in the
+state (partial volume / headspace volume, as simulate() reports it), so the
+measurement update is two scalar updates; a missing reading (NaN) is skipped.
+Every sample is O(1) work on a 4x4 covariance, so a month of 1 Hz data
+(2.6 M samples) replays in about a minute.
+
+    twin = HeadspaceTwin()
+    estimates = twin.run(replay_csv("historian.csv"))          # DataFrame every record_every_s
+    twin.update(t_s, co2_feed_kgph, purge_kgph, h2_vol_pct, n2_vol_pct)   # or sample by sample
+
+Required packages:
+pip install numpy coolprop (pandas for replay_csv and the estimate table)
+"""
+
+import math
+
+import numpy as np
+
+import reactor_headspace_simulation as headspace
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+twin_settings = {
+    "analyser_sd_vol_pct": {"N2": 0.02, "H2": 0.002},  # measurement noise
+    "initial_sd": {"N2_mol": 50.0, "H2_mol": 5.0, "h2_yield": 0.005, "purge_effectiveness": 0.3},
+    "initial_purge_effectiveness": 1.0,  # h2_yield starts at config["h2_yield_per_fayalite"]
+    "drift_per_sqrt_h": {"N2_mol": 0.5, "H2_mol": 0.05, "h2_yield": 1e-5, "purge_effectiveness": 1e-3},
+    "record_every_s": 60,
+    "columns": {  # historian column names read by replay_csv
+        "time": "timestamp",
+        "co2_feed_kgph": "co2_feed_kgph",
+        "purge_kgph": "purge_kgph",
+        "h2_vol_pct": "h2_vol_pct",
+        "n2_vol_pct": "n2_vol_pct",
+    },
+}
+
+estimate_columns = ["time_s", "n2_vol_pct", "h2_vol_pct", "h2_yield", "purge_effectiveness", "h2_yield_sd",
+                    "purge_effectiveness_sd"]
+
+
+# -----------------------------
+# Measurement sources
+# -----------------------------
+def replay_csv(path, columns=None, chunksize=100_000):
+    """
+    Historian CSV as a stream of (time_s, co2_feed_kgph, purge_kgph,
+    h2_vol_pct, n2_vol_pct), read in chunks; empty analyser cells are NaN.
+    """
+    import pandas as pd
+
+    names = columns or twin_settings["columns"]
+    order = ["co2_feed_kgph", "purge_kgph", "h2_vol_pct", "n2_vol_pct"]
+    for chunk in pd.read_csv(path, usecols=list(names.values()), chunksize=chunksize):
+        time_s = pd.to_datetime(chunk[names["time"]]).to_numpy("datetime64[ns]").astype(np.int64) / 1e9
+        values = [chunk[names[key]].to_numpy(float) for key in order]
+        yield from zip(time_s.tolist(), *(v.tolist() for v in values))
+
+
+def synthetic_measurements(hours, h2_yield=None, purge_effectiveness=0.8, step_s=1.0, seed=0, **overrides):
+    """
+    Measurement stream of the configured reactor with a true h2_yield and
+    purge effectiveness: constant CO2 feed, metered purge, analyser noise of
+    twin_settings. The truth comes from the closed form of
+    headspace_uncertainty.h2_peak, one day at a time.
+    """
+    import headspace_uncertainty
+
+    d = headspace.derived(**overrides)
+    c = d["config"]
+    h2_yield = c["h2_yield_per_fayalite"] if h2_yield is None else h2_yield
+    co2_feed_kgph = d["CO2_feed_molph"] / c["CO2_feed_purity"] * c["CO2_M"] / 1000
+    true_purge = {"CO2_purge_wt_fraction": c["CO2_purge_wt_fraction"] * purge_effectiveness,
+                  "h2_yield_per_fayalite": h2_yield}
+    sd = twin_settings["analyser_sd_vol_pct"]
+    rng = np.random.default_rng(seed)
+    V, N0 = d["headspace_volume_m3"], d["headspace_mol"]
+
+    day = int(86400 / step_s)
+    for first in range(0, int(hours * 3600 / step_s), day):
+        t_s = (first + np.arange(min(day, int(hours * 3600 / step_s) - first))) * step_s
+        truth = headspace_uncertainty.h2_peak(time_h=t_s / 3600, **{**overrides, **true_purge})
+        # Metered purge in kg/h at the headspace composition
+        n_N2 = truth["vol_pct_N2"] / 100 * V / d["Vmol_N2"]
+        n_H2 = truth["vol_pct_H2"] / 100 * V / d["Vmol_H2"]
+        N = N0 + n_N2 * (1 - d["Vmol_N2"] / d["Vmol_CO2"]) + n_H2 * (1 - d["Vmol_H2"] / d["Vmol_CO2"])
+        M_mix = (c["CO2_M"] * (N - n_N2 - n_H2) + c["N2_M"] * n_N2 + c["H2_M"] * n_H2) / N
+        purge_kgph = d["purge_molph"] * M_mix / 1000
+        h2 = truth["vol_pct_H2"] + rng.normal(0, sd["H2"], t_s.size)
+        n2 = truth["vol_pct_N2"] + rng.normal(0, sd["N2"], t_s.size)
+        yield from zip(t_s.tolist(), [co2_feed_kgph] * t_s.size, purge_kgph.tolist(), h2.tolist(), n2.tolist())
+
+
+# -----------------------------
+# Twin
+# -----------------------------
+class HeadspaceTwin:
+    """Headspace state and unknown parameters, updated one measurement at a time (see module docstring)."""
+
+    def __init__(self, **overrides):
+        d = headspace.derived(**overrides)
+        c = d["config"]
+        s = twin_settings
+        self.V = d["headspace_volume_m3"]
+        self.N0 = d["headspace_mol"]
+        self.a_N2 = 1 - d["Vmol_N2"] / d["Vmol_CO2"]
+        self.a_H2 = 1 - d["Vmol_H2"] / d["Vmol_CO2"]
+        self.c_N2 = 100 * d["Vmol_N2"] / self.V  # vol% per mol
+        self.c_H2 = 100 * d["Vmol_H2"] / self.V
+        self.M = (c["CO2_M"], c["N2_M"], c["H2_M"])
+        self.n2_per_co2_mol = (1 - c["CO2_feed_purity"]) / c["CO2_feed_purity"]
+        # H2 generated per unit of h2_yield_per_fayalite [mol/h]
+        self.H2_per_yield = d["H2_feed_molph"] / c["h2_yield_per_fayalite"]
+        self.r_N2 = s["analyser_sd_vol_pct"]["N2"] ** 2
+        self.r_H2 = s["analyser_sd_vol_pct"]["H2"] ** 2
+        self.q = [s["drift_per_sqrt_h"][k] ** 2 for k in ("N2_mol", "H2_mol", "h2_yield", "purge_effectiveness")]
+
+        # State and covariance as plain floats: per sample, numpy call overhead would dominate a 4x4 filter
+        self.x = [0.0, 0.0, c["h2_yield_per_fayalite"], s["initial_purge_effectiveness"]]
+        sd0 = [s["initial_sd"][k] for k in ("N2_mol", "H2_mol", "h2_yield", "purge_effectiveness")]
+        self.P = [[sd0[i] ** 2 if i == j else 0.0 for j in range(4)] for i in range(4)]
+        self.time_s = None
+        self.samples = 0
+
+    def update(self, time_s, co2_feed_kgph, purge_kgph, h2_vol_pct=math.nan, n2_vol_pct=math.nan):
+        """
+        Advance to time_s with the feed and purge measured at that sample, then
+        take in the analyser readings (NaN: no reading). Returns the state
+        [n_N2, n_H2, h2_yield, purge_effectiveness].
+        """
+        x = self.x
+        if self.time_s is None:
+            # First sample: start from the analyser readings where there are any
+            if n2_vol_pct == n2_vol_pct:
+                x[0] = n2_vol_pct / self.c_N2
+            if h2_vol_pct == h2_vol_pct:
+                x[1] = h2_vol_pct / self.c_H2
+            self.time_s = time_s
+            self.samples = 1
+            return x
+        dt = (time_s - self.time_s) / 3600
+        self.time_s = time_s
+        self.samples += 1
+
+        # Predict
+        n_N2, n_H2, h2_yield, eta = x
+        N = self.N0 + self.a_N2 * n_N2 + self.a_H2 * n_H2
+        x_N2, x_H2 = n_N2 / N, n_H2 / N
+        M_CO2, M_N2, M_H2 = self.M
+        Q = purge_kgph * 1000 / (M_CO2 + x_N2 * (M_N2 - M_CO2) + x_H2 * (M_H2 - M_CO2))
+        F_N2 = co2_feed_kgph * 1000 / M_CO2 * self.n2_per_co2_mol
+        removal = dt * eta * Q / N ** 2
+        x[0] = n_N2 + dt * (F_N2 - eta * Q * x_N2)
+        x[1] = n_H2 + dt * (h2_yield * self.H2_per_yield - eta * Q * x_H2)
+
+        # P = J P J' + q dt, written out: J differs from the identity only in the inventory rows
+        #   J0 = (j00, j01, 0, j03), J1 = (j10, j11, j12, j13)
+        j00 = 1 - removal * (N - self.a_N2 * n_N2)
+        j01 = removal * self.a_H2 * n_N2
+        j03 = -dt * Q * x_N2
+        j10 = removal * self.a_N2 * n_H2
+        j11 = 1 - removal * (N - self.a_H2 * n_H2)
+        j12 = dt * self.H2_per_yield
+        j13 = -dt * Q * x_H2
+        (p00, p01, p02, p03), (_, p11, p12, p13), (_, _, p22, p23), (_, _, _, p33) = self.P
+        r00 = j00 * p00 + j01 * p01 + j03 * p03  # rows of J P
+        r01 = j00 * p01 + j01 * p11 + j03 * p13
+        r02 = j00 * p02 + j01 * p12 + j03 * p23
+        r03 = j00 * p03 + j01 * p13 + j03 * p33
+        r10 = j10 * p00 + j11 * p01 + j12 * p02 + j13 * p03
+        r11 = j10 * p01 + j11 * p11 + j12 * p12 + j13 * p13
+        r12 = j10 * p02 + j11 * p12 + j12 * p22 + j13 * p23
+        r13 = j10 * p03 + j11 * p13 + j12 * p23 + j13 * p33
+        q = self.q
+        p00 = r00 * j00 + r01 * j01 + r03 * j03 + q[0] * dt
+        p01 = r00 * j10 + r01 * j11 + r02 * j12 + r03 * j13
+        p11 = r10 * j10 + r11 * j11 + r12 * j12 + r13 * j13 + q[1] * dt
+        P = [[p00, p01, r02, r03], [p01, p11, r12, r13], [r02, r12, p22 + q[2] * dt, p23],
+             [r03, r13, p23, p33 + q[3] * dt]]
+
+        # Correct with each analyser reading (scalar updates)
+        for i, z, c, r in ((0, n2_vol_pct, self.c_N2, self.r_N2), (1, h2_vol_pct, self.c_H2, self.r_H2)):
+            if z == z:
+                row = [c * v for v in P[i]]
+                S = c * row[i] + r
+                innovation = z - c * x[i]
+                gain = [v / S for v in row]
+                x[0] += gain[0] * innovation
+                x[1] += gain[1] * innovation
+                x[2] += gain[2] * innovation
+                x[3] += gain[3] * innovation
+                P = [[p - g * v for p, v in zip(Pk, row)] for Pk, g in zip(P, gain)]
+        self.P = P
+        return x
+
+    def estimate(self):
+        """Current estimate as a dict (keys of estimate_columns)."""
+        sd = [math.sqrt(self.P[i][i]) for i in range(4)]
+        return {"time_s": self.time_s, "n2_vol_pct": self.c_N2 * self.x[0], "h2_vol_pct": self.c_H2 * self.x[1],
+                "h2_yield": self.x[2], "purge_effectiveness": self.x[3], "h2_yield_sd": sd[2],
+                "purge_effectiveness_sd": sd[3]}
+
+    def run(self, measurements, record_every_s=None):
+        """
+        Consume a stream of (time_s, co2_feed_kgph, purge_kgph, h2_vol_pct,
+        n2_vol_pct) and return the estimates every record_every_s seconds of
+        stream time (default twin_settings) as a DataFrame.
+        """
+        import pandas as pd
+
+        every = record_every_s or twin_settings["record_every_s"]
+        rows, next_record = [], None
+        for sample in measurements:
+            self.update(*sample)
+            if next_record is None or self.time_s >= next_record:
+                rows.append(self.estimate())
+                next_record = self.time_s + every
+        return pd.DataFrame(rows, columns=estimate_columns)
+
+
+def main(argv=None):
+    """Command line entry point (headspace-twin): replay a historian CSV."""
+    import model_cli
+
+    p = model_cli.parser("Replay historian data through the headspace twin")
+    p.add_argument("csv", help="historian export with the columns of twin_settings['columns']")
+    p.add_argument("--every", type=float, default=twin_settings["record_every_s"], help="seconds between estimates")
+    args = p.parse_args(argv)
+    try:
+        overrides = model_cli.parse_overrides(args.overrides)
+    except ValueError as e:
+        p.error(str(e))
+    estimates = HeadspaceTwin(**overrides).run(replay_csv(args.csv), args.every)
+    model_cli.write_result(estimates.iloc[-1:] if args.output is None else estimates, args.output)
+    return estimates
+
+
+if __name__ == "__main__":
+    import time
+
+    days = 30
+    twin = HeadspaceTwin()
+    start = time.perf_counter()
+    estimates = twin.run(synthetic_measurements(days * 24, h2_yield=0.008, purge_effectiveness=0.8), 3600)
+    elapsed = time.perf_counter() - start
+    print(f"{twin.samples:,} samples ({days} days at 1 Hz) in {elapsed:.1f} s, "
+          f"{twin.samples / elapsed:,.0f} samples/s ({days * 86400 / elapsed:,.0f}x real time)")
+    print("truth: h2_yield 0.008, purge_effectiveness 0.8")
+    print(estimates.iloc[[1, 6, 24, 24 * 7, -1]].round(5).to_string(index=False))
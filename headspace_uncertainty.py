@@ -0,0 +1,249 @@
+"""
+Headspace H2 Uncertainty
+
+Probability that H2 in the reactor headspace exceeds 10% of its LEL, and
+which uncertain input drives it, for the model of
+reactor_headspace_simulation.py with uncertain h2_yield_per_fayalite,
+fayalite_conversion, CO2_feed_purity and CO2_purge_wt_fraction.
+
+The inputs are drawn as quasi-Monte-Carlo samples (scrambled Sobol or Latin
+hypercube) and all samples are evaluated at once. No time loop is needed:
+in simulate() every impurity enters at a constant rate F_i and leaves with
+the purge p at its mole fraction, and the total amount is linear in the
+impurity amounts, N = N0 + gamma * g, so all of them follow n_i = F_i * g(t)
+with
+
+    dg/dt = 1 - p g / (N0 + gamma g),   gamma = sum_i F_i (1 - v_i / v_CO2)
+
+which separates. With y = -ln(1 - k g / N0) and k = p - gamma:
+
+    t(y) = N0 / k**2 * (p y - gamma (1 - exp(-y)))
+
+t(y) is inverted by a few Newton steps for the H2 vol% at the end of the run,
+and evaluated directly for the time the warning level is reached. This is
+the simulate() recursion in continuous time (dt = 1 min against a purge time
+constant of ~1000 h; the __main__ check compares both).
+
+Sobol indices use the Saltelli design: sample matrices A and B and the d
+matrices A with column i from B, n * (d + 2) model evaluations, with the
+Saltelli (2010) first-order and Jansen total-effect estimators.
+
+Required packages:
+pip install numpy scipy coolprop
+"""
+
+import numpy as np
+
+import reactor_headspace_simulation as headspace
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+# input: (distribution, parameters) with "uniform" / "loguniform" (low, high),
+# "triangular" (low, mode, high) or "normal" (mean, sd)
+uncertainty = {
+    "h2_yield_per_fayalite": ("loguniform", 0.001, 0.02),  # 0.5 % from one paper
+    "fayalite_conversion": ("uniform", 0.2, 0.5),
+    "CO2_feed_purity": ("uniform", 0.995, 0.999),
+    "CO2_purge_wt_fraction": ("uniform", 0.005, 0.02),
+}
+
+uq_settings = {
+    "samples": 2 ** 16,  # base samples n; Sobol indices take n * (d + 2) evaluations
+    "method": "sobol",  # "sobol" (scrambled, n rounded up to a power of two) or "lhs"
+    "seed": 0,
+    "threshold_vol_pct": headspace.H2_LEL_WARNING_PCT,
+}
+
+
+# -----------------------------
+# Sampling
+# -----------------------------
+def _unit_samples(n, d, method, seed):
+    from scipy.stats import qmc
+
+    if method == "sobol":
+        return qmc.Sobol(d, scramble=True, rng=seed).random_base2(int(np.ceil(np.log2(n))))
+    if method == "lhs":
+        return qmc.LatinHypercube(d, rng=seed).random(n)
+    raise ValueError(f"Unknown sampling method: {method} (use 'sobol' or 'lhs')")
+
+
+def _transform(u, spec):
+    """Unit samples to the distribution spec = (name, *parameters)."""
+    from scipy import stats
+
+    name, *par = spec
+    if name == "uniform":
+        return par[0] + u * (par[1] - par[0])
+    if name == "loguniform":
+        return np.exp(np.log(par[0]) + u * (np.log(par[1]) - np.log(par[0])))
+    if name == "triangular":
+        low, mode, high = par
+        return stats.triang.ppf(u, (mode - low) / (high - low), loc=low, scale=high - low)
+    if name == "normal":
+        return stats.norm.ppf(u, loc=par[0], scale=par[1])
+    raise ValueError(f"Unknown distribution: {name}")
+
+
+def sample(n=None, method=None, seed=None, distributions=None):
+    """
+    Quasi-random samples of the uncertain inputs.
+
+    Returns a dict {input: array (n,)}; with method "sobol" n is rounded up
+    to a power of two.
+    """
+    s = uq_settings
+    distributions = distributions or uncertainty
+    u = _unit_samples(n or s["samples"], len(distributions), method or s["method"],
+                      s["seed"] if seed is None else seed)
+    return {name: _transform(u[:, i], spec) for i, (name, spec) in enumerate(distributions.items())}
+
+
+# -----------------------------
+# Vectorized model
+# -----------------------------
+def _inventory(**inputs):
+    """N0, gamma, p, F_N2, F_H2 and the molar volumes for (arrays of) inputs."""
+    d = headspace.derived(**inputs)
+    v_CO2 = d["Vmol_CO2"]
+    F_N2, F_H2 = d["N2_feed_molph"], d["H2_feed_molph"]
+    gamma = F_N2 * (1 - d["Vmol_N2"] / v_CO2) + F_H2 * (1 - d["Vmol_H2"] / v_CO2)
+    return d, d["headspace_mol"], gamma, d["purge_molph"], F_N2, F_H2
+
+
+def _time(y, N0, gamma, p, k):
+    return N0 / k ** 2 * (p * y - gamma * (1 - np.exp(-y)))
+
+
+def h2_peak(time_h=None, **inputs):
+    """
+    H2 and N2 vol% (as simulate() reports them: partial volume / headspace)
+    after time_h hours (default config time_h), and the time [h] at which H2
+    reaches the warning level (inf if it never does), for scalar or array
+    inputs (any keys of headspace.config).
+
+    Returns a dict of arrays: vol_pct_H2, vol_pct_N2, hours_to_threshold.
+    """
+    d, N0, gamma, p, F_N2, F_H2 = _inventory(**inputs)
+    t = d["config"]["time_h"] if time_h is None else time_h
+    k = p - gamma
+
+    # Newton on t(y) = t, started from the gamma = 0 solution
+    y = k ** 2 * t / (N0 * p)
+    for _ in range(30):
+        step = (_time(y, N0, gamma, p, k) - t) / (N0 / k ** 2 * (p - gamma * np.exp(-y)))
+        y = y - step
+        if np.max(np.abs(step)) < 1e-12 * max(1.0, np.max(np.abs(y))):
+            break
+    g = N0 / k * -np.expm1(-y)
+    V = d["headspace_volume_m3"]
+
+    # Time to the warning level: g at the threshold, if below the steady state N0 / k
+    g_threshold = uq_settings["threshold_vol_pct"] / 100 * V / (F_H2 * d["Vmol_H2"])
+    reachable = g_threshold * k < N0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y_threshold = -np.log1p(-np.where(reachable, g_threshold * k / N0, 0.0))
+    hours = np.where(reachable, _time(y_threshold, N0, gamma, p, k), np.inf)
+    return {
+        "vol_pct_H2": 100 * F_H2 * g * d["Vmol_H2"] / V,
+        "vol_pct_N2": 100 * F_N2 * g * d["Vmol_N2"] / V,
+        "hours_to_threshold": hours,
+    }
+
+
+# -----------------------------
+# Analysis
+# -----------------------------
+def exceedance(n=None, method=None, seed=None, **overrides):
+    """
+    Probability that H2 exceeds the warning level within time_h.
+
+    Returns a dict: probability, its standard error (binomial, conservative
+    for QMC), the sampled inputs and the h2_peak() arrays.
+    """
+    inputs = sample(n, method, seed)
+    out = h2_peak(**{**overrides, **inputs})
+    exceeds = out["hours_to_threshold"] <= headspace.resolve(**overrides)["time_h"]
+    prob = exceeds.mean()
+    return {"probability": prob, "std_error": np.sqrt(prob * (1 - prob) / exceeds.size), "inputs": inputs, **out}
+
+
+def sobol_indices(n=None, method=None, seed=None, output="vol_pct_H2", **overrides):
+    """
+    First-order and total Sobol indices of an h2_peak() output (default the
+    H2 vol% at time_h) for the uncertain inputs, from n base samples
+    (n * (d + 2) evaluations).
+
+    Returns a DataFrame indexed by input with first_order and total, and the
+    exceedance probability over the A and B samples in its attrs.
+    """
+    import pandas as pd
+
+    names = list(uncertainty)
+    d = len(names)
+    # One 2d-dimensional sequence: its first d columns are A, the last d are B
+    doubled = {**uncertainty, **{f"{name} (B)": spec for name, spec in uncertainty.items()}}
+    both = sample(n, method, seed, doubled)
+    A = {name: both[name] for name in names}
+    B = {name: both[f"{name} (B)"] for name in names}
+
+    def model(inputs):
+        return h2_peak(**{**overrides, **inputs})
+
+    out_A, out_B = model(A), model(B)
+    f_A, f_B = out_A[output], out_B[output]
+    variance = np.var(np.concatenate([f_A, f_B]))
+    first, total = [], []
+    for name in names:
+        f_AB = model({**A, name: B[name]})[output]
+        first.append(np.mean(f_B * (f_AB - f_A)) / variance)
+        total.append(0.5 * np.mean((f_A - f_AB) ** 2) / variance)
+
+    time_h = headspace.resolve(**overrides)["time_h"]
+    hours = np.concatenate([out_A["hours_to_threshold"], out_B["hours_to_threshold"]])
+    table = pd.DataFrame({"first_order": first, "total": total}, index=pd.Index(names, name="input"))
+    table.attrs = {"output": output, "samples": f_A.size, "evaluations": f_A.size * (d + 2),
+                   "exceedance_probability": float(np.mean(hours <= time_h)), "mean": float(np.mean(f_A)),
+                   "p95": float(np.quantile(np.concatenate([f_A, f_B]), 0.95))}
+    return table
+
+
+def main(argv=None):
+    """Command line entry point (headspace-uq): exceedance probability and Sobol indices."""
+    import model_cli
+
+    p = model_cli.parser("Probability of H2 above 10% LEL and Sobol indices of the headspace model")
+    p.add_argument("--samples", type=int, default=uq_settings["samples"], help="base samples n")
+    p.add_argument("--method", choices=["sobol", "lhs"], default=uq_settings["method"])
+    p.add_argument("--seed", type=int, default=uq_settings["seed"])
+    args = p.parse_args(argv)
+    try:
+        overrides = model_cli.parse_overrides(args.overrides)
+    except ValueError as e:
+        p.error(str(e))
+    table = sobol_indices(args.samples, args.method, args.seed, **overrides)
+    a = table.attrs
+    print(f"P(H2 > {uq_settings['threshold_vol_pct']} vol% within {headspace.resolve(**overrides)['time_h']} h) = "
+          f"{a['exceedance_probability']:.4f}  ({a['evaluations']:,} evaluations, mean H2 {a['mean']:.3f} vol%, "
+          f"P95 {a['p95']:.3f} vol%)")
+    model_cli.write_result(table, args.output)
+    return table
+
+
+if __name__ == "__main__":
+    import time
+
+    # Closed form against the time-stepped model at the configured point and at a corner
+    for inputs in ({}, {"h2_yield_per_fayalite": 0.02, "CO2_purge_wt_fraction": 0.005}):
+        stepped = headspace.simulate(**inputs)
+        closed = h2_peak(time_h=len(stepped["time_h"]) * headspace.config["dt"], **inputs)
+        print(f"{inputs or 'config'}: simulate {stepped['vol_pct_H2'][-1]:.5f} vol% H2, "
+              f"closed form {float(closed['vol_pct_H2']):.5f} vol%")
+
+    start = time.perf_counter()
+    table = sobol_indices(2 ** 20)
+    print(f"\n{table.attrs['evaluations']:,} evaluations in {time.perf_counter() - start:.1f} s, "
+          f"P(exceed) = {table.attrs['exceedance_probability']:.4f}")
+    print(table.round(3).to_string())
@@ -0,0 +1,267 @@
+"""
+Grinding Energy vs Reaction Temperature Cost Optimizer
+
+The milling notebooks calibrate the specific grinding energy
+(sge = 50 * (d_ref/d)**0.5 kWh/t) and the temperature for equal kinetics
+separately and only plot them. This module puts a price on both sides and
+finds the cheapest (particle size, reactor temperature) pair that reaches a
+target conversion.
+
+Per tonne of mineral:
+- grinding:  SGE(d) [kWh/t] at the electricity price
+- heating:   sensible heat of minerals, water and reactor steel from ambient
+             to T, plus insulation losses during heat-up and reaction, at the
+             heat price. Batch masses, heat capacities, reactor geometry, U·A
+             of the insulation and the heater duty are the constants of the
+             OBX heat model ("OBX heating/OBX heat up and down simulation V2.py").
+- reaction:  first order, time to conversion X is -ln(1 - X) / k(T, d), with
+             k from milling_kinetics, scaled so that k(T_ref, d_ref) = k_ref.
+
+Every candidate is evaluated as one array expression, so thousands of (d, T)
+pairs cost a few milliseconds. The energy use per candidate does not depend on
+prices; evaluate once and re-price with price_sweep() when tariffs change.
+
+Required packages:
+pip install numpy pandas
+"""
+
+import math
+
+import numpy as np
+
+from milling_kinetics import R, kinetics, rate_constant, specific_grinding_energy
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+# Batch and reactor constants of the OBX heat model
+obx = {
+    "Mineral_weight": 350,  # kg
+    "Water_weight": 150,  # kg
+    "cp_minerals": 900,  # J/kg.K
+    "cp_water": 4186,  # J/kg.K
+    "cp_steel": 500,  # J/kg.K
+    "rho_steel": 8000,  # kg/m3
+    "diameter": 1.5,  # m
+    "height": 2.0,  # m
+    "thickness": 0.03,  # m
+    "pipe_length": 10,  # m, each way
+    "pipe_diameter": 0.0254,  # m
+    "U_pipe_outside": 2,  # W/m2.K
+    "U_jacket_outside": 2,  # W/m2.K
+    "U_reactor_outside": 3,  # W/m2.K
+    "heater_max_duty": 96e3,  # W
+    "ambient_temp": 25,  # °C
+    "jacket_max_temp": 240,  # °C
+}
+
+cost_settings = {
+    "electricity_price": 0.15,  # €/kWh, grinding
+    "heat_price": None,  # €/kWh of heat; None = electricity_price / heater_efficiency
+    "heater_efficiency": 1.0,  # electric oil heater
+    "conversion": 0.9,  # target conversion
+    "k_ref": 1.0,  # 1/h, first-order rate constant at T_ref and d_ref
+    "max_reaction_time_h": None,  # optional cap on the reaction time
+}
+
+
+def _settings(overrides):
+    unknown = set(overrides) - set(cost_settings) - set(obx)
+    if unknown:
+        raise KeyError(f"Unknown settings: {sorted(unknown)}")
+    s = dict(obx)
+    s.update(cost_settings)
+    s.update(overrides)
+    if s["heat_price"] is None:
+        s["heat_price"] = s["electricity_price"] / s["heater_efficiency"]
+    return s
+
+
+# -----------------------------
+# OBX reactor constants
+# -----------------------------
+def batch_heat_capacity(s=None):
+    """J/K of one batch: minerals, water, jacket shell and reactor ends (as in the OBX model)."""
+    s = s or _settings({})
+    radius = s["diameter"] / 2
+    shell_volume = math.pi * (radius**2 - (radius - s["thickness"])**2) * s["height"]
+    end_volume = 2 * math.pi * radius**2 * s["thickness"]
+    steel = (shell_volume + end_volume) * s["rho_steel"] * s["cp_steel"]
+    contents = s["Mineral_weight"] * s["cp_minerals"] + s["Water_weight"] * s["cp_water"]
+    return steel + contents
+
+
+def loss_coefficient(s=None):
+    """W/K insulation loss to ambient: both oil pipes, jacket shell, reactor top and bottom."""
+    s = s or _settings({})
+    radius = s["diameter"] / 2
+    pipe_area = math.pi * s["pipe_diameter"] * s["pipe_length"]
+    return (2 * s["U_pipe_outside"] * pipe_area
+            + s["U_jacket_outside"] * math.pi * s["diameter"] * s["height"]
+            + s["U_reactor_outside"] * 2 * math.pi * radius**2)
+
+
+# -----------------------------
+# Energy per candidate
+# -----------------------------
+def evaluate_energy(d, T_C, **overrides):
+    """
+    Energy use of every (d, T) candidate; d and T_C broadcast against each other.
+
+    Parameters:
+    -----------
+    d : array, µm
+    T_C : array, °C
+    overrides :
+        Any key of cost_settings or obx
+
+    Returns:
+    --------
+    dict of arrays: d, T_C, k [1/h], heat_up_time_h, reaction_time_h,
+    grinding_kWh_per_t, heating_kWh_per_t and feasible (T reachable within the
+    jacket limit and reaction time within max_reaction_time_h).
+    """
+    s = _settings(overrides)
+    d, T_C = np.broadcast_arrays(np.asarray(d, dtype=float), np.asarray(T_C, dtype=float))
+    T_K = T_C + 273.15
+
+    # First order kinetics calibrated to k_ref at the reference point
+    A = s["k_ref"] * np.exp(kinetics["Ea"] / (R * kinetics["T_ref"]))
+    k = rate_constant(T_K, d, A=A)
+    reaction_time_h = -np.log(1 - s["conversion"]) / k
+
+    C = batch_heat_capacity(s)
+    UA = loss_coefficient(s)
+    dT = np.maximum(T_C - s["ambient_temp"], 0.0)
+    # Heat-up at full duty; losses then at roughly half the final excess temperature
+    heat_up_time_h = C * dT / np.maximum(s["heater_max_duty"] - UA * dT / 2, 1e-9) / 3600
+    heating_J = C * dT + UA * dT * (heat_up_time_h / 2 + reaction_time_h) * 3600
+    tonnes = s["Mineral_weight"] / 1000
+
+    feasible = (T_C <= s["jacket_max_temp"]) & (UA * dT < s["heater_max_duty"])
+    if s["max_reaction_time_h"] is not None:
+        feasible &= reaction_time_h <= s["max_reaction_time_h"]
+
+    return {
+        "d": d,
+        "T_C": T_C,
+        "k": k,
+        "heat_up_time_h": heat_up_time_h,
+        "reaction_time_h": reaction_time_h,
+        "grinding_kWh_per_t": specific_grinding_energy(d),
+        "heating_kWh_per_t": heating_J / 3.6e6 / tonnes,
+        "feasible": feasible,
+    }
+
+
+def price(energy, electricity_price=None, heat_price=None):
+    """Cost per tonne [€/t] of evaluated candidates; infeasible candidates cost inf."""
+    s = _settings({k: v for k, v in (("electricity_price", electricity_price),
+                                      ("heat_price", heat_price)) if v is not None})
+    cost = (s["electricity_price"] * energy["grinding_kWh_per_t"]
+            + s["heat_price"] * energy["heating_kWh_per_t"])
+    return np.where(energy["feasible"], cost, np.inf)
+
+
+# -----------------------------
+# Optimizer
+# -----------------------------
+def optimize(d=None, T_C=None, **overrides):
+    """
+    Cheapest particle size and reactor temperature on a (d, T) grid.
+
+    Parameters:
+    -----------
+    d : array, µm, default 1..100 µm (200 log-spaced sizes)
+    T_C : array, °C, default 120..240 °C in 0.5 K steps
+    overrides :
+        Any key of cost_settings or obx (prices, conversion, k_ref, ...)
+
+    Returns:
+    --------
+    best : Series
+        d, T_C, reaction and heat-up time, energy and cost breakdown of the optimum
+    grid : DataFrame
+        Every candidate with its energies and cost_per_t (rows T, columns d flattened)
+    """
+    import pandas as pd
+
+    d = np.logspace(0, 2, 200) if d is None else np.asarray(d, dtype=float)
+    T_C = np.arange(120, 240.01, 0.5) if T_C is None else np.asarray(T_C, dtype=float)
+    s = _settings(overrides)
+    energy = evaluate_energy(d[None, :], T_C[:, None], **overrides)
+    cost = price(energy, s["electricity_price"], s["heat_price"])
+
+    grid = pd.DataFrame({k: np.ravel(v) for k, v in energy.items()})
+    grid["grinding_cost_per_t"] = s["electricity_price"] * grid["grinding_kWh_per_t"]
+    grid["heating_cost_per_t"] = s["heat_price"] * grid["heating_kWh_per_t"]
+    grid["cost_per_t"] = cost.ravel()
+    if not np.isfinite(cost).any():
+        raise ValueError("No feasible (d, T) candidate on the grid")
+    best = grid.iloc[int(np.argmin(cost))]
+    return best, grid
+
+
+def price_sweep(energy, electricity_prices, heat_prices=None, heater_efficiency=None):
+    """
+    Optimum for many price scenarios at once, reusing one evaluate_energy() result.
+
+    electricity_prices and heat_prices (€/kWh of heat) broadcast against each
+    other; heat_prices defaults to electricity_prices / heater_efficiency
+    (default cost_settings["heater_efficiency"]), as in price() and optimize().
+    Returns one row per scenario with the optimal d, T_C and cost.
+    """
+    import pandas as pd
+
+    electricity_prices = np.atleast_1d(np.asarray(electricity_prices, dtype=float))
+    if heat_prices is None:
+        s = _settings({} if heater_efficiency is None else {"heater_efficiency": heater_efficiency})
+        heat_prices = electricity_prices / s["heater_efficiency"]
+    heat_prices = np.atleast_1d(np.asarray(heat_prices, dtype=float))
+    p_el, p_heat = np.broadcast_arrays(electricity_prices, heat_prices)
+
+    grinding = np.ravel(energy["grinding_kWh_per_t"])
+    heating = np.ravel(energy["heating_kWh_per_t"])
+    feasible = np.ravel(energy["feasible"])
+    # (n_scenarios, n_candidates) in one matrix expression
+    cost = p_el.ravel()[:, None] * grinding[None, :] + p_heat.ravel()[:, None] * heating[None, :]
+    cost[:, ~feasible] = np.inf
+    best = np.argmin(cost, axis=1)
+    rows = np.arange(best.size)
+    return pd.DataFrame({
+        "electricity_price": p_el.ravel(),
+        "heat_price": p_heat.ravel(),
+        "d": np.ravel(energy["d"])[best],
+        "T_C": np.ravel(energy["T_C"])[best],
+        "reaction_time_h": np.ravel(energy["reaction_time_h"])[best],
+        "cost_per_t": cost[rows, best],
+    })
+
+
+def main(argv=None):
+    """Command line entry point (milling-cost): the optimum of optimize with --set overrides."""
+    import model_cli
+
+    return model_cli.run(lambda **overrides: optimize(**overrides)[0],
+                         "Cheapest grinding size and reaction temperature", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    print(f"Batch heat capacity {batch_heat_capacity() / 1e6:.2f} MJ/K, "
+          f"insulation losses {loss_coefficient():.1f} W/K")
+
+    start = time.perf_counter()
+    best, grid = optimize()
+    elapsed = time.perf_counter() - start
+    print(f"\nEvaluated {len(grid)} (d, T) candidates in {elapsed * 1000:.1f} ms")
+    print(best.to_string())
+
+    # Re-price the same candidates for a range of tariffs: cheap heat favours hot, coarse runs
+    energy = evaluate_energy(np.logspace(0, 2, 200)[None, :], np.arange(120, 240.01, 0.5)[:, None])
+    start = time.perf_counter()
+    sweep = price_sweep(energy, electricity_prices=0.15, heat_prices=np.linspace(0.02, 0.30, 8))
+    print(f"\nPrice sweep in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(sweep.round(3).to_string(index=False))
@@ -0,0 +1,249 @@
+"""
+Milling vs Temperature Kinetics
+
+Vectorized version of the Arrhenius / particle-size model used in
+MillinVSTemperature.ipynb and "Milling vs temperature.ipynb":
+
+    k(T, d) = A * exp(-Ea / (R*T)) * (d_ref / d)      (rate scales with specific surface)
+    SGE(d)  = sge_ref * (d_ref / d)**0.5              (Bond's law, kWh/t)
+
+The notebooks evaluate k one point at a time ([rate_constant(T_ref, d) for d
+in ...]) and solve the "temperature for equal kinetics" per particle size.
+Here every function broadcasts over arrays, so full (T, d) grids are single
+numpy expressions, and the model is inverted analytically:
+
+    T(k, d) = Ea / (R * ln(A * d_ref / (d * k)))
+
+Ea and A can be fitted from measured (T, k) pairs for many experiments at
+once (linear least squares on ln k vs 1/T).
+
+Temperatures in K, particle sizes in µm, energies in J/mol.
+
+Required packages:
+pip install numpy scipy pandas
+"""
+
+import numpy as np
+
+from psd_fitting import masked_linear_fit
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+R = 8.314  # Gas constant in J/(mol K)
+
+kinetics = {
+    "A": 1e6,  # Pre-exponential factor (example value)
+    "Ea": 82.6e3,  # Activation energy in J/mol (example)
+    "T_ref": 180 + 273.15,  # Reference temperature in K
+    "d_ref": 20,  # Reference particle size in microns
+    "sge_ref": 50,  # Specific grinding energy at d_ref, kWh/t
+    "bond_exponent": 0.5,  # SGE ∝ d**-0.5 (Bond's law)
+}
+
+
+def _param(name, value):
+    return kinetics[name] if value is None else value
+
+
+# -----------------------------
+# Forward model
+# -----------------------------
+def rate_constant(T, d, A=None, Ea=None, d_ref=None):
+    """k(T, d); T and d broadcast against each other."""
+    A, Ea, d_ref = _param("A", A), _param("Ea", Ea), _param("d_ref", d_ref)
+    T = np.asarray(T, dtype=float)
+    d = np.asarray(d, dtype=float)
+    return A * np.exp(-Ea / (R * T)) * (d_ref / d)
+
+
+def rate_surface(T, d, A=None, Ea=None, d_ref=None):
+    """k on the full grid: rows are temperatures, columns are particle sizes."""
+    return rate_constant(np.asarray(T, dtype=float)[:, None], np.asarray(d, dtype=float)[None, :],
+                         A, Ea, d_ref)
+
+
+def specific_grinding_energy(d, sge_ref=None, d_ref=None, bond_exponent=None):
+    """Specific grinding energy [kWh/t] to reach particle size d, calibrated at d_ref."""
+    sge_ref, d_ref = _param("sge_ref", sge_ref), _param("d_ref", d_ref)
+    bond_exponent = _param("bond_exponent", bond_exponent)
+    return sge_ref * (d_ref / np.asarray(d, dtype=float)) ** bond_exponent
+
+
+# -----------------------------
+# Inverse model
+# -----------------------------
+def temperature_for_rate(k, d, A=None, Ea=None, d_ref=None):
+    """Temperature [K] at which particles of size d react with rate constant k."""
+    A, Ea, d_ref = _param("A", A), _param("Ea", Ea), _param("d_ref", d_ref)
+    k = np.asarray(k, dtype=float)
+    d = np.asarray(d, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        T = Ea / (R * np.log(A * d_ref / (d * k)))
+    # ln(...) <= 0 means k is not reachable at any finite temperature
+    return np.where(T > 0, T, np.nan)
+
+
+def equal_kinetics_temperature(d, T_ref=None, d_ref=None, A=None, Ea=None):
+    """Temperature [K] giving particles of size d the same k as d_ref at T_ref."""
+    T_ref, d_ref = _param("T_ref", T_ref), _param("d_ref", d_ref)
+    k_ref = rate_constant(T_ref, d_ref, A, Ea, d_ref)
+    return temperature_for_rate(k_ref, d, A, Ea, d_ref)
+
+
+def equivalent_temperature(d, T_ref=None, d_ref=None, A=None, Ea=None):
+    """
+    Temperature [K] at which d_ref particles react as fast as size d does at T_ref.
+
+    This is the "temperature for equal kinetics" curve plotted in the notebooks
+    (finer milling is worth a higher temperature); equal_kinetics_temperature is
+    the mirror question (which temperature size d needs to keep the reference rate).
+    """
+    T_ref, d_ref = _param("T_ref", T_ref), _param("d_ref", d_ref)
+    k_d = rate_constant(T_ref, d, A, Ea, d_ref)
+    return temperature_for_rate(k_d, d_ref, A, Ea, d_ref)
+
+
+# -----------------------------
+# Calibration
+# -----------------------------
+def calibrate_from_rate_ratio(T_ref, T_increase, rate_ratio=2.0, k_ref=5.0):
+    """
+    Ea and A from "the rate multiplies by rate_ratio between T_ref and T_increase",
+    with k(T_ref) = k_ref, as in the first cell of MillinVSTemperature.ipynb.
+    """
+    Ea = -np.log(rate_ratio) * R / (1 / np.asarray(T_increase) - 1 / np.asarray(T_ref))
+    A = k_ref / np.exp(-Ea / (R * np.asarray(T_ref)))
+    return A, Ea
+
+
+def fit_arrhenius(data, confidence=0.95, d_ref=None):
+    """
+    Fit Ea and A per experiment from measured rate constants.
+
+    Parameters:
+    -----------
+    data : DataFrame
+        Columns experiment, T (K), k and optionally d (µm). With d, the
+        rate is first scaled to d_ref (k * d / d_ref) so that A refers to the
+        reference size.
+    d_ref : float, optional
+        Reference size [µm] of A, default kinetics["d_ref"]; pass the same
+        value to rate_constant() with the fitted A.
+
+    Returns:
+    --------
+    DataFrame with one row per experiment: n_points, Ea, Ea_low, Ea_high [J/mol],
+    A, A_low, A_high and r2 of ln k vs 1/T.
+    """
+    import pandas as pd
+
+    data = data[(data["k"] > 0) & (data["T"] > 0)]
+    k = data["k"].to_numpy(dtype=float)
+    if "d" in data:
+        k = k * data["d"].to_numpy(dtype=float) / _param("d_ref", d_ref)
+
+    groups = data.groupby("experiment", sort=False)
+    series_id = groups.ngroup().to_numpy()
+    position = groups.cumcount().to_numpy()
+    experiments = data["experiment"].drop_duplicates().to_numpy()
+    width = position.max() + 1 if len(position) else 0
+    x = np.ones((experiments.size, width))
+    y = np.ones((experiments.size, width))
+    mask = np.zeros((experiments.size, width), dtype=bool)
+    x[series_id, position] = 1 / data["T"].to_numpy(dtype=float)
+    y[series_id, position] = np.log(k)
+    mask[series_id, position] = True
+
+    slope, intercept, se_slope, se_intercept, t_crit, n, r2 = masked_linear_fit(x, y, mask, confidence)
+    return pd.DataFrame({
+        "experiment": experiments,
+        "n_points": n.astype(int),
+        "Ea": -slope * R,
+        "Ea_low": -(slope + t_crit * se_slope) * R,
+        "Ea_high": -(slope - t_crit * se_slope) * R,
+        "A": np.exp(intercept),
+        "A_low": np.exp(intercept - t_crit * se_intercept),
+        "A_high": np.exp(intercept + t_crit * se_intercept),
+        "r2": r2,
+    })
+
+
+# -----------------------------
+# Trade-off surface
+# -----------------------------
+def trade_off_surface(T, d, T_ref=None, d_ref=None, A=None, Ea=None):
+    """
+    Grinding energy vs reaction temperature trade-off on a (T, d) grid.
+
+    Returns a dict of 2-D arrays (rows T, columns d): k, relative rate
+    k / k(T_ref, d_ref), and the specific grinding energy; plus the 1-D
+    equal-kinetics temperature per particle size.
+    """
+    T_ref, d_ref = _param("T_ref", T_ref), _param("d_ref", d_ref)
+    T = np.asarray(T, dtype=float)
+    d = np.asarray(d, dtype=float)
+    k = rate_surface(T, d, A, Ea, d_ref)
+    k_ref = rate_constant(T_ref, d_ref, A, Ea, d_ref)
+    sge = specific_grinding_energy(d, d_ref=d_ref)
+    return {
+        "T": T,
+        "d": d,
+        "k": k,
+        "relative_rate": k / k_ref,
+        "sge": np.broadcast_to(sge, k.shape),
+        "equal_kinetics_T": equal_kinetics_temperature(d, T_ref, d_ref, A, Ea),
+    }
+
+
+def main(argv=None):
+    """
+    Command line entry point (milling-kinetics): temperature for equal
+    kinetics and grinding energy per particle size, --set "d=[5, 10, 40]"
+    and T_ref, d_ref, A, Ea overrides (K, µm, J/mol).
+    """
+    import model_cli
+    import pandas as pd
+
+    def table(d=(1, 2, 5, 10, 20, 50, 100), T_ref=None, d_ref=None, A=None, Ea=None):
+        d = np.atleast_1d(np.asarray(d, dtype=float))
+        return pd.DataFrame({
+            "d_um": d,
+            "equal_kinetics_T_C": equal_kinetics_temperature(d, T_ref, d_ref, A, Ea) - 273.15,
+            "k_at_T_ref": rate_constant(_param("T_ref", T_ref), d, A, Ea, d_ref),
+            "sge_kWh_per_t": specific_grinding_energy(d, d_ref=d_ref),
+        })
+
+    return model_cli.run(table, "Milling size vs reaction temperature for equal kinetics", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    import pandas as pd
+
+    # "Milling vs temperature.ipynb": equal kinetics over 1..100 µm
+    particle_sizes = np.logspace(0, 2, 50)
+    T_equal = equal_kinetics_temperature(particle_sizes) - 273.15
+    sge = specific_grinding_energy(particle_sizes)
+    for d, T_C, e in list(zip(particle_sizes, T_equal, sge))[::7]:
+        print(f"d = {d:6.1f} µm -> {T_C:6.1f} °C for equal kinetics, SGE {e:6.1f} kWh/t")
+
+    # 10^6 point trade-off surface
+    start = time.perf_counter()
+    surface = trade_off_surface(np.linspace(140, 220, 1000) + 273.15, np.logspace(0, 2, 1000))
+    print(f"\n1000 x 1000 trade-off surface in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Batch Arrhenius fit on synthetic experiments generated with the notebook's doubling calibration
+    A_cal, Ea_cal = calibrate_from_rate_ratio(170 + 273.15, 180 + 273.15)
+    rng = np.random.default_rng(1)
+    rows = []
+    for exp_id in range(200):
+        for T in np.linspace(150, 200, 6) + 273.15:
+            k = A_cal * np.exp(-Ea_cal / (R * T)) * rng.lognormal(0, 0.05)
+            rows.append({"experiment": exp_id, "T": T, "k": k})
+    start = time.perf_counter()
+    fitted = fit_arrhenius(pd.DataFrame(rows))
+    print(f"Fitted {len(fitted)} experiments in {(time.perf_counter() - start) * 1000:.1f} ms; "
+          f"calibrated Ea = {Ea_cal / 1000:.1f} kJ/mol, fitted median {fitted['Ea'].median() / 1000:.1f} kJ/mol")
@@ -0,0 +1,111 @@
+"""
+Model Command Lines
+
+Shared argument handling of the console scripts in pyproject.toml. Every
+model runs with key=value overrides of its configuration block and prints
+its result table or writes it to a file:
+
+    obx-heat --set dt=10 --set oil_max_temp=250 --output run.csv
+    headspace --set time_h=500 --set CO2_purge_wt_fraction=0.02
+    permco2-sizing --set "mass_flow_CO2=[0.02, 0.04]" --output coils.parquet
+    tank-levels --store --set hours=72
+
+With --store (models in result_store.models) a run with the same inputs and
+model source is read back from the result store instead of recomputed.
+
+Values are Python literals (numbers, lists, True/None, quoted strings);
+anything else is taken as a string, so --set exchanger_model=limits works.
+
+Only the standard library is imported here; pandas is imported when a
+result is written.
+
+Required packages:
+pip install pandas (pyarrow for .parquet output)
+"""
+
+import argparse
+import ast
+import os
+
+
+def parse_value(text):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def parse_overrides(items):
+    """["key=value", ...] -> {key: value}."""
+    overrides = {}
+    for item in items or []:
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"Expected KEY=VALUE, got {item!r}")
+        overrides[key.strip()] = parse_value(value.strip())
+    return overrides
+
+
+def parser(description):
+    """ArgumentParser with the shared --set and --output options."""
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                   help="override a configuration value (repeatable)")
+    p.add_argument("-o", "--output", help="write the result to .csv, .parquet or .json instead of printing it")
+    return p
+
+
+def write_result(result, path=None):
+    """Print a DataFrame / Series / dict result, or save it by file extension."""
+    import pandas as pd
+
+    if isinstance(result, dict):
+        result = pd.Series(result)
+    if isinstance(result, pd.Series):
+        result = result.to_frame("value")
+    if path is None:
+        print(result.to_string())
+        return None
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        result.to_csv(path, index=not isinstance(result.index, pd.RangeIndex))
+    elif ext == ".parquet":
+        result.to_parquet(path)
+    elif ext == ".json":
+        result.to_json(path, orient="table", indent=2)
+    else:
+        raise ValueError(f"Unknown output format: {ext} (use .csv, .parquet or .json)")
+    return path
+
+
+def run(model, description, argv=None, store_name=None):
+    """
+    Parse argv, call model(**overrides) and print or save its result.
+
+    Parameters:
+    -----------
+    model : callable taking the overrides as keyword arguments and returning
+        a DataFrame, Series or dict
+    description : shown by --help
+    store_name : name of the model in result_store.models; adds --store and
+        --force, which run it through the result store (stored runs are read
+        back instead of recomputed)
+    """
+    p = parser(description)
+    if store_name is not None:
+        p.add_argument("--store", nargs="?", const="", default=None, metavar="DIR",
+                       help="read / save the run in the result store (default directory .results)")
+        p.add_argument("--force", action="store_true", help="with --store: recompute a stored run")
+    args = p.parse_args(argv)
+    try:
+        overrides = parse_overrides(args.overrides)
+    except ValueError as e:
+        p.error(str(e))
+    if store_name is not None and args.store is not None:
+        from result_store import ResultStore
+
+        result = ResultStore(args.store or None).run(store_name, force=args.force, **overrides)
+    else:
+        result = model(**overrides)
+    write_result(result, args.output)
+    return result
@@ -0,0 +1,243 @@
+"""
+OBX Heater Controller and Tuning Harness
+
+The V2 script sets the heater exit temperature with a hand-tuned P law,
+
+    T_heater_exit = min(oil_max_temp, T_oil + K_p * (T_setpoint - T_reactor))
+
+This module generalizes it to P / PI / PID on the same output
+u = T_heater_exit - T_oil (K):
+
+    u = K_p * e + K_i * integral(e dt) + K_d * de/dt
+
+P is K_i = K_d = 0 and gives the script's results unchanged. The actuator
+saturates at u = 0 (the heater cannot cool) and at u = oil_max_temp - T_oil;
+anti-windup options while saturated:
+
+- "clamp": conditional integration, the integral is held while the output
+  is saturated and the error pushes further into saturation
+- "back_calculation": the integral is bled off by (u_sat - u) / (K_i * T_t)
+  with tracking time T_t (default sqrt(T_i * T_d), or T_i without D)
+- "none"
+
+The controller runs on arrays (one element per scenario) and is called by
+obx_heat_model each time step; gains and options live in
+obx_heat_model.control.
+
+The tuning harness (evaluate_gains, tune_gains) runs every gain set as one
+scenario column of obx_heat_model.simulate, so hundreds of closed-loop runs
+take one vectorized simulation, and scores overshoot, settling time and
+heater energy.
+
+Required packages:
+pip install numpy pandas
+"""
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+anti_windup_modes = ("clamp", "back_calculation", "none")
+
+tuning = {
+    "settling_band": 2.0,  # K around the setpoint
+    "weights": {  # score = sum(weight * metric)
+        "overshoot": 1.0,  # per K above the setpoint
+        "settling_time_h": 5.0,  # per hour
+        "heater_energy_kWh": 0.05,  # per kWh
+    },
+    "K_p_range": (0.5, 500.0),  # searched on a log scale
+    "K_i_range": (1e-4, 0.1),  # 1/s, log scale
+    "K_d_range": (10.0, 10000.0),  # s, log scale
+}
+
+
+# -----------------------------
+# Controller
+# -----------------------------
+def new_state(n):
+    """Integral and previous error of n controllers."""
+    return {"integral": np.zeros(n), "previous_error": np.full(n, np.nan)}
+
+
+def pid_output(state, error, active, K_p, K_i, K_d, dt, u_max, anti_windup="clamp", tracking_time=None):
+    """
+    Controller output u for one time step; updates state in place.
+
+    Parameters:
+    -----------
+    state : from new_state
+    error : setpoint - measurement
+    active : boolean array; inactive controllers keep their integral and
+        restart the derivative when they come back
+    K_p, K_i [1/s], K_d [s] : gains (arrays or scalars)
+    dt : s
+    u_max : upper saturation of u (the lower one is 0)
+    anti_windup : one of anti_windup_modes
+    tracking_time : s, back-calculation T_t; None or NaN for the default
+
+    Returns:
+    --------
+    u before saturation (the caller applies the physical limits, as the
+    script's min(oil_max_temp, ...) does)
+    """
+    previous = state["previous_error"]
+    derivative = np.where(np.isnan(previous), 0.0, (error - previous) / dt)
+    u = K_p * error + K_i * state["integral"] + K_d * derivative
+    u_sat = np.clip(u, 0.0, u_max)
+
+    if anti_windup == "clamp":
+        windup = ((u > u_max) & (error > 0)) | ((u < 0) & (error < 0))
+        integral = state["integral"] + np.where(windup, 0.0, error * dt)
+    elif anti_windup == "back_calculation":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            T_i = K_p / K_i
+            default = np.where(np.asarray(K_d) > 0, np.sqrt(T_i * K_d / K_p), T_i)
+            T_t = default if tracking_time is None else np.where(np.isnan(tracking_time), default, tracking_time)
+            bleed = np.where(np.asarray(K_i) > 0, (u_sat - u) / (K_i * T_t), 0.0)
+        integral = state["integral"] + (error + bleed) * dt
+    elif anti_windup == "none":
+        integral = state["integral"] + error * dt
+    else:
+        raise ValueError(f"Unknown anti_windup: {anti_windup} (use one of {anti_windup_modes})")
+
+    state["integral"] = np.where(active, integral, state["integral"])
+    state["previous_error"] = np.where(active, error, np.nan)
+    return u
+
+
+# -----------------------------
+# Tuning harness
+# -----------------------------
+def score_runs(results, params, settling_band=None, weights=None):
+    """
+    Closed-loop metrics of every scenario column of obx_heat_model.simulate.
+
+    Over the heating and reaction phases: overshoot [K] above the setpoint
+    (reactor_max_temp + setpoint_offset), settling time [h] into
+    +/- settling_band for the rest of the hold (NaN if never), time to
+    reaction temperature [h]; heater energy over the whole run [kWh].
+    """
+    import pandas as pd
+
+    from obx_heat_model import COOLING, REACTION
+
+    settling_band = tuning["settling_band"] if settling_band is None else settling_band
+    weights = weights or tuning["weights"]
+    time_h = results["time"][:, 0] / 3600
+    dt = results["time"][1, 0] - results["time"][0, 0]
+    setpoint = np.array([p["reactor_max_temp"] + p["setpoint_offset"] for p in params])
+    T = results["T_reactor"]
+    controlled = results["status"] != COOLING
+
+    overshoot = np.clip(np.where(controlled, T, -np.inf).max(axis=0) - setpoint, 0, None)
+    outside = controlled & (np.abs(T - setpoint) > settling_band)
+    # Settled after the last step outside the band, if that is before the controlled phase ends
+    last_outside = np.where(outside.any(axis=0), T.shape[0] - 1 - outside[::-1].argmax(axis=0), -1)
+    last_controlled = T.shape[0] - 1 - controlled[::-1].argmax(axis=0)
+    settled = last_outside < last_controlled
+    settling = np.where(settled, time_h[np.minimum(last_outside + 1, T.shape[0] - 1)], np.nan)
+    reached = (results["status"] >= REACTION).any(axis=0)
+    to_reaction = np.where(reached, time_h[(results["status"] >= REACTION).argmax(axis=0)], np.nan)
+    energy = results["Q_heater"].sum(axis=0) * dt / 3.6e6
+
+    metrics = pd.DataFrame({
+        "overshoot": overshoot,
+        "settling_time_h": settling,
+        "time_to_reaction_h": to_reaction,
+        "heater_energy_kWh": energy,
+    })
+    score = sum(w * metrics[name] for name, w in weights.items())
+    metrics["score"] = score.fillna(np.inf)
+    return metrics
+
+
+def evaluate_gains(K_p, K_i=0.0, K_d=0.0, settling_band=None, weights=None, **overrides):
+    """
+    Closed-loop runs for every gain set (arrays broadcast); one vectorized
+    simulation with one scenario column per gain set.
+
+    overrides are obx_heat_model parameters shared by all runs
+    (e.g. anti_windup, heater_max_duty, dt).
+    """
+    import pandas as pd
+
+    import obx_heat_model
+
+    K_p, K_i, K_d = (a.ravel() for a in np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (K_p, K_i, K_d))))
+    scenarios = [{"K_p": p, "K_i": i, "K_d": d} for p, i, d in zip(K_p, K_i, K_d)]
+    results = obx_heat_model.simulate(scenarios, **overrides)
+    params = [obx_heat_model.resolve(**{**overrides, **s}) for s in scenarios]
+    metrics = score_runs(results, params, settling_band, weights)
+    return pd.concat([pd.DataFrame({"K_p": K_p, "K_i": K_i, "K_d": K_d}), metrics], axis=1)
+
+
+def tune_gains(mode="PI", n_grid=None, refine=2, settling_band=None, weights=None, **overrides):
+    """
+    Search gains for a P, PI or PID heater controller.
+
+    A log-spaced grid over the gains of the mode (n_grid per gain, default
+    200 runs for P, 15 x 15 for PI, 7 x 7 x 7 for PID) is evaluated in one
+    vectorized run; each refinement zooms to the neighbouring grid points of
+    the best gain set.
+
+    Returns:
+    --------
+    best : pd.Series (gains and metrics)
+    table : pd.DataFrame of every evaluated gain set, best first
+    """
+    import pandas as pd
+
+    names = {"P": ["K_p"], "PI": ["K_p", "K_i"], "PID": ["K_p", "K_i", "K_d"]}
+    if mode not in names:
+        raise ValueError(f"Unknown mode: {mode} (use one of {list(names)})")
+    gains = names[mode]
+    n_grid = n_grid or {"P": 200, "PI": 15, "PID": 7}[mode]
+    ranges = {name: tuning[f"{name}_range"] for name in gains}
+    tables = []
+    for _ in range(refine + 1):
+        axes = np.meshgrid(*(np.geomspace(*ranges[name], n_grid) for name in gains))
+        table = evaluate_gains(**dict(zip(gains, axes)), settling_band=settling_band, weights=weights, **overrides)
+        tables.append(table)
+        best = table.loc[table["score"].idxmin()]
+        for name in gains:
+            low, high = ranges[name]
+            ratio = (high / low) ** (1 / (n_grid - 1))
+            ranges[name] = (max(low, best[name] / ratio), min(high, best[name] * ratio))
+    table = pd.concat(tables, ignore_index=True).drop_duplicates(["K_p", "K_i", "K_d"])
+    table = table.sort_values("score", ignore_index=True)
+    return table.iloc[0], table
+
+
+def main(argv=None):
+    """Command line entry point (obx-tune): tune_gains with --set mode=P|PI|PID and model overrides."""
+    import model_cli
+
+    return model_cli.run(lambda **overrides: tune_gains(**overrides)[1].head(20),
+                         "OBX heater controller gain search", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    import pandas as pd
+
+    import obx_heat_model
+
+    # Big Huber with 250 °C oil: the script's K_p overshoots and never settles in the hold
+    case = {"heater_max_duty": 96e3, "oil_flow_m3_per_h": 10, "oil_max_temp": 250}
+    baseline = evaluate_gains(obx_heat_model.control["K_p"], **case)
+    print("Script gain:\n" + baseline.to_string(index=False, float_format="%.4g"))
+
+    # Integral action without anti-windup
+    windup = pd.concat([evaluate_gains(5.0, 1e-3, anti_windup=mode, **case).assign(anti_windup=mode)
+                        for mode in ("clamp", "back_calculation", "none")])
+    print("\nPI K_p = 5, K_i = 1e-3:\n" + windup.to_string(index=False, float_format="%.4g"))
+
+    for mode in ("P", "PI", "PID"):
+        start = time.perf_counter()
+        best, table = tune_gains(mode, **case)
+        print(f"\n{mode}: {len(table)} closed-loop runs in {time.perf_counter() - start:.1f} s")
+        print(table.head(3).to_string(index=False, float_format="%.4g"))
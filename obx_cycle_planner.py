@@ -0,0 +1,242 @@
+"""
+OBX Batch Cycle Planner
+
+Chains heat-up / reaction / cool-down cycles of the OBX reactor instead of
+simulating one cycle from ambient, and searches the schedule that gives the
+most batches per 24 h.
+
+One batch cycle:
+1. heating until the reactor reaches reactor_max_temp (obx_heat_model control)
+2. reaction hold for reaction_time
+3. cooling until the reactor is at the cool-down cutoff (<= max_unload_temp)
+4. turnaround: discharge, then the reactor stands empty for turnaround_time
+   and is charged at charge_temp. The heater restarts reheat_lead seconds
+   before the charge to preheat oil and jacket. The charge waits (heater off)
+   while the jacket is hotter than max_charge_jacket_temp.
+
+Oil, jacket and the reactor steel carry their temperatures from one batch to
+the next. The two schedule parameters, cutoff and reheat_lead, trade off
+against each other: a deeper cool-down and a short preheat cost time, while
+a shallow cool-down and a long preheat leave the wall too hot to charge.
+
+Every candidate schedule is one scenario column of the vectorized thermal
+model (obx_heat_model._step), so a grid of schedules runs in one pass.
+
+Required packages:
+pip install numpy pandas
+"""
+
+import numpy as np
+
+import obx_heat_model
+from obx_controller import new_state
+from obx_heat_model import COOLING, HEATING, REACTION
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+planner = {
+    "horizon": 48 * 3600,  # s, simulated time; throughput from the steady cycles
+    "turnaround_time": 1800,  # s, discharge + charge
+    "max_unload_temp": 90,  # °C, reactor contents at discharge
+    "max_charge_jacket_temp": 120,  # °C, wall temperature allowed when charging the slurry
+    "charge_temp": None,  # °C, fresh charge; None for ambient_temp
+    "cutoff_range": (40, 90),  # °C, search range of the cool-down cutoff
+    "reheat_lead_range": (0, 1800),  # s, search range of the reheat start before the charge
+}
+
+TURNAROUND = 3
+status_names = {**obx_heat_model.status_names, TURNAROUND: "turnaround"}
+
+
+def _settings(overrides):
+    plan = {k: overrides.pop(k) for k in list(overrides) if k in planner}
+    merged = dict(planner)
+    merged.update(plan)
+    return merged
+
+
+# -----------------------------
+# Chained cycles
+# -----------------------------
+def simulate_cycles(cutoff, reheat_lead, record=False, **overrides):
+    """
+    Run consecutive batches for one or more schedules.
+
+    Parameters:
+    -----------
+    cutoff : °C, reactor temperature at which cooling stops and the batch is discharged
+    reheat_lead : s, heater restart before the end of the turnaround
+        (both broadcast: one schedule per element)
+    record : also return the time series (n_steps, n_schedules) of
+        T_reactor, T_jacket, T_oil_out_heater, Q_heater, Q_cooler and status
+    overrides : keys of planner and of obx_heat_model (shared by all schedules)
+
+    Returns:
+    --------
+    dict with "completions" (list per schedule of discharge times [s]),
+    "heater_energy" and "cooler_energy" [J] per schedule, and the time series
+    when record is set.
+    """
+    plan = _settings(overrides)
+    overrides.setdefault("end_time", plan["horizon"])
+    cutoff, reheat_lead = (a.ravel() for a in np.broadcast_arrays(np.asarray(cutoff, dtype=float),
+                                                                  np.asarray(reheat_lead, dtype=float)))
+    if np.any(cutoff > plan["max_unload_temp"]):
+        raise ValueError(f"cutoff above max_unload_temp ({plan['max_unload_temp']} °C)")
+    n = cutoff.size
+    params = obx_heat_model._shared([{}] * n, overrides)
+    c = obx_heat_model._constants(params)
+    dt = params[0]["dt"]
+    times = np.arange(0, params[0]["end_time"], dt)
+    charge_temp = c["ambient_temp"] if plan["charge_temp"] is None else np.full(n, float(plan["charge_temp"]))
+    C_full, C_empty = c["C_reactor"], c["C_reactor_empty"]
+    C_contents = C_full - C_empty
+    turnaround = plan["turnaround_time"]
+
+    T_oil = c["ambient_temp"].copy()
+    T_jacket = c["ambient_temp"].copy()
+    T_reactor = c["ambient_temp"].copy()
+    status = np.full(n, HEATING)
+    phase_start = np.zeros(n)
+    completions = [[] for _ in range(n)]
+    heater_energy = np.zeros(n)
+    cooler_energy = np.zeros(n)
+    ctrl = new_state(n)
+    if record:
+        columns = ("T_reactor", "T_jacket", "T_oil_out_heater", "Q_heater", "Q_cooler")
+        series = {name: np.empty((times.size, n)) for name in columns}
+        series["status"] = np.empty((times.size, n), dtype=np.int8)
+
+    for k, t in enumerate(times):
+        # Phase changes
+        start_reaction = (status == HEATING) & (T_reactor >= c["reactor_max_temp"])
+        start_cooling = (status == REACTION) & (t - phase_start >= c["reaction_time"])
+        discharge = (status == COOLING) & (T_reactor <= cutoff)
+        charge = (status == TURNAROUND) & (t - phase_start >= turnaround) & (T_jacket <= plan["max_charge_jacket_temp"])
+        for i in np.flatnonzero(discharge):
+            completions[i].append(t)
+        # The empty reactor is the end caps only; the charge mixes in at charge_temp
+        T_reactor = np.where(charge, (C_empty * T_reactor + C_contents * charge_temp) / C_full, T_reactor)
+        status = np.select([start_reaction, start_cooling, discharge, charge],
+                           [REACTION, COOLING, TURNAROUND, HEATING], status)
+        phase_start = np.where(start_reaction | start_cooling | discharge | charge, t, phase_start)
+
+        in_turnaround = status == TURNAROUND
+        waited = t - phase_start
+        heater_on = (status == HEATING) | (status == REACTION) | (
+            in_turnaround & (waited >= turnaround - reheat_lead) & (waited < turnaround))
+        cooler_on = status == COOLING
+        T_oil, T_jacket, T_reactor, row = obx_heat_model._step(
+            T_oil, T_jacket, T_reactor, heater_on, cooler_on, c, ctrl, np.where(in_turnaround, C_empty, C_full))
+        heater_energy += row["Q_heater"] * dt
+        cooler_energy += row["Q_cooler"] * dt
+        if record:
+            for name in columns:
+                series[name][k] = row[name]
+            series["status"][k] = status
+
+    result = {"completions": completions, "heater_energy": heater_energy, "cooler_energy": cooler_energy,
+              "cutoff": cutoff, "reheat_lead": reheat_lead}
+    if record:
+        series["time"] = np.broadcast_to(times[:, None], (times.size, n))
+        result["series"] = series
+    return result
+
+
+def throughput(result):
+    """
+    Batches per 24 h of every schedule of simulate_cycles.
+
+    steady: 24 h over the mean period between discharges after the first
+    batch (the first one starts from a cold plant); NaN with fewer than
+    three discharges. first_24h: batches discharged in the first 24 h.
+    """
+    import pandas as pd
+
+    rows = []
+    for i, done in enumerate(result["completions"]):
+        done = np.asarray(done, dtype=float)
+        period = np.diff(done[1:]).mean() if done.size >= 3 else np.nan
+        n_batches = max(done.size, 1)
+        rows.append({
+            "cutoff": result["cutoff"][i],
+            "reheat_lead_min": result["reheat_lead"][i] / 60,
+            "batches_per_day": 86400 / period,
+            "cycle_time_h": period / 3600,
+            "first_batch_h": done[0] / 3600 if done.size else np.nan,
+            "batches_first_24h": int(np.sum(done < 86400)),
+            "heater_kWh_per_batch": result["heater_energy"][i] / n_batches / 3.6e6,
+            "cooler_kWh_per_batch": result["cooler_energy"][i] / n_batches / 3.6e6,
+        })
+    return pd.DataFrame(rows)
+
+
+# -----------------------------
+# Schedule search
+# -----------------------------
+def optimize_schedule(n_grid=6, refine=1, **overrides):
+    """
+    Grid search over cutoff x reheat_lead, then refine around the best.
+
+    Each round evaluates n_grid x n_grid schedules in one vectorized run;
+    every refinement shrinks the ranges to the neighbouring grid cells of the
+    best schedule.
+
+    Returns:
+    --------
+    best : pd.Series, the schedule with the most steady batches per 24 h
+    table : pd.DataFrame of all evaluated schedules
+
+    Raises ValueError when the horizon is too short for any schedule to reach
+    three discharges (no steady throughput to rank by).
+    """
+    import pandas as pd
+
+    plan = _settings(dict(overrides))
+    (c_lo, c_hi), (l_lo, l_hi) = plan["cutoff_range"], plan["reheat_lead_range"]
+    c_hi = min(c_hi, plan["max_unload_temp"])
+    l_hi = min(l_hi, plan["turnaround_time"])
+    tables = []
+    for _ in range(refine + 1):
+        cutoffs, leads = np.meshgrid(np.linspace(c_lo, c_hi, n_grid), np.linspace(l_lo, l_hi, n_grid))
+        table = throughput(simulate_cycles(cutoffs, leads, **overrides))
+        if table["batches_per_day"].isna().all():
+            raise ValueError(f"No schedule discharges three batches within the horizon of "
+                             f"{plan['horizon'] / 3600:g} h, too short for the steady throughput; "
+                             f"increase horizon")
+        tables.append(table)
+        best = table.loc[table["batches_per_day"].idxmax()]
+        c_step = (c_hi - c_lo) / (n_grid - 1)
+        l_step = (l_hi - l_lo) / (n_grid - 1)
+        c_lo, c_hi = max(c_lo, best["cutoff"] - c_step), min(c_hi, best["cutoff"] + c_step)
+        lead = best["reheat_lead_min"] * 60
+        l_lo, l_hi = max(l_lo, lead - l_step), min(l_hi, lead + l_step)
+    table = pd.concat(tables, ignore_index=True).drop_duplicates(["cutoff", "reheat_lead_min"])
+    table = table.sort_values("batches_per_day", ascending=False, ignore_index=True)
+    return table.iloc[0], table
+
+
+def main(argv=None):
+    """Command line entry point (obx-cycles): optimize_schedule with --set overrides, best schedules first."""
+    import model_cli
+
+    return model_cli.run(lambda **overrides: optimize_schedule(**overrides)[1],
+                         "OBX batch schedule search (cool-down cutoff x reheat lead)", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    best, table = optimize_schedule()
+    print(f"{len(table)} schedules evaluated in {time.perf_counter() - start:.1f} s")
+    print(table.head(8).round(2).to_string(index=False))
+    print(f"\nBest: cool to {best['cutoff']:.1f} °C, restart the heater {best['reheat_lead_min']:.0f} min "
+          f"before the charge -> {best['batches_per_day']:.2f} batches/24 h "
+          f"(cycle {best['cycle_time_h']:.2f} h)")
+
+    # Compared with cooling to the unload limit and no preheat
+    baseline = throughput(simulate_cycles(planner["max_unload_temp"], 0)).iloc[0]
+    print(f"No preheat, cutoff {planner['max_unload_temp']} °C: {baseline['batches_per_day']:.2f} batches/24 h")
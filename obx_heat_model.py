@@ -0,0 +1,401 @@
+"""
+OBX Reactor Heat Model
+
+Importable version of "OBX heating/OBX heat up and down simulation V2.py":
+heating, reaction hold and cooling of the jacketed reactor with its oil loop
+(heater, pipe losses, oil -> jacket, jacket -> reactor, cooler, insulation
+losses), built on the shared exchanger kernel in heat_exchanger.py.
+
+Differences with the script:
+- Parameters are dicts that can be overridden per run instead of globals
+  edited in place.
+- Several scenarios run at once: every state is an array over scenarios and
+  each time step is one vectorized kernel call per exchanger.
+- Limiting mechanisms are int8 code arrays (heat_exchanger.limit_names).
+- simulation["exchanger_model"] = "ntu" (default) uses effectiveness-NTU;
+  "limits" is the script's min(area, hot flow, cold flow, device) rule.
+- Two quirks of the script are fixed unless simulation["reproduce_script"]
+  is set (use it with "limits" to regenerate the script's results exactly):
+  the oil is always passed as the hot side of the oil -> jacket exchanger,
+  so in the cooling phase the jacket is never cooled by the oil; and the
+  cooler assigns the cooling water outlet temperature to the oil.
+
+Required packages:
+pip install numpy pandas
+"""
+
+import copy
+import math
+
+import numpy as np
+
+from heat_exchanger import NO_TRANSFER, exchange, limit_labels
+from obx_controller import new_state, pid_output
+from obx_instrumentation import null_timer
+
+
+# -----------------------------
+# 1. Physical Constants
+# -----------------------------
+cp = {
+    "oil": 2200,  # J/kg.K
+    "water": 4186,  # J/kg.K
+    "minerals": 900,  # J/kg.K
+    "steel": 500,  # J/kg.K
+}
+rho = {
+    "oil": 800,  # kg/m3
+    "steel": 8000,  # kg/m3
+    "water": 1000,  # kg/m3
+}
+
+# -----------------------------
+# 2. Design Parameters (V2 script, big Huber)
+# -----------------------------
+design = {
+    "heater_max_duty": 96e3,  # W 96 or 36kW
+    "cooler_max_duty": 60e3,  # W
+    "oil_flow_m3_per_h": 10,  # m3/h 10 or 6m3/h
+    "water_flow_m3_per_h": 30,  # m3/h
+    "cooling_water_temp": 10,  # °C
+    "oil_max_temp": 200,  # °C 250 or 200 °C
+    "jacket_max_temp": 240,  # °C
+    "reactor_max_temp": 175,  # °C
+    "ambient_temp": 25,  # °C
+    "reaction_time": 1 * 3600,  # s
+    "Mineral_weight": 350,  # kg
+    "Water_weight": 150,  # kg
+    # Reactor and pipe geometry
+    "diameter": 1.5,  # m
+    "height": 2.0,  # m
+    "thickness": 0.03,  # m
+    "pipe_length": 10,  # m
+    "pipe_diameter": 0.0254,  # m
+    # Areas not derived from the geometry
+    "heater_area": 5.0,  # m2
+    "cooler_area": 3.0,  # m2
+    "U_values": {
+        "heater_oil": 200,
+        "oil_jacket": 150,
+        "jacket_reactor": 100,
+        "cooler_oil": 400,
+        "pipe_outside": 2,  # W/m2.K (assumed for pipe losses)
+        "jacket_outside": 2,  # W/m2.K (assumed for jacket losses over outer shell)
+        "reactor_outside": 3,  # W/m2.K (assumed for reactor losses over top and bottom)
+    },
+}
+
+control = {
+    "K_p": 92.0,  # Proportional gain on the heater exit temperature
+    "K_i": 0.0,  # 1/s, integral gain (PI / PID), see obx_controller
+    "K_d": 0.0,  # s, derivative gain (PID)
+    "anti_windup": "clamp",  # "clamp", "back_calculation" or "none"
+    "tracking_time": None,  # s, back-calculation tracking time; None for the default
+    "setpoint_offset": 5,  # K above reactor_max_temp
+}
+
+simulation = {
+    "dt": 60,  # s
+    "end_time": 6 * 3600,  # s
+    "approach_temp": 0.5,  # K, minimum temperature difference for heat transfer
+    "exchanger_model": "ntu",  # "ntu" or "limits" (script)
+    "reproduce_script": False,
+}
+
+arrangements = {
+    "heater_oil": "counterflow",
+    "cooler_oil": "counterflow",
+    "oil_jacket": "isothermal",  # oil passes a jacket that barely changes during one step
+    "jacket_reactor": "lumped",
+}
+
+exchangers = ("heater", "cooler", "oil_jacket", "jacket_reactor")
+temperature_columns = ["T_oil_out_heater", "T_oil_after_pipe_to_jacket", "T_oil_after_jacket",
+                       "T_oil_after_pipe_to_heater", "T_jacket", "T_reactor"]
+duty_columns = ["Q_heater", "Q_cooler", "Q_oil_jacket", "Q_jacket_reactor", "Q_pipe_to_jacket",
+                "Q_pipe_to_heater", "Q_jacket_loss", "Q_reactor_loss", "Q_total_loss"]
+limit_columns = [f"limit_{name}" for name in exchangers]
+
+HEATING = 0
+REACTION = 1
+COOLING = 2
+status_names = {HEATING: "heating", REACTION: "reaction", COOLING: "cooling"}
+
+
+# -----------------------------
+# Parameters
+# -----------------------------
+def _merge(base, overrides):
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if key not in merged:
+            raise KeyError(f"Unknown parameter: {key}")
+        if isinstance(merged[key], dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def resolve(**overrides):
+    """Merge overrides into design, control and simulation; returns one flat dict."""
+    params = dict(_merge(design, {k: v for k, v in overrides.items() if k in design}))
+    params.update(_merge(control, {k: v for k, v in overrides.items() if k in control}))
+    params.update(_merge(simulation, {k: v for k, v in overrides.items() if k in simulation}))
+    unknown = set(overrides) - set(design) - set(control) - set(simulation)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {sorted(unknown)}")
+    return params
+
+
+def derived(params):
+    """UA values [W/K] and heat capacity rates [W/K] of one parameter set, as in the script."""
+    dt = params["dt"]
+    radius = params["diameter"] / 2
+    U = params["U_values"]
+    pipe_area = math.pi * params["pipe_diameter"] * params["pipe_length"]
+    wall_area = math.pi * params["diameter"] * params["height"]
+    areas = {
+        "heater_oil": params["heater_area"],
+        "oil_jacket": wall_area,
+        "jacket_reactor": wall_area,
+        "cooler_oil": params["cooler_area"],
+        "pipe_outside": pipe_area,
+        "jacket_outside": wall_area,
+        "reactor_outside": 2 * math.pi * radius**2,
+    }
+    shell_volume = math.pi * (radius**2 - (radius - params["thickness"])**2) * params["height"]
+    end_volume = 2 * math.pi * radius**2 * params["thickness"]
+    m_dot_oil = rho["oil"] * params["oil_flow_m3_per_h"] / 3600
+    m_dot_water = rho["water"] * params["water_flow_m3_per_h"] / 3600
+    contents = params["Mineral_weight"] * cp["minerals"] + params["Water_weight"] * cp["water"]
+    return {
+        "UA": {name: U[name] * areas[name] for name in U},
+        "C_flow": m_dot_oil * cp["oil"],
+        "C_cooling": m_dot_water * cp["water"],
+        "C_jacket": shell_volume * rho["steel"] * cp["steel"] / dt,
+        "C_reactor": (end_volume * rho["steel"] * cp["steel"] + contents) / dt,
+        "C_reactor_empty": end_volume * rho["steel"] * cp["steel"] / dt,
+    }
+
+
+# -----------------------------
+# Simulation
+# -----------------------------
+def _transfer(T_a, T_b, C_a, C_b, UA, max_duty, p, arrangement):
+    """Exchange from a to b, or from whichever side is hotter unless reproducing the script."""
+    kwargs = dict(approach=p["approach_temp"], arrangement=arrangement, method=p["exchanger_model"])
+    if p["reproduce_script"]:
+        return exchange(T_a, T_b, C_a, C_b, UA, max_duty, **kwargs)
+    a_hot = T_a >= T_b
+    Q, T_hot, T_cold, limit = exchange(np.where(a_hot, T_a, T_b), np.where(a_hot, T_b, T_a),
+                                       np.where(a_hot, C_a, C_b), np.where(a_hot, C_b, C_a),
+                                       UA, max_duty, **kwargs)
+    return (np.where(a_hot, Q, -Q), np.where(a_hot, T_hot, T_cold), np.where(a_hot, T_cold, T_hot), limit)
+
+
+def _constants(params):
+    """Per-scenario arrays of everything a time step needs; params share dt and the model options."""
+    d = [derived(p) for p in params]
+    c = {name: np.array([x["UA"][name] for x in d]) for name in params[0]["U_values"]}
+    c.update({name: np.array([x[name] for x in d]) for name in ("C_flow", "C_cooling", "C_jacket", "C_reactor",
+                                                                 "C_reactor_empty")})
+    for key in ("reactor_max_temp", "oil_max_temp", "reaction_time", "ambient_temp", "K_p", "K_i", "K_d",
+                "setpoint_offset", "heater_max_duty", "cooler_max_duty", "cooling_water_temp"):
+        c[key] = np.array([p[key] for p in params], dtype=float)
+    c["tracking_time"] = np.array([np.nan if p["tracking_time"] is None else p["tracking_time"] for p in params])
+    for key in ("dt", "anti_windup", "approach_temp", "exchanger_model", "reproduce_script"):
+        c[key] = params[0][key]
+    return c
+
+
+def _step(T_oil, T_jacket, T_reactor, heater_on, cooler_on, c, ctrl, C_reactor=None, timer=null_timer):
+    """
+    One time step of the oil loop for all scenarios (steps 2-8 of the script).
+
+    heater_on / cooler_on are boolean arrays; with both off the oil only
+    circulates. ctrl is the controller state (obx_controller.new_state).
+    C_reactor overrides c["C_reactor"] (e.g. an empty reactor). timer gets a
+    lap per stage (obx_instrumentation.StageTimer).
+    Returns the new T_oil, T_jacket, T_reactor and a dict of this step's
+    temperature, duty and limit columns.
+    """
+    C_flow = c["C_flow"]
+    C_reactor = c["C_reactor"] if C_reactor is None else C_reactor
+    ambient = c["ambient_temp"]
+    row = {}
+
+    # 2. Heater (P/PI/PID control on the exit temperature) or cooler
+    T_error = c["reactor_max_temp"] + c["setpoint_offset"] - T_reactor
+    u = pid_output(ctrl, T_error, heater_on, c["K_p"], c["K_i"], c["K_d"], c["dt"], c["oil_max_temp"] - T_oil,
+                   c["anti_windup"], c["tracking_time"])
+    T_heater_exit = np.minimum(c["oil_max_temp"], T_oil + u)
+    timer.lap("control")
+    Q_h, _, T_oil_h, limit_h = exchange(T_heater_exit, T_oil, C_flow, C_flow, c["heater_oil"], c["heater_max_duty"],
+                                        c["approach_temp"], arrangements["heater_oil"], c["exchanger_model"])
+    Q_c, T_oil_c, T_water_out, limit_c = exchange(T_oil, c["cooling_water_temp"], C_flow, c["C_cooling"],
+                                                  c["cooler_oil"], c["cooler_max_duty"], c["approach_temp"],
+                                                  arrangements["cooler_oil"], c["exchanger_model"])
+    if c["reproduce_script"]:
+        T_oil_c = T_water_out
+    T_oil = np.where(heater_on, T_oil_h, np.where(cooler_on, T_oil_c, T_oil))
+    row["Q_heater"] = np.where(heater_on, Q_h, 0.0)
+    row["Q_cooler"] = np.where(cooler_on, Q_c, 0.0)
+    row["limit_heater"] = np.where(heater_on, limit_h, NO_TRANSFER)
+    row["limit_cooler"] = np.where(cooler_on, limit_c, NO_TRANSFER)
+    row["T_oil_out_heater"] = T_oil
+    timer.lap("heater_cooler")
+
+    # 3. Pipe to jacket
+    Q_pipe_to_jacket = c["pipe_outside"] * (T_oil - ambient)
+    T_oil = T_oil - Q_pipe_to_jacket / C_flow
+    row["T_oil_after_pipe_to_jacket"] = T_oil
+    timer.lap("pipe_to_jacket")
+
+    # 4. Oil to jacket
+    row["Q_oil_jacket"], T_oil, T_jacket, row["limit_oil_jacket"] = _transfer(
+        T_oil, T_jacket, C_flow, c["C_jacket"], c["oil_jacket"], None, c, arrangements["oil_jacket"])
+    row["T_oil_after_jacket"] = T_oil
+    timer.lap("oil_jacket")
+
+    # 5. Jacket to reactor
+    row["Q_jacket_reactor"], T_jacket, T_reactor, row["limit_jacket_reactor"] = _transfer(
+        T_jacket, T_reactor, c["C_jacket"], C_reactor, c["jacket_reactor"], None, c, arrangements["jacket_reactor"])
+    timer.lap("jacket_reactor")
+
+    # 6./7. Insulation losses of jacket and reactor
+    Q_jacket_loss = c["jacket_outside"] * (T_jacket - ambient)
+    T_jacket = T_jacket - Q_jacket_loss / c["C_jacket"]
+    Q_reactor_loss = c["reactor_outside"] * (T_reactor - ambient)
+    T_reactor = T_reactor - Q_reactor_loss / C_reactor
+    timer.lap("losses")
+
+    # 8. Pipe back to the heater
+    Q_pipe_to_heater = c["pipe_outside"] * (T_oil - ambient)
+    T_oil = T_oil - Q_pipe_to_heater / C_flow
+
+    row["T_oil_after_pipe_to_heater"] = T_oil
+    row["T_jacket"] = T_jacket
+    row["T_reactor"] = T_reactor
+    row["Q_pipe_to_jacket"] = Q_pipe_to_jacket
+    row["Q_pipe_to_heater"] = Q_pipe_to_heater
+    row["Q_jacket_loss"] = Q_jacket_loss
+    row["Q_reactor_loss"] = Q_reactor_loss
+    row["Q_total_loss"] = Q_pipe_to_heater + Q_jacket_loss + Q_reactor_loss + Q_pipe_to_jacket
+    timer.lap("pipe_to_heater")
+    return T_oil, T_jacket, T_reactor, row
+
+
+def _shared(scenarios, overrides):
+    """Resolved parameters of every scenario; checks the keys that must be shared."""
+    params = [resolve(**{**overrides, **s}) for s in (scenarios or [{}])]
+    for key in ("dt", "end_time", "exchanger_model", "reproduce_script", "anti_windup"):
+        if len({str(p[key]) for p in params}) > 1:
+            raise ValueError(f"{key} must be the same for all scenarios")
+    return params
+
+
+def simulate(scenarios=None, timer=None, **overrides):
+    """
+    Run the heat-up / reaction / cool-down cycle for one or more scenarios.
+
+    Parameters:
+    -----------
+    scenarios : list of dict, optional
+        Per-scenario overrides (any key of design, control or simulation except
+        dt and end_time, which are shared); default one scenario.
+    timer : obx_instrumentation.StageTimer, optional
+        Collects the time spent per stage of the loop.
+    overrides :
+        Applied to every scenario.
+
+    Returns:
+    --------
+    dict of arrays with shape (n_steps, n_scenarios): time, status and every
+    temperature, duty and limit column of the script (limits as int8 codes).
+    """
+    params = _shared(scenarios, overrides)
+    c = _constants(params)
+    times = np.arange(0, params[0]["end_time"], params[0]["dt"])
+    n = len(params)
+
+    T_oil = c["ambient_temp"].copy()
+    T_jacket = c["ambient_temp"].copy()
+    T_reactor = c["ambient_temp"].copy()
+    status = np.full(n, HEATING)
+    reaction_start = np.full(n, np.nan)
+    ctrl = new_state(n)
+
+    shape = (times.size, n)
+    out = {name: np.empty(shape) for name in temperature_columns + duty_columns}
+    out.update({name: np.empty(shape, dtype=np.int8) for name in limit_columns + ["status"]})
+    out["time"] = np.broadcast_to(times[:, None], shape)
+
+    timer = timer or null_timer
+    timer.start()
+    for k, t in enumerate(times):
+        # 1. Status
+        start_reaction = (status == HEATING) & (T_reactor >= c["reactor_max_temp"])
+        reaction_start = np.where(start_reaction, t, reaction_start)
+        status = np.where(start_reaction, REACTION, status)
+        status = np.where((status == REACTION) & (t - reaction_start >= c["reaction_time"]), COOLING, status)
+        heating = status != COOLING
+        timer.lap("status")
+
+        # 2.-8. Oil loop
+        T_oil, T_jacket, T_reactor, row = _step(T_oil, T_jacket, T_reactor, heating, ~heating, c, ctrl, timer=timer)
+        for name, values in row.items():
+            out[name][k] = values
+        out["status"][k] = status
+        timer.lap("record")
+    return out
+
+
+def to_dataframe(results, scenario=0, limit_strings=True):
+    """One scenario of simulate() as the script's results table (plus time in minutes/hours)."""
+    import pandas as pd
+
+    df = pd.DataFrame({name: values[:, scenario] for name, values in results.items()})
+    if limit_strings:
+        for name in limit_columns:
+            df[name] = limit_labels(df[name].to_numpy())
+        df["status"] = df["status"].map(status_names)
+    df["time_minutes"] = df["time"] / 60
+    df["time_hours"] = df["time"] / 3600
+    return df
+
+
+def run(**overrides):
+    """Single scenario as a DataFrame."""
+    return to_dataframe(simulate(**overrides))
+
+
+def main(argv=None):
+    """Command line entry point (obx-heat): one run with --set overrides as the script's results table."""
+    import model_cli
+
+    return model_cli.run(run, "OBX reactor heat-up / reaction / cool-down cycle", argv, store_name="obx")
+
+
+if __name__ == "__main__":
+    import time
+
+    # The script as it was, and the model with e-NTU exchangers
+    legacy = run(exchanger_model="limits", reproduce_script=True)
+    model = run()
+    for name, df in (("script", legacy), ("e-NTU", model)):
+        at_end = df.iloc[-1]
+        print(f"{name:>22}: reactor {at_end['T_reactor']:.1f} °C after {at_end['time_hours']:.1f} h, "
+              f"peak {df['T_reactor'].max():.1f} °C, heater limits "
+              f"{df['limit_heater'].value_counts().to_dict()}")
+
+    # Scenario batch: heater duty x oil flow x oil temperature
+    scenarios = [{"heater_max_duty": q, "oil_flow_m3_per_h": f, "oil_max_temp": T}
+                 for q in (36e3, 96e3) for f in (6, 10) for T in (200, 250)]
+    start = time.perf_counter()
+    results = simulate(scenarios, dt=1, end_time=12 * 3600)
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(scenarios)} scenarios x {results['time'].shape[0]} steps in {elapsed:.2f} s")
+    reached = (results["status"] >= REACTION).argmax(axis=0) / 3600
+    for s, hours in zip(scenarios, reached):
+        print(f"{s}: reaction temperature after {hours:.2f} h")
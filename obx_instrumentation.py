@@ -0,0 +1,166 @@
+"""
+OBX Simulation Instrumentation
+
+Replaces the script's DEBUG_LIMIT_REASON prints (one line per exchanger per
+step) with:
+
+- limit statistics: how often each exchanger is limited by area, hot flow,
+  cold flow or the device, per scenario and optionally per phase, counted
+  with np.bincount on the int8 limit arrays simulate() already returns
+  (no cost in the time loop)
+- stage timing: a StageTimer passed to obx_heat_model.simulate(timer=...)
+  accumulates the time spent in each stage of the loop. Without a timer the
+  loop calls the no-op null_timer, so profiling is switched at runtime and
+  costs nothing measurable when off.
+
+Required packages:
+pip install numpy pandas
+"""
+
+import time
+
+import numpy as np
+
+from heat_exchanger import NO_TRANSFER, limit_names
+
+
+# -----------------------------
+# Stage timing
+# -----------------------------
+class StageTimer:
+    """
+    Accumulated wall time per stage of a time loop.
+
+    Call start() before the loop and lap(stage) after each stage; each lap
+    is charged with the time since the previous lap.
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.calls = {}
+        self._last = None
+
+    def start(self):
+        self._last = time.perf_counter_ns()
+
+    def lap(self, stage):
+        now = time.perf_counter_ns()
+        self.totals[stage] = self.totals.get(stage, 0) + now - self._last
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self._last = now
+
+    def table(self):
+        """DataFrame: stage, total_ms, calls, us_per_call, share_pct (in loop order)."""
+        import pandas as pd
+
+        stages = list(self.totals)
+        totals = np.array([self.totals[s] for s in stages], dtype=float) / 1e6
+        calls = np.array([self.calls[s] for s in stages])
+        return pd.DataFrame({
+            "stage": stages,
+            "total_ms": totals,
+            "calls": calls,
+            "us_per_call": totals * 1e3 / np.maximum(calls, 1),
+            "share_pct": 100 * totals / max(totals.sum(), 1e-12),
+        })
+
+
+class _NullTimer:
+    def start(self):
+        pass
+
+    def lap(self, stage):
+        pass
+
+
+null_timer = _NullTimer()
+
+
+# -----------------------------
+# Limit statistics
+# -----------------------------
+def limit_counts(codes):
+    """Counts of every limit code along axis 0: array (n_codes, n_scenarios)."""
+    codes = np.asarray(codes)
+    codes = codes.reshape(codes.shape[0], -1)
+    n_codes = len(limit_names)
+    # Offset each scenario into its own block of bins, one bincount for all
+    offset = codes.astype(np.int64) + n_codes * np.arange(codes.shape[1])
+    return np.bincount(offset.ravel(), minlength=n_codes * codes.shape[1]).reshape(codes.shape[1], n_codes).T
+
+
+def limit_statistics(results, by_phase=False, scenario_names=None):
+    """
+    How often each exchanger was limited by what, from simulate() results.
+
+    Returns a DataFrame with one row per scenario and exchanger (and phase
+    when by_phase): step counts per limit, the fraction of transferring
+    steps per limit, and the dominant limit (most frequent one other than
+    no transfer).
+    """
+    import pandas as pd
+
+    from obx_heat_model import limit_columns, status_names
+
+    n = results["status"].shape[1]
+    scenario_names = scenario_names or list(range(n))
+    phases = [(None, slice(None))] if not by_phase else [(name, code) for code, name in status_names.items()]
+    labels = [limit_names[k] for k in sorted(limit_names)]
+    frames = []
+    for column in limit_columns:
+        for phase, code in phases:
+            codes = results[column]
+            if phase is not None:
+                # Steps outside the phase count as no transfer, then are taken out again
+                outside = results["status"] != code
+                codes = np.where(outside, NO_TRANSFER, codes)
+            counts = limit_counts(codes)
+            if phase is not None:
+                counts[NO_TRANSFER] -= outside.sum(axis=0)
+            frame = pd.DataFrame(counts.T, columns=labels)
+            frame.insert(0, "exchanger", column.removeprefix("limit_"))
+            frame.insert(0, "scenario", scenario_names)
+            if phase is not None:
+                frame.insert(2, "phase", phase)
+            frames.append(frame)
+    table = pd.concat(frames, ignore_index=True)
+    active = [label for label in labels if label != limit_names[NO_TRANSFER]]
+    transferring = table[active].sum(axis=1)
+    for label in active:
+        table[f"{label}_pct"] = 100 * table[label] / transferring.where(transferring > 0)
+    table["dominant"] = table[active].idxmax(axis=1).where(transferring > 0, limit_names[NO_TRANSFER])
+    return table
+
+
+def summary(results, timer=None, scenario_names=None):
+    """Dominant limit per scenario and exchanger, and the stage timing table if a timer was used."""
+    stats = limit_statistics(results, scenario_names=scenario_names)
+    dominant = stats.pivot(index="scenario", columns="exchanger", values="dominant")
+    return {"limits": stats, "dominant": dominant, "timing": timer.table() if timer is not None else None}
+
+
+if __name__ == "__main__":
+    import obx_heat_model
+
+    scenarios = [{"heater_max_duty": q, "oil_flow_m3_per_h": f, "oil_max_temp": T}
+                 for q in (36e3, 96e3) for f in (6, 10) for T in (200, 250)]
+    names = [f"{s['heater_max_duty'] / 1000:.0f}kW_{s['oil_flow_m3_per_h']}m3h_{s['oil_max_temp']}C"
+             for s in scenarios]
+
+    start = time.perf_counter()
+    obx_heat_model.simulate(scenarios, dt=10)
+    plain = time.perf_counter() - start
+    timer = StageTimer()
+    start = time.perf_counter()
+    results = obx_heat_model.simulate(scenarios, dt=10, timer=timer)
+    profiled = time.perf_counter() - start
+    print(f"Without timer {plain:.2f} s, with timer {profiled:.2f} s")
+
+    report = summary(results, timer, names)
+    print("\nDominant heater / cooler limit per design:")
+    print(report["dominant"].to_string())
+    print("\nHeater limits by phase, first design:")
+    phases = limit_statistics(results, by_phase=True, scenario_names=names)
+    print(phases[(phases["exchanger"] == "heater") & (phases["scenario"] == names[0])].round(1).to_string(index=False))
+    print("\nTime per stage:")
+    print(report["timing"].round(2).to_string(index=False))
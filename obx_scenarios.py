@@ -0,0 +1,293 @@
+"""
+OBX Scenario Runner
+
+Runs every scenario of a declarative scenario file (TOML or YAML, see
+"OBX heating/scenarios.toml") through obx_heat_model, instead of editing
+filename, design and K_p in the script and rerunning it per result page.
+
+- Scenarios run in parallel worker processes.
+- Results are cached by a hash of the resolved parameters and the model
+  source (the files listed for "obx" in result_store.models), so unchanged
+  scenarios are neither recomputed nor re-rendered.
+- One page per scenario (same layout as the script's HTML files, decimated
+  and sharing one plotly.min.js, see plot_decimation), plus a
+  combined report: simulation_report.html (summary table and overlays) and
+  simulation_results.parquet (all scenarios, long format).
+- Everything is written to scenario_results/ next to the scenario file by
+  default, so a run never overwrites the script's committed pages.
+
+Usage:
+    python obx_scenarios.py "OBX heating/scenarios.toml" [--workers 4] [--force] [--only NAME ...]
+
+Required packages:
+pip install numpy pandas plotly (pyyaml for .yaml files, pyarrow for parquet)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import obx_heat_model
+import plot_decimation
+import result_store
+from heat_exchanger import limit_names
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+report_keys = {  # per-scenario keys that only affect the page
+    "filename": None,
+    "time_unit": "hours",
+    "max_points": plot_decimation.report_settings["max_points"],  # 0: every sample, as the script
+    "plotlyjs": plot_decimation.report_settings["plotlyjs"],  # "directory", "cdn" or true (embed)
+}
+output_dirname = "scenario_results"  # default output folder, next to the scenario file
+cache_dirname = ".scenario_cache"
+report_basename = "simulation_report"
+
+
+# -----------------------------
+# Scenario files
+# -----------------------------
+def load_scenarios(path):
+    """
+    Read a scenario file into {name: (model_params, report_options)}.
+
+    [defaults] is merged into every entry of [scenarios].
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".toml":
+        import tomllib
+
+        with open(path, "rb") as f:
+            spec = tomllib.load(f)
+    elif ext in (".yaml", ".yml"):
+        import yaml
+
+        with open(path, encoding="utf-8") as f:
+            spec = yaml.safe_load(f)
+    else:
+        raise ValueError(f"Unsupported scenario file: {ext} (use .toml or .yaml)")
+
+    defaults = spec.get("defaults", {})
+    scenarios = {}
+    for name, entry in spec.get("scenarios", {}).items():
+        merged = {**defaults, **(entry or {})}
+        report = {k: merged.pop(k, v) for k, v in report_keys.items()}
+        report["filename"] = report["filename"] or f"simulation_results_{name}.html"
+        obx_heat_model.resolve(**merged)  # fail early on unknown keys
+        scenarios[name] = (merged, report)
+    return scenarios
+
+
+def scenario_hash(params, source_digest=None):
+    """Hash of the fully resolved parameters and the model source code."""
+    resolved = obx_heat_model.resolve(**params)
+    source_digest = source_digest or result_store.version("obx")
+    payload = json.dumps(resolved, sort_keys=True, default=float) + source_digest
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+# -----------------------------
+# Running (worker processes)
+# -----------------------------
+def _run_scenario(job):
+    """Simulate one scenario and store the raw arrays; top level so it can be pickled."""
+    name, params, cache_path = job
+    start = time.perf_counter()
+    results = obx_heat_model.simulate(**params)
+    np.savez_compressed(cache_path, **{k: v[:, 0] for k, v in results.items()})
+    return name, time.perf_counter() - start
+
+
+def load_result(cache_path):
+    """Cached arrays of one scenario as the script's results table."""
+    with np.load(cache_path) as f:
+        results = {k: f[k][:, None] for k in f.files}
+    return obx_heat_model.to_dataframe(results)
+
+
+# -----------------------------
+# Reports
+# -----------------------------
+def build_figure(df, title, time_unit="hours"):
+    """Temperature and duty subplots, as written by the OBX script."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    x = df["time_hours"] if time_unit == "hours" else df["time_minutes"]
+    fig = make_subplots(rows=2, cols=1, subplot_titles=("Temperature Profiles", "Heat Duties Over Time"),
+                        shared_xaxes=True)
+    for col in obx_heat_model.temperature_columns:
+        fig.add_trace(go.Scatter(x=x, y=df[col], mode="lines", name=col), row=1, col=1)
+    for col in obx_heat_model.duty_columns:
+        fig.add_trace(go.Scatter(x=x, y=df[col], mode="lines", name=col), row=2, col=1)
+    fig.update_layout(title=title, xaxis2_title=f"Time ({time_unit})", yaxis_title="Temperature (°C)",
+                      yaxis2_title="Duty (W)", hovermode="x unified", height=800)
+    return fig
+
+
+def write_page(df, path, title, time_unit="hours", max_points=None, plotlyjs=None):
+    return plot_decimation.write_html(build_figure(df, title, time_unit), path, max_points, plotlyjs)
+
+
+def summarize(name, params, df):
+    """One summary row per scenario."""
+    resolved = obx_heat_model.resolve(**params)
+    dt_h = resolved["dt"] / 3600
+    reached = df.index[df["status"] != "heating"]
+    row = {
+        "scenario": name,
+        "heater_max_duty_kW": resolved["heater_max_duty"] / 1000,
+        "oil_flow_m3_per_h": resolved["oil_flow_m3_per_h"],
+        "oil_max_temp": resolved["oil_max_temp"],
+        "time_to_reaction_temp_h": df.loc[reached[0], "time_hours"] if len(reached) else np.nan,
+        "peak_T_reactor": df["T_reactor"].max(),
+        "final_T_reactor": df["T_reactor"].iloc[-1],
+        "heater_energy_kWh": df["Q_heater"].sum() * dt_h / 1000,
+        "cooler_energy_kWh": df["Q_cooler"].sum() * dt_h / 1000,
+    }
+    for label in limit_names.values():
+        row[f"heater_{label.replace(' ', '_')}_pct"] = 100 * (df["limit_heater"] == label).mean()
+    return row
+
+
+def write_combined_report(frames, summary, output_dir, max_points=None, plotlyjs=None):
+    """simulation_report.html (summary + overlays) and simulation_results.parquet."""
+    import pandas as pd
+
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    long = pd.concat([df.assign(scenario=name) for name, df in frames.items()], ignore_index=True)
+    data_path = os.path.join(output_dir, f"{report_basename.replace('report', 'results')}.parquet")
+    try:
+        long.to_parquet(data_path, index=False)
+    except ImportError:
+        data_path = data_path.replace(".parquet", ".csv.gz")
+        long.to_csv(data_path, index=False)
+        print(f"pyarrow not installed, wrote {data_path} instead of parquet")
+
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        subplot_titles=("Reactor Temperature", "Heater Duty"))
+    for name, df in frames.items():
+        fig.add_trace(go.Scatter(x=df["time_hours"], y=df["T_reactor"], mode="lines", name=name,
+                                 legendgroup=name), row=1, col=1)
+        fig.add_trace(go.Scatter(x=df["time_hours"], y=df["Q_heater"], mode="lines", name=name,
+                                 legendgroup=name, showlegend=False), row=2, col=1)
+    fig.update_layout(title="OBX Scenarios", xaxis2_title="Time (hours)", yaxis_title="Temperature (°C)",
+                      yaxis2_title="Duty (W)", height=800)
+    plotlyjs = plot_decimation.report_settings["plotlyjs"] if plotlyjs is None else plotlyjs
+    if plotlyjs == "directory":
+        plot_decimation.ensure_plotlyjs(output_dir)
+    table = pd.DataFrame(summary).round(2).to_html(index=False, border=0)
+    html_path = os.path.join(output_dir, f"{report_basename}.html")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write("<html><head><meta charset='utf-8'><title>OBX Scenarios</title></head><body>\n")
+        f.write("<h2>OBX Scenarios</h2>\n" + table + "\n")
+        f.write(plot_decimation.to_html(fig, max_points, plotlyjs, full_html=False))
+        f.write("\n</body></html>\n")
+    return html_path, data_path
+
+
+# -----------------------------
+# Batch runner
+# -----------------------------
+def run_scenarios(path, output_dir=None, cache_dir=None, workers=None, force=False, only=None):
+    """
+    Run, cache and report every scenario of a scenario file.
+
+    Returns the summary DataFrame. Unchanged scenarios (same parameter and
+    source hash) are read from the cache; their pages are only rewritten when
+    the page options or the results changed, or the page is missing.
+
+    only restricts the runs and pages to these scenarios; the combined report
+    still covers every scenario of the file, the others read from the cache
+    (scenarios never run with the current code are left out of it).
+    """
+    import pandas as pd
+
+    scenarios = load_scenarios(path)
+    selected = set(only or scenarios)
+    missing = selected - set(scenarios)
+    if missing:
+        raise KeyError(f"Unknown scenarios: {sorted(missing)}")
+    output_dir = output_dir or os.path.join(os.path.dirname(os.path.abspath(path)), output_dirname)
+    os.makedirs(output_dir, exist_ok=True)
+    cache_dir = cache_dir or os.path.join(output_dir, cache_dirname)
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    if force:
+        manifest = {k: v for k, v in manifest.items() if k not in selected}
+
+    source = result_store.version("obx")
+    hashes = {name: scenario_hash(params, source) for name, (params, _) in scenarios.items()}
+    cache_paths = {name: os.path.join(cache_dir, f"{h}.npz") for name, h in hashes.items()}
+    jobs = [(name, scenarios[name][0], cache_paths[name]) for name in scenarios
+            if name in selected and (force or not os.path.exists(cache_paths[name]))]
+
+    if jobs:
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers == 1:
+            done = [_run_scenario(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                done = list(pool.map(_run_scenario, jobs))
+        for name, elapsed in done:
+            print(f"ran {name} in {elapsed:.2f} s")
+    print(f"{len(jobs)} of {len(selected)} scenarios recomputed, {len(selected) - len(jobs)} from cache")
+
+    frames, summary, not_run = {}, [], []
+    for name, (params, report) in scenarios.items():
+        if not os.path.exists(cache_paths[name]):  # outside only, never run with this code
+            not_run.append(name)
+            continue
+        df = load_result(cache_paths[name])
+        frames[name] = df
+        summary.append(summarize(name, params, df))
+        if name not in selected:
+            continue
+        page = os.path.join(output_dir, report["filename"])
+        page_key = hashes[name] + json.dumps(report, sort_keys=True)
+        if manifest.get(name) != page_key or not os.path.exists(page):
+            write_page(df, page, f"Simulation Results: {name}", report["time_unit"], report["max_points"],
+                       report["plotlyjs"])
+            manifest[name] = page_key
+            print(f"wrote {page}")
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    if not_run:
+        print(f"not run yet, left out of the report: {', '.join(not_run)}")
+    html_path, data_path = write_combined_report(frames, summary, output_dir)
+    print(f"wrote {html_path} and {data_path}")
+    return pd.DataFrame(summary)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run OBX heat model scenarios from a TOML/YAML file.")
+    parser.add_argument("scenario_file")
+    parser.add_argument("--output-dir", help=f"where pages and the report go (default: {output_dirname}/ next to the file)")
+    parser.add_argument("--cache-dir", help=f"result cache (default: <output-dir>/{cache_dirname})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="ignore the cache")
+    parser.add_argument("--only", nargs="+", metavar="NAME",
+                        help="run only these scenarios (the combined report keeps the others)")
+    args = parser.parse_args(argv)
+    summary = run_scenarios(args.scenario_file, args.output_dir, args.cache_dir, args.workers,
+                            args.force, args.only)
+    print(summary.round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
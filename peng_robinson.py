@@ -0,0 +1,187 @@
+"""
+Peng-Robinson Gas Mixtures
+
+Molar volumes and compressibility factors of gas mixtures (CO2 with N2, H2,
+O2, Ar, CH4, ...) from the Peng-Robinson equation of state with van der Waals
+mixing rules:
+
+    P = RT / (v - b) - a / (v**2 + 2*b*v - b**2)
+    a = sum_ij x_i x_j sqrt(a_i a_j) (1 - k_ij),   b = sum_i x_i b_i
+
+For a set of species at one temperature the pure-component a_i(T), b_i and
+the binary matrix a_ij are computed once (mixture(), cached per species and
+temperature); after that a molar volume is a few array operations for any
+number of compositions, and the cubic in Z is solved in closed form for all
+of them at once (largest real root: the gas phase).
+
+CoolProp mixture calls are more accurate but take milliseconds each, which
+is too slow inside a time loop or a sweep. Plain PR is within 1.5 % of
+CoolProp for the pure gases at 100 bar / 175 °C (see the __main__ check); the k_ij below are typical literature values, 0 where
+none is listed.
+
+Units: K, Pa, m³/mol, g/mol.
+
+Required packages:
+pip install numpy (CoolProp for the comparison in __main__)
+"""
+
+import functools
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+R = 8.314462618  # J/(mol K)
+
+components = {  # critical temperature [K], critical pressure [Pa], acentric factor, molar mass [g/mol]
+    "CO2": {"Tc": 304.13, "Pc": 7.3773e6, "omega": 0.22394, "M": 44.01},
+    "N2": {"Tc": 126.19, "Pc": 3.3958e6, "omega": 0.0372, "M": 28.014},
+    "H2": {"Tc": 33.145, "Pc": 1.2964e6, "omega": -0.219, "M": 2.016},
+    "O2": {"Tc": 154.58, "Pc": 5.043e6, "omega": 0.0222, "M": 31.999},
+    "Ar": {"Tc": 150.69, "Pc": 4.863e6, "omega": -0.00219, "M": 39.948},
+    "CH4": {"Tc": 190.56, "Pc": 4.5992e6, "omega": 0.01142, "M": 16.043},
+    "CO": {"Tc": 132.86, "Pc": 3.494e6, "omega": 0.0497, "M": 28.010},
+}
+
+binary_interaction = {  # k_ij, symmetric
+    ("CO2", "N2"): -0.017,
+    ("CO2", "H2"): -0.1622,
+    ("CO2", "CH4"): 0.0919,
+    ("CO2", "CO"): -0.0154,
+    ("N2", "CH4"): 0.0311,
+    ("N2", "H2"): 0.0711,
+    ("H2", "CH4"): 0.0156,
+}
+
+
+# -----------------------------
+# Parameters
+# -----------------------------
+def _data(species):
+    unknown = [name for name in species if name not in components]
+    if unknown:
+        raise KeyError(f"Unknown species: {unknown} (known: {sorted(components)})")
+    return [components[name] for name in species]
+
+
+def kij_matrix(species):
+    """Binary interaction parameters of the species as an (n, n) array."""
+    _data(species)
+    k = np.zeros((len(species), len(species)))
+    for i, a in enumerate(species):
+        for j, b in enumerate(species):
+            k[i, j] = binary_interaction.get((a, b), binary_interaction.get((b, a), 0.0))
+    return k
+
+
+def parameters(species, T_K):
+    """
+    Pure and mixed PR parameters of the species at T_K (scalar or array).
+
+    Returns:
+    --------
+    dict with species, T_K, b (n,), a_ij (..., n, n) in SI units and M (n,) in g/mol.
+    """
+    data = _data(species)
+    Tc = np.array([d["Tc"] for d in data])
+    Pc = np.array([d["Pc"] for d in data])
+    omega = np.array([d["omega"] for d in data])
+    T = np.asarray(T_K, dtype=float)[..., None]
+
+    m = 0.37464 + 1.54226 * omega - 0.26992 * omega ** 2
+    alpha = (1 + m * (1 - np.sqrt(T / Tc))) ** 2
+    a = 0.45724 * (R * Tc) ** 2 / Pc * alpha
+    b = 0.07780 * R * Tc / Pc
+    a_ij = np.sqrt(a[..., :, None] * a[..., None, :]) * (1 - kij_matrix(species))
+    return {"species": tuple(species), "T_K": np.asarray(T_K, dtype=float), "b": b, "a_ij": a_ij,
+            "M": np.array([d["M"] for d in data])}
+
+
+@functools.lru_cache(maxsize=256)
+def mixture(species, T_K):
+    """parameters() for a tuple of species at one temperature, cached (do not modify the arrays)."""
+    return parameters(species, float(T_K))
+
+
+# -----------------------------
+# Equation of State
+# -----------------------------
+def compressibility(A, B):
+    """
+    Largest real root Z of Z**3 - (1 - B) Z**2 + (A - 3B**2 - 2B) Z - (AB - B**2 - B**3) = 0,
+    elementwise for arrays A = a P / (RT)**2 and B = b P / (RT).
+    """
+    A, B = np.broadcast_arrays(np.asarray(A, dtype=float), np.asarray(B, dtype=float))
+    c2 = -(1 - B)
+    c1 = A - 3 * B ** 2 - 2 * B
+    c0 = -(A * B - B ** 2 - B ** 3)
+    # Depressed cubic t**3 + p t + q = 0 with Z = t - c2/3
+    p = c1 - c2 ** 2 / 3
+    q = 2 * c2 ** 3 / 27 - c2 * c1 / 3 + c0
+    disc = (q / 2) ** 2 + (p / 3) ** 3
+    with np.errstate(invalid="ignore"):
+        # One real root (Cardano), or three (trigonometric form, largest is k = 0)
+        sqrt_disc = np.sqrt(np.maximum(disc, 0))
+        one = np.cbrt(-q / 2 + sqrt_disc) + np.cbrt(-q / 2 - sqrt_disc)
+        r = np.sqrt(np.maximum(-p / 3, 0))
+        cos_arg = np.clip(np.where(r > 0, -q / 2 / np.where(r > 0, r, 1) ** 3, 0), -1, 1)
+        three = 2 * r * np.cos(np.arccos(cos_arg) / 3)
+    Z = np.where(disc > 0, one, three) - c2 / 3
+    # One Newton step polishes the closed-form root
+    f = ((Z + c2) * Z + c1) * Z + c0
+    df = (3 * Z + 2 * c2) * Z + c1
+    return Z - f / np.where(df != 0, df, 1)
+
+
+def mix(params, x):
+    """a and b of compositions x (..., n) (mole fractions summing to 1)."""
+    x = np.asarray(x, dtype=float)
+    a_ij = params["a_ij"]
+    a = ((x @ a_ij) * x).sum(-1) if a_ij.ndim == 2 else np.einsum("...i,...ij,...j->...", x, a_ij, x)
+    b = x @ params["b"]
+    return a, b
+
+
+def molar_volume(params, x, P_Pa):
+    """
+    Gas molar volume [m³/mol] and Z of compositions x (..., n) at the
+    parameters' temperature and P_Pa (broadcast against x[..., 0]).
+    """
+    a, b = mix(params, x)
+    RT = R * params["T_K"]
+    A = a * P_Pa / RT ** 2
+    B = b * P_Pa / RT
+    Z = compressibility(A, B)
+    return Z * RT / P_Pa, Z
+
+
+def pressure(params, n, V_m3):
+    """Pressure [Pa] of the amounts n (..., n) [mol] in V_m3 (extensive form of the EOS)."""
+    n = np.asarray(n, dtype=float)
+    A = np.einsum("...i,...ij,...j->...", n, params["a_ij"], n)
+    B = n @ params["b"]
+    return n.sum(-1) * R * params["T_K"] / (V_m3 - B) - A / (V_m3 ** 2 + 2 * V_m3 * B - B ** 2)
+
+
+if __name__ == "__main__":
+    import time
+
+    from CoolProp.CoolProp import PropsSI
+
+    T_K, P_Pa = 175 + 273.15, 100e5
+    print(f"Pure gases at {T_K - 273.15:.0f} °C, {P_Pa / 1e5:.0f} bar: PR vs CoolProp molar volume")
+    for name in ("CO2", "N2", "H2", "O2", "Ar", "CH4"):
+        v_pr, Z = molar_volume(mixture((name,), T_K), [1.0], P_Pa)
+        v_cp = PropsSI("M", name) / PropsSI("D", "T", T_K, "P", P_Pa, name)
+        print(f"{name:>4}: Z = {float(Z):.4f}, v = {float(v_pr) * 1e6:8.2f} cm³/mol, "
+              f"CoolProp {v_cp * 1e6:8.2f} cm³/mol ({(float(v_pr) / v_cp - 1) * 100:+.2f} %)")
+
+    species = ("CO2", "N2", "H2", "O2", "Ar")
+    params = mixture(species, T_K)
+    x = np.random.default_rng(0).dirichlet([50, 1, 1, 0.5, 0.5], size=1_000_000)
+    start = time.perf_counter()
+    v, Z = molar_volume(params, x, P_Pa)
+    print(f"\n{len(x):,} mixture volumes in {(time.perf_counter() - start) * 1000:.0f} ms, "
+          f"Z {Z.min():.3f} .. {Z.max():.3f}")
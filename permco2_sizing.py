@@ -0,0 +1,201 @@
+"""
+PermCO2 Skid Exchanger Sizing
+
+The duty and coil sizing part of PermCO2system.ipynb (permanent skid):
+chiller (subcool CO2 from saturation), heater 1, 150 m transport pipe and
+heater 2, with the coils sized on the shared exchanger kernel
+(heat_exchanger.py) instead of the notebook's coil_length_bath and
+coil_length_countercurrent.
+
+- "bath": the medium is a stirred bath at constant temperature, the coil is
+  an isothermal-side exchanger. The notebook used the driving force at the
+  CO2 inlet for the whole coil, which undersizes it.
+- "counter": the medium flows counter-current at ratio_medium_CO2_mass times
+  the CO2 flow. Equal to the notebook's LMTD result.
+
+The CO2 side is treated as a stream with its mean heat capacity rate
+Q / (T_out - T_in) from CoolProp enthalpies, as the LMTD route implicitly does.
+
+All inputs may be arrays (e.g. a sweep over CO2 flow or subcooling); CoolProp
+is called on whole arrays.
+
+Required packages:
+pip install coolprop numpy pandas
+"""
+
+import math
+
+import numpy as np
+
+from heat_exchanger import required_area, stream_capacity_rate
+
+
+# -----------------------------
+# Configuration Block (permanent skid)
+# -----------------------------
+skid = {
+    "mass_flow_CO2": 120 / 3600,  # kg/s
+    "pressure_CO2_inlet": 20 * 1e5,  # Pa
+    "pressure_CO2_outlet": 105 * 1e5,  # Pa
+    "ambient_temp": -5 + 273.15,  # K
+    "subcooling_target": 8,  # K
+    "glycol_below_CO2": 5,  # K, glycol bath below the chilled CO2 temperature
+    "ratio_medium_CO2_mass": 5,  # medium mass flow / CO2 mass flow
+    "cp_glycol_chiller": 3.075 * 1000,  # J/kg·K
+    "U_estimate": 500,  # W/m²K
+    "coil_diameter": 0.00635,  # m (1/4")
+    "temp_CO2_heater1": 5 + 273.15,  # K
+    "temp_CO2_heater2": 50 + 273.15,  # K
+    "water_above_CO2": 10,  # K, water bath above the heater outlet temperature
+    "cp_water": 4.2 * 1000,  # J/kg·K
+    "pipe_length": 150,  # m
+    "pipe_diameter_inner": 0.0127,  # m (1/2" ID)
+    "insulation_thickness": 0.06,  # m
+    "k_insulation": 0.035,  # W/m·K
+    "pipe_roughness": 0.006 * 1e-3,  # m
+    "heat_exchanger_efficiency": 1,
+    "safety_factor": 1.0,
+}
+
+
+def _props(out, name1, value1, name2, value2):
+    from CoolProp.CoolProp import PropsSI
+
+    value1, value2 = np.broadcast_arrays(np.asarray(value1, dtype=float), np.asarray(value2, dtype=float))
+    return np.reshape(PropsSI(out, name1, value1.ravel(), name2, value2.ravel(), "CO2"), value1.shape)
+
+
+# -----------------------------
+# Duties
+# -----------------------------
+def resolve(**overrides):
+    """skid with overrides."""
+    unknown = set(overrides) - set(skid)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {sorted(unknown)}")
+    p = dict(skid)
+    p.update(overrides)
+    return p
+
+
+def skid_duties(**overrides):
+    """
+    Duties [W] and CO2 temperatures [K] through chiller, heater 1, pipe and heater 2.
+
+    Overrides are keys of skid; scalars or broadcastable arrays.
+    """
+    p = resolve(**overrides)
+    keys = list(p)
+    p = dict(zip(keys, (a.ravel() for a in np.broadcast_arrays(*(np.asarray(p[k], dtype=float) for k in keys)))))
+    factor = p["safety_factor"] / p["heat_exchanger_efficiency"]
+    m = p["mass_flow_CO2"]
+
+    # Chiller: saturated liquid at the inlet pressure, subcooled
+    T_sat = _props("T", "P", p["pressure_CO2_inlet"], "Q", 0)
+    T_chiller = T_sat - p["subcooling_target"]
+    h_sat = _props("H", "P", p["pressure_CO2_inlet"], "Q", 0)
+    Q_chiller = m * (_props("H", "P", p["pressure_CO2_inlet"], "T", T_chiller) - h_sat) * factor
+
+    # Heater 1 after the pump, at outlet pressure
+    P_out = p["pressure_CO2_outlet"]
+    T_h1 = p["temp_CO2_heater1"]
+    Q_heater1 = m * (_props("H", "P", P_out, "T", T_h1) - _props("H", "P", P_out, "T", T_chiller)) * factor
+
+    # Transport pipe: conduction through the insulation, Haaland friction factor
+    D_in = p["pipe_diameter_inner"]
+    D_out = D_in + 2 * p["insulation_thickness"]
+    Q_loss = (2 * math.pi * p["k_insulation"] * (T_h1 - p["ambient_temp"]) / np.log(D_out / D_in)
+              * p["pipe_length"])
+    T_transport = T_h1 - Q_loss / (m * _props("C", "P", P_out, "T", T_h1))
+    density = _props("D", "P", P_out, "T", T_transport)
+    velocity = m / density / (math.pi / 4 * D_in**2)
+    Re = density * velocity * D_in / _props("V", "P", P_out, "T", T_transport)
+    f = (1 / (-1.8 * np.log10(6.9 / Re + (p["pipe_roughness"] / (3.7 * D_in))**1.11)))**2
+    pressure_drop = f * (p["pipe_length"] / D_in) * density * velocity**2 / 2
+    P_transport = P_out - pressure_drop
+
+    # Heater 2 at the end of the line
+    T_h2 = p["temp_CO2_heater2"]
+    Q_heater2 = m * (_props("H", "P", P_transport, "T", T_h2)
+                     - _props("H", "P", P_transport, "T", T_transport)) * factor
+
+    return {
+        "params": p,
+        "chiller": {"Q": Q_chiller, "T_in": T_sat, "T_out": T_chiller,
+                    "T_medium": T_chiller - p["glycol_below_CO2"], "cp_medium": p["cp_glycol_chiller"]},
+        "heater1": {"Q": Q_heater1, "T_in": T_chiller, "T_out": T_h1,
+                    "T_medium": T_h1 + p["water_above_CO2"], "cp_medium": p["cp_water"]},
+        "heater2": {"Q": Q_heater2, "T_in": T_transport, "T_out": T_h2,
+                    "T_medium": T_h2 + p["water_above_CO2"], "cp_medium": p["cp_water"]},
+        "pipe": {"Q_loss": Q_loss, "T_out": T_transport, "pressure_drop": pressure_drop, "velocity": velocity},
+    }
+
+
+# -----------------------------
+# Coil sizing
+# -----------------------------
+def size_coils(**overrides):
+    """
+    Bath and counter-current coil areas and lengths for chiller, heater 1 and heater 2.
+
+    Returns a long DataFrame: one row per (case, exchanger) with duty_kW,
+    CO2 in/out and medium temperatures in °C, area_bath_m2, coil_length_bath_m,
+    area_counter_m2, coil_length_counter_m.
+    """
+    import pandas as pd
+
+    duties = skid_duties(**overrides)
+    p = duties["params"]
+    C_medium = p["ratio_medium_CO2_mass"] * p["mass_flow_CO2"]
+    frames = []
+    for name in ("chiller", "heater1", "heater2"):
+        x = duties[name]
+        C_CO2 = stream_capacity_rate(x["Q"], x["T_in"], x["T_out"])
+        heating = x["T_medium"] > x["T_in"]
+        # Hot side first: the medium for heaters, the CO2 for the chiller
+        T_hot = np.where(heating, x["T_medium"], x["T_in"])
+        T_cold = np.where(heating, x["T_in"], x["T_medium"])
+        C_flow = C_medium * x["cp_medium"]
+        C_hot_bath = np.where(heating, np.inf, C_CO2)
+        C_cold_bath = np.where(heating, C_CO2, np.inf)
+        area_bath = required_area(x["Q"], T_hot, T_cold, C_hot_bath, C_cold_bath, p["U_estimate"], "isothermal")
+        area_counter = required_area(x["Q"], T_hot, T_cold, np.where(heating, C_flow, C_CO2),
+                                     np.where(heating, C_CO2, C_flow), p["U_estimate"], "counterflow")
+        frames.append(pd.DataFrame({
+            "case": np.arange(x["Q"].size),
+            "exchanger": name,
+            "duty_kW": x["Q"] / 1000,
+            "T_CO2_in_C": x["T_in"] - 273.15,
+            "T_CO2_out_C": x["T_out"] - 273.15,
+            "T_medium_C": x["T_medium"] - 273.15,
+            "area_bath_m2": area_bath,
+            "coil_length_bath_m": area_bath / (np.pi * p["coil_diameter"]),
+            "area_counter_m2": area_counter,
+            "coil_length_counter_m": area_counter / (np.pi * p["coil_diameter"]),
+        }))
+    return pd.concat(frames, ignore_index=True).sort_values(["case", "exchanger"], ignore_index=True)
+
+
+def main(argv=None):
+    """Command line entry point (permco2-sizing): size_coils with --set overrides."""
+    import model_cli
+
+    return model_cli.run(size_coils, "PermCO2 skid coil sizing", argv, store_name="permco2")
+
+
+if __name__ == "__main__":
+    import time
+
+    duties = skid_duties()
+    pipe = duties["pipe"]
+    print(f"Transport pipe: loss {float(pipe['Q_loss'][0]) / 1000:.2f} kW, "
+          f"CO2 after 150 m {float(pipe['T_out'][0]) - 273.15:.2f} °C, "
+          f"pressure drop {float(pipe['pressure_drop'][0]) / 1e5:.3f} bar")
+    print(size_coils().round(3).to_string(index=False))
+
+    # Sweep: CO2 flow 60..240 kg/h x subcooling 4..12 K in one call
+    flows, subcooling = np.meshgrid(np.linspace(60, 240, 10) / 3600, np.linspace(4, 12, 9))
+    start = time.perf_counter()
+    sweep = size_coils(mass_flow_CO2=flows, subcooling_target=subcooling)
+    print(f"\nSized {len(sweep)} coils in {(time.perf_counter() - start) * 1000:.0f} ms")
+    print(sweep.groupby("exchanger")[["area_bath_m2", "area_counter_m2"]].describe().round(2).T.to_string())
@@ -1,9 +1,9 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import CoolProp.CoolProp as CP
 
 def get_CO2_properties():
     """Retrieve critical and triple point properties for CO2."""
+    import CoolProp.CoolProp as CP
+
     T_trip = CP.PropsSI('Ttriple', 'CO2')  # Triple point temperature (K)
     P_trip = CP.PropsSI('ptriple', 'CO2')  # Triple point pressure (Pa)
     T_crit = CP.PropsSI('Tcrit', 'CO2')   # Critical point temperature (K)
@@ -12,6 +12,8 @@ def get_CO2_properties():
 
 def calculate_boiling_curve(T_trip, T_crit):
     """Calculate the boiling curve using CoolProp."""
+    import CoolProp.CoolProp as CP
+
     T_points = np.linspace(T_trip, T_crit, 100)  # Temperature range (K)
     P_points = [CP.PropsSI('P', 'T', T, 'Q', 1, 'CO2') for T in T_points]  # Saturation pressure (Pa)
     return T_points - 273.15, np.array(P_points) / 1e5 - 1.01325  # Convert to °C and barg
@@ -48,6 +50,8 @@ def calculate_sublimation_curve():
 
 def generate_property_grid():
     """Generate a grid of temperature, pressure, density, and enthalpy values."""
+    import CoolProp.CoolProp as CP
+
     # Define temperature and pressure ranges
     temperatures = np.linspace(-100 + 273.15, 250 + 273.15, 200)  # Kelvin
     pressures = np.linspace(0.01 * 1e5, 120 * 1e5, 200)  # Pascals
@@ -71,20 +75,31 @@ def plot_iso_lines(ax, T, P, property_grid, levels, label_fmt, color, label_colo
     contour_lines = ax.contour(T_C, P_bar, property_grid, levels=levels, colors=color)
     ax.clabel(contour_lines, inline=True, fontsize=8, fmt=label_fmt, colors=label_color)
 
-def create_phase_diagram():
+def create_phase_diagram(path=None):
+    """Plot the phase diagram; saved to path (e.g. a .png) if given, otherwise shown."""
+    import matplotlib.pyplot as plt
+    import CoolProp.CoolProp as CP
+
+    def props(output, T, P):
+        # CoolProp rejects the solid region (below the triple point pressure), left blank in the plot
+        try:
+            return CP.PropsSI(output, 'T', T, 'P', P, 'CO2')
+        except ValueError:
+            return np.nan
+
     # Retrieve CO2 properties
     T_trip, P_trip, T_crit, P_crit = get_CO2_properties()
 
     # Calculate phase boundaries
     T_boiling, P_boiling = calculate_boiling_curve(T_trip, T_crit)
-    T_sublimation, P_sublimation = calculate_sublimation_curve(T_trip, P_trip)
+    T_sublimation, P_sublimation = calculate_sublimation_curve()
 
     # Generate property grid for iso-lines
     temperatures = np.linspace(-100 + 273.15, 250 + 273.15, 200)  # Kelvin
     pressures = np.linspace(0.01 * 1e5, 120 * 1e5, 200)  # Pascals
     T, P = np.meshgrid(temperatures, pressures)
-    densities = np.vectorize(CP.PropsSI)('D', 'T', T, 'P', P, 'CO2')
-    enthalpies = np.vectorize(CP.PropsSI)('H', 'T', T, 'P', P, 'CO2') / 1000  # Convert to kJ/kg
+    densities = np.vectorize(props, otypes=[float])('D', T, P)
+    enthalpies = np.vectorize(props, otypes=[float])('H', T, P) / 1000  # Convert to kJ/kg
 
     # Create the plot
     fig, ax = plt.subplots(figsize=(12, 8))
@@ -114,8 +129,22 @@ def create_phase_diagram():
     ax.legend()
     ax.set_title('CO2 Phase Diagram with Iso-Lines', pad=20)
 
-    # Show the plot
-    plt.show()
+    # Show the plot, or save it
+    if path is None:
+        plt.show()
+    else:
+        fig.savefig(path, bbox_inches='tight')
+        plt.close(fig)
+    return path
+
+def main(argv=None):
+    """Command line entry point (co2-phase-diagram): show the diagram or save it with --output."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="CO2 phase diagram with density and enthalpy iso-lines")
+    parser.add_argument("-o", "--output", help="save the figure (.png, .pdf, .svg) instead of showing it")
+    args = parser.parse_args(argv)
+    return create_phase_diagram(args.output)
 
 if __name__ == "__main__":
-    create_phase_diagram()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,198 @@
+"""
+Lightweight Plotly Reports
+
+Plotly HTML for long time series (OBX runs, headspace simulations) without
+embedding every sample and the whole plotly.js bundle in every file.
+
+- Decimation: Largest-Triangle-Three-Buckets (LTTB) for the shape of the
+  curve, united with the minimum and maximum of fixed buckets so peaks,
+  dips and step edges survive. A 6 h run at 1 s (21,600 samples x 15 traces)
+  goes down to max_points per trace.
+- Typed arrays: decimated data is handed to plotly as float32 numpy arrays,
+  which plotly writes as base64 typed arrays instead of JSON number lists.
+- plotly.js once: "directory" writes plotly.min.js next to the reports and
+  references it (works offline), "cdn" loads it from the CDN, True embeds it
+  like pio.write_html does by default.
+
+Required packages:
+pip install numpy plotly
+"""
+
+import os
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+report_settings = {
+    "max_points": 2000,  # per trace; 0 or None keeps every sample
+    "plotlyjs": "directory",  # "directory", "cdn" or True (embed)
+    "dtype": np.float32,
+}
+
+
+# -----------------------------
+# Decimation
+# -----------------------------
+def lttb(x, y, n_out):
+    """
+    Indices of the Largest-Triangle-Three-Buckets downsample of (x, y).
+
+    Keeps the first and last sample and one sample per bucket in between,
+    the one spanning the largest triangle with the previously kept sample
+    and the mean of the next bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n_out is None or n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 buckets between the end points
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    mean_x = np.add.reduceat(x[:-1], starts) / counts
+    mean_y = np.add.reduceat(y[:-1], starts) / counts
+    # The bucket after the last one is the last sample
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i, (lo, hi) in enumerate(zip(starts, ends)):
+        area = np.abs((x[a] - mean_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[i] - y[a]))
+        a = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        idx[i + 1] = a
+    return idx
+
+
+def minmax_indices(y, n_buckets):
+    """Indices of the minimum and maximum of y in each of n_buckets equal buckets."""
+    y = np.asarray(y, dtype=float)
+    n = y.size
+    if n_buckets is None or 2 * n_buckets >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded_min = np.full(size * n_buckets, np.inf)
+    padded_max = np.full(size * n_buckets, -np.inf)
+    finite = np.isfinite(y)
+    padded_min[:n] = np.where(finite, y, np.inf)
+    padded_max[:n] = np.where(finite, y, -np.inf)
+    offsets = np.arange(n_buckets) * size
+    i_min = offsets + padded_min.reshape(n_buckets, size).argmin(axis=1)
+    i_max = offsets + padded_max.reshape(n_buckets, size).argmax(axis=1)
+    return np.unique(np.minimum(np.concatenate([i_min, i_max]), n - 1))
+
+
+def decimate(x, y, max_points=None):
+    """
+    Sorted sample indices to plot: LTTB on half the budget plus bucket
+    minima/maxima on the other half, so at most max_points indices.
+    """
+    n = np.asarray(y).size
+    max_points = report_settings["max_points"] if max_points is None else max_points
+    if not max_points or n <= max_points:
+        return np.arange(n)
+    return np.union1d(lttb(x, y, max_points // 2), minmax_indices(y, max_points // 4))
+
+
+def _is_numeric(values):
+    return values is not None and np.asarray(values).dtype.kind in "iuf"
+
+
+def downsample_figure(fig, max_points=None, dtype=None):
+    """
+    Decimate every line trace of a plotly figure in place and store numeric
+    x/y as typed arrays. Traces without numeric y (text, categories) and
+    datetime x axes are left untouched apart from the decimation.
+
+    Returns the figure and (samples before, samples after).
+    """
+    dtype = dtype or report_settings["dtype"]
+    before = after = 0
+    for trace in fig.data:
+        y = getattr(trace, "y", None)
+        if not _is_numeric(y):
+            continue
+        y = np.asarray(y)
+        x = np.arange(y.size) if trace.x is None else np.asarray(trace.x)
+        idx = decimate(x if _is_numeric(x) else np.arange(y.size), y, max_points)
+        before += y.size
+        after += idx.size
+        trace.x = x[idx].astype(dtype) if _is_numeric(x) else x[idx]
+        trace.y = y[idx].astype(dtype)
+    return fig, (before, after)
+
+
+# -----------------------------
+# Output
+# -----------------------------
+def ensure_plotlyjs(directory):
+    """Write plotly.min.js into directory once; returns its path."""
+    path = os.path.join(directory, "plotly.min.js")
+    if not os.path.exists(path):
+        from plotly.offline import get_plotlyjs
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+    return path
+
+
+def to_html(fig, max_points=None, plotlyjs=None, full_html=True):
+    """HTML of a decimated figure; plotlyjs as for plotly.io.to_html ("directory", "cdn", True, False)."""
+    import plotly.io as pio
+
+    plotlyjs = report_settings["plotlyjs"] if plotlyjs is None else plotlyjs
+    downsample_figure(fig, max_points)
+    return pio.to_html(fig, include_plotlyjs=plotlyjs, full_html=full_html)
+
+
+def write_html(fig, path, max_points=None, plotlyjs=None):
+    """
+    Write a lightweight report page.
+
+    Parameters:
+    -----------
+    fig : plotly figure (modified in place by the decimation)
+    path : output .html file
+    max_points : samples per trace (default report_settings; 0 keeps all)
+    plotlyjs : "directory" (shared plotly.min.js next to path), "cdn" or True
+    """
+    plotlyjs = report_settings["plotlyjs"] if plotlyjs is None else plotlyjs
+    if plotlyjs == "directory":
+        ensure_plotlyjs(os.path.dirname(os.path.abspath(path)))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(to_html(fig, max_points, plotlyjs))
+    return path
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    # Three days at 1 s: slow drift, a control oscillation, a short spike and a step
+    t = np.arange(3 * 86400) / 3600.0
+    y = 150 + 30 * np.sin(t / 10) + 2 * np.sin(t * 40)
+    y[100000:100030] += 25
+    y[200000:] -= 20
+
+    start = time.perf_counter()
+    idx = decimate(t, y, 2000)
+    print(f"{y.size} -> {idx.size} samples in {(time.perf_counter() - start) * 1000:.1f} ms; "
+          f"max kept {y[idx].max() == y.max()}, min kept {y[idx].min() == y.min()}")
+
+    fig = go.Figure([go.Scatter(x=t, y=y + k, mode="lines", name=f"trace {k}") for k in range(15)])
+    with tempfile.TemporaryDirectory() as tmp:
+        full = os.path.join(tmp, "full.html")
+        light = os.path.join(tmp, "light.html")
+        pio.write_html(fig, file=full, auto_open=False)
+        write_html(fig, light)
+        full_size, light_size = os.path.getsize(full), os.path.getsize(light)
+        print(f"full {full_size / 1e6:.1f} MB, light {light_size / 1e3:.0f} kB "
+              f"(+ shared plotly.min.js), {full_size / light_size:.0f}x smaller")
@@ -0,0 +1,236 @@
+"""
+Bond's Law / PSD Fitting Pipeline
+
+Batch version of the fit in "Sweco AFS120 test 3-march-2025.ipynb", which
+fits bonds_law(t) = k * t**-alpha to the D90 of one hand-typed test with
+curve_fit. Here every size quantile (D10, D50, D90, ...) of every test in a
+directory of PSD CSVs is fitted in one go.
+
+Fitting:
+- "loglinear" (default): ln D = ln k - alpha * ln t is ordinary least squares,
+  solved in closed form for all series at once with masked sums, including
+  t-distribution confidence intervals on alpha and k.
+- "nonlinear": curve_fit per series in linear space, like the notebook, started
+  from the log-linear solution. Slower; only for comparison.
+
+As in the notebook, the unmilled state (t = 0) is left out of the fit.
+
+CSV layout (one file per test, file name is the test name):
+    Time (min),D90 (µm),D50 (µm),D10 (µm)
+    0,182.4,133.0,85.85
+    60,23.38,8.09,1.311
+    ...
+
+Required packages:
+pip install numpy scipy pandas
+"""
+
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+fit_settings = {
+    "confidence": 0.95,
+    "time_column_pattern": r"(?i)^time",
+    "quantile_column_pattern": r"^D(\d+)",
+}
+
+
+def bonds_law(t, alpha, k):
+    return k * (t ** -alpha)
+
+
+# -----------------------------
+# Loading
+# -----------------------------
+def _quantile_columns(df):
+    return {col: f"D{m.group(1)}" for col in df.columns
+            if (m := re.match(fit_settings["quantile_column_pattern"], str(col)))}
+
+
+def load_psd_table(df, test_name):
+    """Turn one test's wide table into long format (test, quantile, time_min, size_um)."""
+    time_col = next(c for c in df.columns if re.match(fit_settings["time_column_pattern"], str(c)))
+    quantiles = _quantile_columns(df)
+    long = df.melt(id_vars=[time_col], value_vars=list(quantiles), var_name="column",
+                   value_name="size_um")
+    long["quantile"] = long["column"].map(quantiles)
+    long["test"] = test_name
+    return long.rename(columns={time_col: "time_min"})[["test", "quantile", "time_min", "size_um"]]
+
+
+def load_psd_directory(directory, pattern="*.csv", max_workers=8):
+    """Read every PSD CSV in a directory (threaded) into one long DataFrame."""
+    import pandas as pd
+
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+    if not paths:
+        raise FileNotFoundError(f"No files matching {pattern} in {directory}")
+
+    def read(path):
+        return load_psd_table(pd.read_csv(path), os.path.splitext(os.path.basename(path))[0])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return pd.concat(pool.map(read, paths), ignore_index=True)
+
+
+# -----------------------------
+# Fitting
+# -----------------------------
+def masked_linear_fit(x, y, mask, confidence):
+    """
+    Row-wise OLS of y on x for a (n_series, n_points) matrix with a validity mask.
+
+    Returns slope, intercept, their standard errors, the t critical value, n and r².
+    """
+    from scipy import stats
+
+    w = mask.astype(float)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    n = w.sum(axis=1)
+    x_mean = (w * x).sum(axis=1) / n
+    y_mean = (w * y).sum(axis=1) / n
+    dx = np.where(mask, x - x_mean[:, None], 0.0)
+    dy = np.where(mask, y - y_mean[:, None], 0.0)
+    Sxx = (dx * dx).sum(axis=1)
+    Sxy = (dx * dy).sum(axis=1)
+    Syy = (dy * dy).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = Sxy / Sxx
+        intercept = y_mean - slope * x_mean
+        dof = n - 2
+        s2 = np.where(dof > 0, (Syy - slope * Sxy) / dof, np.nan)
+        s2 = np.maximum(s2, 0.0)
+        se_slope = np.sqrt(s2 / Sxx)
+        se_intercept = np.sqrt(s2 * (1 / n + x_mean**2 / Sxx))
+        r2 = np.where(Syy > 0, slope * Sxy / Syy, 1.0)
+    t_crit = np.where(dof > 0, stats.t.ppf(0.5 + confidence / 2, np.maximum(dof, 1)), np.nan)
+    return slope, intercept, se_slope, se_intercept, t_crit, n, r2
+
+
+def fit_bonds_law(data, method="loglinear", confidence=None):
+    """
+    Fit bonds_law to every (test, quantile) series in a long DataFrame.
+
+    Parameters:
+    -----------
+    data : DataFrame
+        Columns test, quantile, time_min, size_um (see load_psd_directory)
+    method : "loglinear" or "nonlinear"
+    confidence : float
+        Two-sided confidence level for the intervals (default 0.95)
+
+    Returns:
+    --------
+    DataFrame with one row per series: test, quantile, n_points, alpha,
+    alpha_low, alpha_high, k, k_low, k_high, r2 (of the log-log fit)
+    """
+    from scipy.optimize import curve_fit
+
+    confidence = fit_settings["confidence"] if confidence is None else confidence
+    data = data[(data["time_min"] > 0) & (data["size_um"] > 0)].dropna(subset=["size_um"])
+
+    # Pack ragged series into padded matrices so all fits run as array operations
+    series_id = data.groupby(["test", "quantile"], sort=False).ngroup().to_numpy()
+    position = data.groupby(["test", "quantile"], sort=False).cumcount().to_numpy()
+    keys = (data.assign(series_id=series_id)
+            .drop_duplicates("series_id").sort_values("series_id")[["test", "quantile"]]
+            .reset_index(drop=True))
+    n_series = len(keys)
+    width = position.max() + 1 if len(position) else 0
+    t = np.ones((n_series, width))
+    D = np.ones((n_series, width))
+    mask = np.zeros((n_series, width), dtype=bool)
+    t[series_id, position] = data["time_min"].to_numpy(dtype=float)
+    D[series_id, position] = data["size_um"].to_numpy(dtype=float)
+    mask[series_id, position] = True
+
+    slope, intercept, se_slope, se_intercept, t_crit, n, r2 = masked_linear_fit(
+        np.log(t), np.log(D), mask, confidence)
+    alpha = -slope
+    k = np.exp(intercept)
+    alpha_low, alpha_high = alpha - t_crit * se_slope, alpha + t_crit * se_slope
+    k_low, k_high = np.exp(intercept - t_crit * se_intercept), np.exp(intercept + t_crit * se_intercept)
+
+    if method == "nonlinear":
+        for i in range(n_series):
+            ti, Di = t[i, mask[i]], D[i, mask[i]]
+            if ti.size < 3:
+                continue
+            popt, pcov = curve_fit(bonds_law, ti, Di, p0=(alpha[i], k[i]), maxfev=10000)
+            half = t_crit[i] * np.sqrt(np.diag(pcov))
+            alpha[i], k[i] = popt
+            alpha_low[i], alpha_high[i] = popt[0] - half[0], popt[0] + half[0]
+            k_low[i], k_high[i] = popt[1] - half[1], popt[1] + half[1]
+    elif method != "loglinear":
+        raise ValueError(f"Unknown method: {method}")
+
+    result = keys.copy()
+    result["n_points"] = n.astype(int)
+    result["alpha"] = alpha
+    result["alpha_low"] = alpha_low
+    result["alpha_high"] = alpha_high
+    result["k"] = k
+    result["k_low"] = k_low
+    result["k_high"] = k_high
+    result["r2"] = r2
+    return result
+
+
+def fit_directory(directory, pattern="*.csv", method="loglinear", confidence=None):
+    """Load every PSD CSV in a directory and return the parameter table."""
+    return fit_bonds_law(load_psd_directory(directory, pattern), method, confidence)
+
+
+def main(argv=None):
+    """Command line entry point (psd-fit): fit_directory with --set directory=... (pattern, method, confidence)."""
+    import model_cli
+
+    return model_cli.run(fit_directory, "Bond's law fits of every PSD CSV in a directory", argv)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    import pandas as pd
+
+    # The Sweco AFS120 test from the notebook
+    sweco = pd.DataFrame({
+        "Time (min)": [0, 60, 130, 210, 300],
+        "D90 (µm)": [182.4, 23.38, 12.63, 7.70, 5.72],
+        "D50 (µm)": [133.0, 8.09, 3.92, 2.514, 1.804],
+        "D10 (µm)": [85.85, 1.311, 0.827, 0.675, 0.620],
+    })
+    single = load_psd_table(sweco, "Sweco AFS120 3-march-2025")
+    print(fit_bonds_law(single).round(3).to_string(index=False))
+    print("\nNon-linear fit as in the notebook:")
+    print(fit_bonds_law(single, method="nonlinear").round(3).to_string(index=False))
+
+    # Hundreds of synthetic trials written as CSVs and fitted from the directory
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        times = np.array([0, 30, 60, 90, 130, 170, 210, 250, 300])
+        for i in range(500):
+            trial = {"Time (min)": times}
+            for q, k in (("D90", 1400), ("D50", 500), ("D10", 90)):
+                alpha = rng.uniform(0.7, 1.1)
+                sizes = k * np.maximum(times, 1) ** -alpha * rng.lognormal(0, 0.05, times.size)
+                sizes[0] = 2 * k / 10
+                trial[f"{q} (µm)"] = sizes
+            pd.DataFrame(trial).to_csv(os.path.join(directory, f"trial_{i:03d}.csv"), index=False)
+        data = load_psd_directory(directory)
+        start = time.perf_counter()
+        params = fit_bonds_law(data)
+        elapsed = time.perf_counter() - start
+    print(f"\nFitted {len(params)} series from 500 trials in {elapsed * 1000:.1f} ms")
+    print(params.head().round(3).to_string(index=False))
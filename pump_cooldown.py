@@ -0,0 +1,215 @@
+"""
+Pump Cool-Down Engine
+
+Physics-based replacement for the 1 s time-stepping loop in
+"Pump cool down calculation.py" and its notebook twins.
+
+Lumped model (same assumptions as the script: perfect heat exchange, no
+losses, CO2 leaves at T_pump - T_approach):
+
+    M_pump * c_pump * dT/dt = -m_dot_CO2 * (h(T - T_approach, P) - h(T_CO2_in, P))
+
+Differences with the script:
+- CO2 enthalpy comes from a table built once at the actual line pressure
+  instead of CP.PropsSI('C', ...) at 1 atm every step. The enthalpy rise
+  h(T_out) - h(T_in) is cp integrated over the CO2 temperature rise, so
+  evaporation of the CO2 in the pump is included.
+- The ODE is integrated with an adaptive solver (solve_ivp) and stops
+  exactly at T_target through a terminal event.
+- Pump mass, pump heat capacity and CO2 flow only scale time: with
+  tau = t * m_dot / (M * c) every combination follows the same master curve.
+  A whole family of curves therefore costs one integration.
+
+Required packages:
+pip install coolprop numpy scipy pandas
+"""
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+config = {
+    "mass_pump": 7.5,  # kg
+    "c_pump": 500,  # J/kg·K (typical for stainless steel)
+    "T_init": 25 + 273.15,  # K
+    "T_target": -25 + 273.15,  # K
+    "T_approach": 5,  # K, min difference between CO2 and pump temperature
+    "mass_flow_CO2": 60 / 3600,  # kg/s (60 kg/h)
+    "T_CO2_in": -32 + 273.15,  # K
+    "line_pressure_bar": 20,  # bar absolute, CO2 supply line
+    "fluid": "CO2",
+}
+
+table_step_K = 0.05  # resolution of the enthalpy table
+
+
+# -----------------------------
+# Cached enthalpy table
+# -----------------------------
+_enthalpy_cache = {}
+
+
+def get_enthalpy_table(P_Pa, T_min, T_max, fluid="CO2", step=table_step_K):
+    """Return (T, h) at constant pressure, built once per (P, range, fluid)."""
+    from CoolProp.CoolProp import PropsSI
+
+    T_lo = np.floor(T_min / step) * step
+    T_hi = np.ceil(T_max / step) * step
+    key = (fluid, round(P_Pa), T_lo, T_hi, step)
+    if key not in _enthalpy_cache:
+        T = np.arange(T_lo, T_hi + step / 2, step)
+        h = PropsSI("H", "T", T, "P", np.full_like(T, P_Pa), fluid)
+        # Points exactly on the saturation line fail in CoolProp; interpolation bridges them
+        ok = np.isfinite(h)
+        _enthalpy_cache[key] = (T[ok], h[ok])
+    return _enthalpy_cache[key]
+
+
+# -----------------------------
+# Master curve
+# -----------------------------
+class CooldownCurve:
+    """
+    Dimensionless cool-down curve T(tau) with tau = t * m_dot_CO2 / (M_pump * c_pump) in K·kg/J.
+
+    Built once per (T_init, T_target, T_approach, T_CO2_in, line pressure).
+    """
+
+    def __init__(self, T_init, T_target, T_approach, T_CO2_in, line_pressure_bar, fluid="CO2",
+                 rtol=1e-8, atol=1e-8):
+        from scipy.integrate import solve_ivp
+
+        self.T_init = T_init
+        self.T_target = T_target
+        self.T_approach = T_approach
+        self.T_CO2_in = T_CO2_in
+        self.line_pressure_bar = line_pressure_bar
+        self.reachable = T_target - T_approach > T_CO2_in
+
+        P = line_pressure_bar * 1e5
+        self._T_tab, self._h_tab = get_enthalpy_table(P, T_CO2_in, T_init, fluid)
+        self._h_in = np.interp(T_CO2_in, self._T_tab, self._h_tab)
+
+        def rhs(tau, T):
+            # J/kg picked up by the CO2 per kg flowing, i.e. the pump's loss per unit tau
+            return -(np.interp(T - T_approach, self._T_tab, self._h_tab) - self._h_in)
+
+        def reached_target(tau, T):
+            return T[0] - T_target
+        reached_target.terminal = True
+        reached_target.direction = -1
+
+        # Upper bound on tau: the slowest possible rate is at the target temperature
+        dh_min = np.interp(T_target - T_approach, self._T_tab, self._h_tab) - self._h_in
+        tau_max = 10 * (T_init - T_target) / dh_min if self.reachable and dh_min > 0 else 1e3
+
+        self.solution = solve_ivp(rhs, (0.0, tau_max), [T_init], method="RK45",
+                                  events=reached_target, dense_output=True, rtol=rtol, atol=atol)
+        if self.reachable and self.solution.t_events[0].size:
+            self.tau_target = float(self.solution.t_events[0][0])
+        else:
+            self.tau_target = np.inf
+
+    def temperature(self, tau):
+        """Pump temperature [K] at tau; held at T_target after the event."""
+        tau = np.asarray(tau, dtype=float)
+        tau_end = min(self.tau_target, self.solution.t[-1])
+        T = self.solution.sol(np.clip(tau, 0.0, tau_end).ravel())[0].reshape(tau.shape)
+        if np.isfinite(self.tau_target):
+            T = np.where(tau >= self.tau_target, self.T_target, T)
+        return T
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def simulate_cooldown(mass_pump=None, mass_flow_CO2=None, c_pump=None, t_eval=None, **overrides):
+    """
+    Cool-down curves for every combination of pump mass and CO2 flow.
+
+    Parameters:
+    -----------
+    mass_pump : float or array, kg
+    mass_flow_CO2 : float or array, kg/s
+        Broadcast against each other (use np.meshgrid for a full factorial).
+    c_pump : float or array, J/kg·K
+    t_eval : array, s, optional
+        Common time grid for the curves; default 0..slowest time to target in 1 s.
+    overrides :
+        Any other key of config (T_init, T_target, T_approach, T_CO2_in, line_pressure_bar).
+
+    Returns:
+    --------
+    summary : DataFrame
+        One row per combination with the time to reach T_target (inf if never).
+    curves : DataFrame
+        Pump temperature in °C, index t_eval [s], one column per combination.
+    """
+    import pandas as pd
+
+    p = dict(config)
+    p.update(overrides)
+    mass_pump = p["mass_pump"] if mass_pump is None else mass_pump
+    mass_flow_CO2 = p["mass_flow_CO2"] if mass_flow_CO2 is None else mass_flow_CO2
+    c_pump = p["c_pump"] if c_pump is None else c_pump
+    M, m_dot, c = (a.ravel() for a in np.broadcast_arrays(
+        np.asarray(mass_pump, dtype=float), np.asarray(mass_flow_CO2, dtype=float),
+        np.asarray(c_pump, dtype=float)))
+
+    curve = CooldownCurve(p["T_init"], p["T_target"], p["T_approach"], p["T_CO2_in"],
+                          p["line_pressure_bar"], p["fluid"])
+    time_scale = M * c / m_dot  # s per unit tau
+    t_target = curve.tau_target * time_scale
+
+    summary = pd.DataFrame({
+        "mass_pump_kg": M,
+        "c_pump_J_per_kgK": c,
+        "mass_flow_CO2_kgph": m_dot * 3600,
+        "time_to_target_s": t_target,
+        "time_to_target_min": t_target / 60,
+    })
+
+    if t_eval is None:
+        finite = t_target[np.isfinite(t_target)]
+        t_end = finite.max() if finite.size else 3600.0
+        t_eval = np.arange(0.0, np.ceil(t_end) + 1.0)
+    t_eval = np.asarray(t_eval, dtype=float)
+    T = curve.temperature(t_eval[:, None] / time_scale[None, :])
+    labels = [f"M={m:g} kg, {f * 3600:g} kg/h" for m, f in zip(M, m_dot)]
+    curves = pd.DataFrame(T - 273.15, index=pd.Index(t_eval, name="time_s"), columns=labels)
+    return summary, curves
+
+
+def main(argv=None):
+    """Command line entry point (pump-cooldown): the summary of simulate_cooldown with --set overrides."""
+    import model_cli
+
+    return model_cli.run(lambda **overrides: simulate_cooldown(**overrides)[0], "Pump cool-down by CO2", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    # Single curve with the script's inputs, at line pressure
+    summary, curves = simulate_cooldown()
+    print(summary.to_string(index=False))
+
+    # Family of curves: pump masses x CO2 flows
+    masses, flows = np.meshgrid([5.0, 7.5, 10.0, 15.0], np.array([30, 60, 90, 120]) / 3600)
+    start = time.perf_counter()
+    summary, curves = simulate_cooldown(masses, flows)
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(summary)} curves in {elapsed * 1000:.1f} ms")
+    print(summary.pivot(index="mass_pump_kg", columns="mass_flow_CO2_kgph",
+                        values="time_to_target_min").round(1).to_string())
+
+    import matplotlib.pyplot as plt
+
+    curves.plot(figsize=(10, 6), legend=False)
+    plt.xlabel("Time (s)")
+    plt.ylabel("Pump Temperature (°C)")
+    plt.title("Cooling of Pump by CO₂ at -32°C")
+    plt.grid(True)
+    plt.show()
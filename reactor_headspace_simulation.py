@@ -16,15 +16,31 @@ Outputs:
 - CSV export
 - Warning if H₂ exceeds 10% of its Lower Explosive Limit (LEL)
 
+The calculation is in functions (derived, simulate) so the model can be
+imported without running it; CoolProp, pandas and matplotlib are imported
+when a run, table or plot needs them. Running the file does what the script
+did: print the feeds, simulate, plot and optionally save the CSV. The
+`headspace` command runs simulate() with --set overrides (see model_cli).
+
+simulate_species() tracks every impurity of the CO2 feed (feed_impurities:
+N2, O2, Ar, CH4, ...) and H2 with a Peng-Robinson mixture (peng_robinson.py)
+instead of adding pure-gas volumes, for one or many scenarios at once.
+headspace_uncertainty.py gives the probability of H2 above the warning level
+and Sobol indices for uncertain yield, conversion, purity and purge.
+
+simulate_trajectory() drops the fixed temperature and pressure: it follows
+a T(t) / P(t) trajectory such as the OBX heat-up and cool-down cycle of
+obx_heat_model.py, with molar volumes and CO2 solubility per step from
+cached property tables.
+
 Required packages:
 pip install coolprop matplotlib numpy pandas
 """
 
-import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
-from CoolProp.CoolProp import PropsSI
 import datetime
+import os
+
+import numpy as np
 
 
 # -----------------------------
@@ -47,8 +63,10 @@ config = {
     "fayalite_conversion": 0.33,
     "h2_yield_per_fayalite": 0.005,  # updated based on paper (0.5%)
  
-    "CO2_solubility_kg_per_100L": 3,
+    "CO2_solubility_kg_per_100L": None,  # None: Duan-Sun model at temperature/pressure (was 3)
+    "salinity_molal": 0.0,  # mol NaCl/kg water, for the solubility model
     "CO2_feed_purity": 0.997,
+    "feed_impurities": None,  # simulate_species: mol fractions in the CO2 feed, e.g. {"N2": 0.002, "O2": 0.0005}; None: N2 at 1 - CO2_feed_purity
     "CO2_purge_wt_fraction": 0.01,
     "temperature_C": 175,
     "pressure_bar": 100,
@@ -56,178 +74,616 @@ config = {
     "debug": True
 }
 
+H2_LEL_WARNING_PCT = 0.4  # 10% of the H2 LEL (4 vol%)
+
+trajectory_settings = {  # simulate_trajectory
+    # Molar volume table grid (°C, bar absolute)
+    "T_min_C": 0.0,
+    "T_max_C": 260.0,
+    "T_step_C": 2.0,
+    "P_min_bar": 2.0,
+    "P_max_bar": 200.0,
+    "P_step_bar": 2.0,
+    # Trajectory columns: the obx_heat_model results table by default; no pressure column: config pressure_bar
+    "columns": {"time_h": "time_hours", "temperature_C": "T_reactor", "pressure_bar": None},
+}
+
+
 # -----------------------------
 # Helper: Molar Volume via CoolProp
 # -----------------------------
 def get_molar_volume(gas, T_K, P_Pa):
+    from CoolProp.CoolProp import PropsSI
+
     density = PropsSI("D", "T", T_K, "P", P_Pa, gas)
     molar_mass = PropsSI("M", gas)
     return molar_mass / density
 
+
+def resolve(**overrides):
+    """config with overrides."""
+    unknown = set(overrides) - set(config)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {sorted(unknown)}")
+    c = dict(config)
+    c.update(overrides)
+    return c
+
+
 # -----------------------------
 # Unpack and derive parameters
 # -----------------------------
-T_K = config["temperature_C"] + 273.15
-P_Pa = config["pressure_bar"] * 1e5
-dt = config["dt"]
-n_steps = int(config["time_h"] / dt)
-headspace_volume_m3 = config["headspace_volume_L"] / 1000
-n2_impurity = 1 - config["CO2_feed_purity"]
-
-# Molar volumes [m³/mol]
-Vmol_CO2 = get_molar_volume("CO2", T_K, P_Pa)
-Vmol_N2 = get_molar_volume("N2", T_K, P_Pa)
-Vmol_H2 = get_molar_volume("H2", T_K, P_Pa)
-
-
-# CO2 dissolution
-CO2_solubility_kgph = (config["CO2_solubility_kg_per_100L"] / 100) * config["water_feed_Lph"]
-CO2_dissolved_molph = (CO2_solubility_kgph * 1000) / config["CO2_M"]
-
-# Mineral feed to mol/h
-forsterite_molph = (config["mineral_feed_kgph"] * 1000 * config["forsterite_frac"]) / config["forsterite_M"]
-fayalite_molph = (config["mineral_feed_kgph"] * 1000 * config["fayalite_frac"]) / config["fayalite_M"]
-
-# CO2 consumption
-CO2_needed_molph = (
-    forsterite_molph * 2 * config["forsterite_conversion"] +
-    fayalite_molph * 2 * config["fayalite_conversion"]
-)
-CO2_feed_molph = CO2_needed_molph + CO2_dissolved_molph
-
-# Calculate CO2 consumption in kg/h
-CO2_consumed_reaction_kgph = CO2_needed_molph * config["CO2_M"] / 1000  # mol/h to kg/h
-CO2_total_consumed_kgph = CO2_consumed_reaction_kgph + CO2_solubility_kgph 
-
-# Print the CO2 consumption details
-print("\n--- CO2 Consumption Details ---")
-print(f"CO2 consumed by reaction: {CO2_consumed_reaction_kgph:.2f} kg/h")
-print(f"CO2 consumed by water saturation: {CO2_solubility_kgph:.2f} kg/h")
-print(f"Total CO2 consumed: {CO2_total_consumed_kgph:.2f} kg/h\n")
-
-
-# Inert and H2 feed
-N2_feed_molph = CO2_feed_molph / config["CO2_feed_purity"] * n2_impurity
-H2_feed_molph = fayalite_molph * config["fayalite_conversion"] * config["h2_yield_per_fayalite"]
-purge_molph = CO2_feed_molph * config["CO2_purge_wt_fraction"]
-
-# ---------------------------------------------------------
-# Estimate 95% Equilibrium Time for Inert Gases (Analytical)
-# ---------------------------------------------------------
-# We're modeling the accumulation of inert gases (H₂, N₂)
-# into a constant-volume headspace with ideal gas behavior.
-# These gases build up from a constant inflow and are removed
-# proportionally via an ideal mixing purge (like a CSTR).
-#
-# The dynamic follows:
-#   dC/dt = R_in - k * C     (1st order)
-#   C_ss = R_in / k
-#   t_95% ≈ 3 / k
-#
-# Where:
-#   R_in = mol/h inflow of the gas (H₂ or N₂)
-#   purge_molph = total purge rate in mol/h
-#   k = purge_molph / total mol in headspace (assumed constant)
-# ---------------------------------------------------------
-
-# Estimate initial mol content of headspace (100% CO2 at start)
-headspace_mol = headspace_volume_m3 / Vmol_CO2  # mol
-# Effective purge constant
-k_purge = purge_molph / headspace_mol  # 1/h
-# Time to 95% equilibrium = 3 time constants
-t95 = 3 / k_purge  # for any trace gas like H₂
-
-print("\n--- Analytical Estimate of Time to 95% Equilibrium ---")
-print(f"Headspace mol content: {headspace_mol:.1f} mol")
-print(f"Purge rate: {purge_molph:.2f} mol/h")
-print(f"Effective purge constant k: {k_purge:.4f} 1/h")
-print(f"→ Estimated time to reach 95% of equilibrium for trace gases: {t95:.1f} hours\n")
+def derived(**overrides):
+    """
+    Feeds, molar volumes and the analytical purge time constant of a
+    configuration (config with overrides).
+
+    Returns a dict: the merged "config", T_K, P_Pa, n_steps,
+    headspace_volume_m3, Vmol_CO2/N2/H2 [m³/mol], the CO2 balance (mol/h and
+    kg/h), N2_feed_molph, H2_feed_molph, purge_molph, headspace_mol,
+    k_purge [1/h] and t95 [h].
+    """
+    c = resolve(**overrides)
+    T_K = c["temperature_C"] + 273.15
+    P_Pa = c["pressure_bar"] * 1e5
+    headspace_volume_m3 = c["headspace_volume_L"] / 1000
+
+    # Molar volumes [m³/mol]
+    Vmol_CO2 = get_molar_volume("CO2", T_K, P_Pa)
+    Vmol_N2 = get_molar_volume("N2", T_K, P_Pa)
+    Vmol_H2 = get_molar_volume("H2", T_K, P_Pa)
+
+    balance = feed_balance(c)
+    purge_molph = balance["purge_molph"]
+
+    # ---------------------------------------------------------
+    # Estimate 95% Equilibrium Time for Inert Gases (Analytical)
+    # ---------------------------------------------------------
+    # We're modeling the accumulation of inert gases (H₂, N₂)
+    # into a constant-volume headspace with ideal gas behavior.
+    # These gases build up from a constant inflow and are removed
+    # proportionally via an ideal mixing purge (like a CSTR).
+    #
+    # The dynamic follows:
+    #   dC/dt = R_in - k * C     (1st order)
+    #   C_ss = R_in / k
+    #   t_95% ≈ 3 / k
+    #
+    # Where:
+    #   R_in = mol/h inflow of the gas (H₂ or N₂)
+    #   purge_molph = total purge rate in mol/h
+    #   k = purge_molph / total mol in headspace (assumed constant)
+    # ---------------------------------------------------------
+
+    # Estimate initial mol content of headspace (100% CO2 at start)
+    headspace_mol = headspace_volume_m3 / Vmol_CO2  # mol
+    # Effective purge constant
+    k_purge = purge_molph / headspace_mol  # 1/h
+    # Time to 95% equilibrium = 3 time constants
+    t95 = 3 / k_purge  # for any trace gas like H₂
+
+    return {
+        "config": c,
+        "T_K": T_K,
+        "P_Pa": P_Pa,
+        "n_steps": int(c["time_h"] / c["dt"]),
+        "headspace_volume_m3": headspace_volume_m3,
+        "Vmol_CO2": Vmol_CO2,
+        "Vmol_N2": Vmol_N2,
+        "Vmol_H2": Vmol_H2,
+        **balance,
+        "headspace_mol": headspace_mol,
+        "k_purge": k_purge,
+        "t95": t95,
+    }
+
+
+def feed_balance(c):
+    """
+    CO2 balance, N2 / H2 feeds and purge of a resolved config (no property
+    calls except the CO2 solubility).
+
+    Returns a dict: CO2_dissolved_molph, CO2_solubility_kgph,
+    CO2_needed_molph, CO2_feed_molph, CO2_consumed_reaction_kgph,
+    CO2_total_consumed_kgph, N2_feed_molph, H2_feed_molph and purge_molph.
+    """
+    n2_impurity = 1 - c["CO2_feed_purity"]
+
+    # CO2 dissolution
+    if c["CO2_solubility_kg_per_100L"] is None:
+        from co2_solubility import duan_sun_molality
+        # Single operating point: evaluate the model directly instead of building the lookup table
+        CO2_dissolved_molph = float(duan_sun_molality(c["temperature_C"], c["pressure_bar"],
+                                                      c["salinity_molal"])) * c["water_feed_Lph"]
+        CO2_solubility_kgph = CO2_dissolved_molph * c["CO2_M"] / 1000
+    else:
+        CO2_solubility_kgph = (c["CO2_solubility_kg_per_100L"] / 100) * c["water_feed_Lph"]
+        CO2_dissolved_molph = (CO2_solubility_kgph * 1000) / c["CO2_M"]
+
+    # Mineral feed to mol/h
+    forsterite_molph = (c["mineral_feed_kgph"] * 1000 * c["forsterite_frac"]) / c["forsterite_M"]
+    fayalite_molph = (c["mineral_feed_kgph"] * 1000 * c["fayalite_frac"]) / c["fayalite_M"]
+
+    # CO2 consumption
+    CO2_needed_molph = (
+        forsterite_molph * 2 * c["forsterite_conversion"] +
+        fayalite_molph * 2 * c["fayalite_conversion"]
+    )
+    CO2_feed_molph = CO2_needed_molph + CO2_dissolved_molph
+
+    # Calculate CO2 consumption in kg/h
+    CO2_consumed_reaction_kgph = CO2_needed_molph * c["CO2_M"] / 1000  # mol/h to kg/h
+    CO2_total_consumed_kgph = CO2_consumed_reaction_kgph + CO2_solubility_kgph
+
+    # Inert and H2 feed
+    N2_feed_molph = CO2_feed_molph / c["CO2_feed_purity"] * n2_impurity
+    H2_feed_molph = fayalite_molph * c["fayalite_conversion"] * c["h2_yield_per_fayalite"]
+    purge_molph = CO2_feed_molph * c["CO2_purge_wt_fraction"]
+
+    return {
+        "CO2_dissolved_molph": CO2_dissolved_molph,
+        "CO2_solubility_kgph": CO2_solubility_kgph,
+        "CO2_needed_molph": CO2_needed_molph,
+        "CO2_feed_molph": CO2_feed_molph,
+        "CO2_consumed_reaction_kgph": CO2_consumed_reaction_kgph,
+        "CO2_total_consumed_kgph": CO2_total_consumed_kgph,
+        "N2_feed_molph": N2_feed_molph,
+        "H2_feed_molph": H2_feed_molph,
+        "purge_molph": purge_molph,
+    }
+
+
+def print_derived(d):
+    """The script's CO2 consumption and equilibrium time printout."""
+    print("\n--- CO2 Consumption Details ---")
+    print(f"CO2 consumed by reaction: {d['CO2_consumed_reaction_kgph']:.2f} kg/h")
+    print(f"CO2 consumed by water saturation: {d['CO2_solubility_kgph']:.2f} kg/h")
+    print(f"Total CO2 consumed: {d['CO2_total_consumed_kgph']:.2f} kg/h\n")
+
+    print("\n--- Analytical Estimate of Time to 95% Equilibrium ---")
+    print(f"Headspace mol content: {d['headspace_mol']:.1f} mol")
+    print(f"Purge rate: {d['purge_molph']:.2f} mol/h")
+    print(f"Effective purge constant k: {d['k_purge']:.4f} 1/h")
+    print(f"→ Estimated time to reach 95% of equilibrium for trace gases: {d['t95']:.1f} hours\n")
 
 
 # -----------------------------
 # Simulation Loop
 # -----------------------------
-CO2_acc = headspace_volume_m3 / Vmol_CO2  # initial mol CO2 in headspace
-N2_acc = 0.0
-H2_acc = 0.0
-vol_pct_N2, vol_pct_H2, time_series, purge_weights = [], [], [], []
-
-print(f"Simulation started at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-for step in range(n_steps):
-    N2_acc += N2_feed_molph * dt
-    H2_acc += H2_feed_molph * dt
-    V_N2 = N2_acc * Vmol_N2
-    V_H2 = H2_acc * Vmol_H2
-    # Remaining volume = CO2 volume
-    V_CO2 = headspace_volume_m3 - V_N2 - V_H2
-    
-    if V_CO2 < 0:
-         raise ValueError(f"At time {step * dt:.2f} h, gas volume exceeds headspace! "
-                                                   f"(V_N2 + V_H2 = {V_N2 + V_H2:.3f} m³)")
-    CO2_acc = V_CO2 / Vmol_CO2  
-    # Total mol in headspace
-    total_mol = CO2_acc + N2_acc + H2_acc
-
-    if total_mol > 0:
-        # Mole fractions in the purge stream
-        x_CO2 = CO2_acc / total_mol
-        x_N2 = N2_acc / total_mol
-        x_H2 = H2_acc / total_mol
-
-        # Purge flow rates (mol/h) for each gas
-        purge_CO2 = purge_molph * x_CO2
-        purge_N2 = purge_molph * x_N2
-        purge_H2 = purge_molph * x_H2
-
-        # Purge flow weights (kg/h) for each gas
-        purge_weight_CO2 = purge_CO2 * config["CO2_M"] / 1000
-        purge_weight_N2 = purge_N2 * config["N2_M"] / 1000
-        purge_weight_H2 = purge_H2 * config["H2_M"] / 1000
-
-        # Total purge weight (kg/h)
-        total_purge_weight = purge_weight_CO2 + purge_weight_N2 + purge_weight_H2
-        purge_weights.append(total_purge_weight)
-
-        # Update accumulations after purge
-        N2_acc -= purge_N2 * dt
-        H2_acc -= purge_H2 * dt
-        CO2_acc -= purge_CO2 * dt
-
-    vol_pct_N2.append(100 * V_N2 / headspace_volume_m3)
-    vol_pct_H2.append(100 * V_H2 / headspace_volume_m3)
-    time_series.append(step * dt)
-
-    if config["debug"] and vol_pct_H2[-1] > 0.4:
-        print(f"[WARNING] H2 exceeds 10% LEL at {time_series[-1]:.2f} hours: {vol_pct_H2[-1]:.3f}%")
+def simulate(**overrides):
+    """
+    N2 / H2 accumulation in the purged headspace.
+
+    Returns:
+    --------
+    dict with arrays time_h, vol_pct_N2, vol_pct_H2, purge_weight_kgph (one
+    value per step) and "derived" (see derived()).
+    """
+    d = derived(**overrides)
+    c = d["config"]
+    dt = c["dt"]
+    headspace_volume_m3 = d["headspace_volume_m3"]
+    Vmol_CO2, Vmol_N2, Vmol_H2 = d["Vmol_CO2"], d["Vmol_N2"], d["Vmol_H2"]
+    N2_feed_molph, H2_feed_molph, purge_molph = d["N2_feed_molph"], d["H2_feed_molph"], d["purge_molph"]
+
+    CO2_acc = headspace_volume_m3 / Vmol_CO2  # initial mol CO2 in headspace
+    N2_acc = 0.0
+    H2_acc = 0.0
+    vol_pct_N2, vol_pct_H2, time_series, purge_weights = [], [], [], []
+
+    for step in range(d["n_steps"]):
+        N2_acc += N2_feed_molph * dt
+        H2_acc += H2_feed_molph * dt
+        V_N2 = N2_acc * Vmol_N2
+        V_H2 = H2_acc * Vmol_H2
+        # Remaining volume = CO2 volume
+        V_CO2 = headspace_volume_m3 - V_N2 - V_H2
+
+        if V_CO2 < 0:
+            raise ValueError(f"At time {step * dt:.2f} h, gas volume exceeds headspace! "
+                             f"(V_N2 + V_H2 = {V_N2 + V_H2:.3f} m³)")
+        CO2_acc = V_CO2 / Vmol_CO2
+        # Total mol in headspace
+        total_mol = CO2_acc + N2_acc + H2_acc
+
+        if total_mol > 0:
+            # Mole fractions in the purge stream
+            x_CO2 = CO2_acc / total_mol
+            x_N2 = N2_acc / total_mol
+            x_H2 = H2_acc / total_mol
+
+            # Purge flow rates (mol/h) for each gas
+            purge_CO2 = purge_molph * x_CO2
+            purge_N2 = purge_molph * x_N2
+            purge_H2 = purge_molph * x_H2
+
+            # Purge flow weights (kg/h) for each gas
+            purge_weight_CO2 = purge_CO2 * c["CO2_M"] / 1000
+            purge_weight_N2 = purge_N2 * c["N2_M"] / 1000
+            purge_weight_H2 = purge_H2 * c["H2_M"] / 1000
+
+            # Total purge weight (kg/h)
+            total_purge_weight = purge_weight_CO2 + purge_weight_N2 + purge_weight_H2
+            purge_weights.append(total_purge_weight)
+
+            # Update accumulations after purge
+            N2_acc -= purge_N2 * dt
+            H2_acc -= purge_H2 * dt
+            CO2_acc -= purge_CO2 * dt
+
+        vol_pct_N2.append(100 * V_N2 / headspace_volume_m3)
+        vol_pct_H2.append(100 * V_H2 / headspace_volume_m3)
+        time_series.append(step * dt)
+
+    return {
+        "time_h": np.array(time_series),
+        "vol_pct_N2": np.array(vol_pct_N2),
+        "vol_pct_H2": np.array(vol_pct_H2),
+        "purge_weight_kgph": np.array(purge_weights),
+        "derived": d,
+    }
 
 
 # -----------------------------
-# Plotting
-# -----------------------------
-plt.figure(figsize=(10, 5))
-plt.plot(time_series, vol_pct_N2, label="N₂ vol%")
-plt.plot(time_series, vol_pct_H2, label="H₂ vol%")
-plt.axhline(0.4, color='red', linestyle='--', label="10% LEL H₂ (0.4%)")
-plt.xlabel("Time [h]")
-plt.ylabel("Gas Volume % in Headspace")
-plt.title("Inert Gas Accumulation with 5 wt% CO₂ Purge")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.show()
-
-# ----------------------------- 
-# Optional CSV Export
+# Temperature / Pressure Trajectory
 # -----------------------------
-if config["save_to_csv"]:
+_molar_volume_table = None
+
+
+def molar_volume_table(path=None):
+    """
+    Molar volumes [m³/mol] of CO2, N2 and H2 on the grid of
+    trajectory_settings (co2_property_tables.PropertyTable with one "property"
+    per gas), built with CoolProp on first use and kept for the session.
+
+    With path: loaded from there if the file exists, otherwise built and saved there.
+    """
+    global _molar_volume_table
+    if _molar_volume_table is None:
+        from co2_property_tables import PropertyTable, build_property_table
+
+        if path is not None and os.path.exists(path):
+            _molar_volume_table = PropertyTable.load(path)
+        else:
+            s = trajectory_settings
+            T_C = np.arange(s["T_min_C"], s["T_max_C"] + s["T_step_C"] / 2, s["T_step_C"])
+            P_bar = np.arange(s["P_min_bar"], s["P_max_bar"] + s["P_step_bar"] / 2, s["P_step_bar"])
+            volumes = {gas: 1 / build_property_table("DMOLAR", T_C, P_bar, fluid=gas).values["DMOLAR"]
+                       for gas in ("CO2", "N2", "H2")}
+            _molar_volume_table = PropertyTable("CO2/N2/H2", T_C, P_bar, volumes,
+                                                {gas: "m3/mol" for gas in volumes})
+            if path is not None:
+                _molar_volume_table.save(path)
+    return _molar_volume_table
+
+
+def _resample(trajectory, columns, dt, pressure_bar):
+    """Time [h] on the dt grid over the trajectory's span, and T [°C] and P [bar] interpolated onto it."""
+    time = np.asarray(trajectory[columns["time_h"]], dtype=float)
+    T = np.asarray(trajectory[columns["temperature_C"]], dtype=float)
+    P = pressure_bar if columns.get("pressure_bar") is None else trajectory[columns["pressure_bar"]]
+    P = np.broadcast_to(np.asarray(P, dtype=float), T.shape)
+    if time.ndim != 1 or time.size != T.shape[0] or np.any(np.diff(time) <= 0):
+        raise ValueError("The trajectory time must be increasing, one value per row of the temperatures")
+
+    time_h = time[0] + np.arange(int((time[-1] - time[0]) / dt + 1e-9) + 1) * dt
+    # Linear interpolation along axis 0, for one trajectory or a column per scenario
+    i = np.clip(np.searchsorted(time, time_h, side="right") - 1, 0, time.size - 2)
+    w = ((time_h - time[i]) / (time[i + 1] - time[i])).reshape((-1,) + (1,) * (T.ndim - 1))
+    return time_h, T[i] * (1 - w) + T[i + 1] * w, P[i] * (1 - w) + P[i + 1] * w
+
+
+def simulate_trajectory(trajectory, columns=None, **overrides):
+    """
+    N2 / H2 accumulation as in simulate(), at a temperature and pressure that
+    follow a trajectory, e.g. the obx_heat_model results table (reactor
+    temperature over the heat-up / reaction / cool-down cycle).
+
+    Every step the molar volumes come from molar_volume_table() and, with
+    CO2_solubility_kg_per_100L None, the CO2 taken up by the water feed from
+    the co2_solubility table at that step's T and P, which sets the CO2 feed
+    and with it the N2 feed and the purge. The step itself is simulate()'s:
+    the feed is added, CO2 fills the rest of the volume and the purge takes
+    every gas at its mole fraction. As in simulate_species() the recursion
+    is summed in closed form over all steps, iterated with the total amount
+    to a fixed point, so a cycle takes milliseconds and no CoolProp call
+    once the tables exist.
+
+    Parameters:
+    -----------
+    trajectory : DataFrame or dict of arrays
+        Time [h] and temperature [°C] (and optionally pressure [bar]) columns;
+        temperature and pressure may be (n_times, n_scenarios) arrays, e.g.
+        from obx_heat_model.simulate() with several scenarios.
+    columns : dict, optional
+        Column names, default trajectory_settings["columns"].
+    overrides :
+        Configuration overrides; temperature_C and time_h are replaced by the
+        trajectory, pressure_bar is used without a pressure column.
+
+    Returns:
+    --------
+    dict with time_h (on the config dt grid over the trajectory's span),
+    temperature_C, pressure_bar, vol_pct_N2, vol_pct_H2, purge_weight_kgph,
+    CO2_feed_molph and Vmol_CO2/N2/H2 (one value per step and scenario).
+    """
+    c = resolve(**overrides)
+    dt = c["dt"]
+    time_h, T_C, P_bar = _resample(trajectory, {**trajectory_settings["columns"], **(columns or {})}, dt,
+                                   c["pressure_bar"])
+
+    table = molar_volume_table()
+    Vmol = {gas: table.lookup(gas, T_C, P_bar) for gas in ("CO2", "N2", "H2")}
+    if not np.all(np.isfinite(Vmol["CO2"])):
+        raise ValueError(f"Trajectory leaves the molar volume table ({table.T_C[0]:g}..{table.T_C[-1]:g} °C, "
+                         f"{table.P_bar[0]:g}..{table.P_bar[-1]:g} bar)")
+    if c["CO2_solubility_kg_per_100L"] is None:
+        from co2_solubility import solubility_kg_per_100L
+
+        c["CO2_solubility_kg_per_100L"] = solubility_kg_per_100L(T_C, P_bar, c["salinity_molal"])
+    balance = feed_balance(c)
+    F_N2 = np.broadcast_to(balance["N2_feed_molph"], T_C.shape)
+    F_H2 = np.broadcast_to(balance["H2_feed_molph"], T_C.shape)
+    purge = np.broadcast_to(balance["purge_molph"], T_C.shape)
+
+    # Total amount after each step's feed: CO2 fills V, so N is linear in the N2 and H2 amounts
+    V = c["headspace_volume_L"] / 1000
+    N_CO2_only = V / Vmol["CO2"]
+    a_N2 = 1 - Vmol["N2"] / Vmol["CO2"]
+    a_H2 = 1 - Vmol["H2"] / Vmol["CO2"]
+    N = N_CO2_only
+    for _ in range(50):
+        # n[k] = exp(L[k]) * sum_j<=k F[j] dt exp(-L[j]),  L[k] = sum_m<k ln(1 - purge[m] dt / N[m])
+        L = np.cumsum(np.log1p(-purge * dt / N), axis=0)
+        L = np.concatenate([np.zeros_like(L[:1]), L[:-1]])
+        n_N2 = np.exp(L) * np.cumsum(F_N2 * dt * np.exp(-L), axis=0)
+        n_H2 = np.exp(L) * np.cumsum(F_H2 * dt * np.exp(-L), axis=0)
+        N_new = N_CO2_only + a_N2 * n_N2 + a_H2 * n_H2
+        converged = np.max(np.abs(N_new / N - 1)) < 1e-13
+        N = N_new
+        if converged:
+            break
+    else:
+        raise RuntimeError("Headspace inventory did not converge")
+
+    V_N2, V_H2 = n_N2 * Vmol["N2"], n_H2 * Vmol["H2"]
+    if np.any(V_N2 + V_H2 > V):
+        k = np.flatnonzero(np.any((V_N2 + V_H2 > V).reshape(len(time_h), -1), axis=1))[0]
+        raise ValueError(f"At time {time_h[k]:.2f} h, gas volume exceeds headspace!")
+    n_CO2 = N - n_N2 - n_H2
+    M_mix = (n_CO2 * c["CO2_M"] + n_N2 * c["N2_M"] + n_H2 * c["H2_M"]) / N
+    return {
+        "time_h": time_h,
+        "temperature_C": T_C,
+        "pressure_bar": P_bar,
+        "vol_pct_N2": 100 * V_N2 / V,
+        "vol_pct_H2": 100 * V_H2 / V,
+        "purge_weight_kgph": purge * M_mix / 1000,
+        "CO2_feed_molph": np.broadcast_to(balance["CO2_feed_molph"], T_C.shape),
+        **{f"Vmol_{gas}": v for gas, v in Vmol.items()},
+    }
+
+
+def _species_feeds(c):
+    """Species of a resolved config (CO2 first, H2 last) and their feeds into the headspace [mol/h]."""
+    balance = feed_balance(c)
+    impurities = c["feed_impurities"]
+    if impurities is None:
+        impurities = {"N2": 1 - c["CO2_feed_purity"]}
+    if "CO2" in impurities or "H2" in impurities:
+        raise ValueError("feed_impurities lists the other gases of the CO2 feed (not CO2 or H2)")
+    # The impurities come in with the CO2 that is fed; H2 is generated in the reactor
+    feed_total_molph = balance["CO2_feed_molph"] / (1 - sum(impurities.values()))
+    feeds = {"CO2": 0.0}
+    feeds.update({name: feed_total_molph * frac for name, frac in impurities.items()})
+    feeds["H2"] = balance["H2_feed_molph"]
+    return feeds, balance["purge_molph"]
+
+
+def _makeup_co2(u, a_ij, b, V, RT, P_Pa, N_guess):
+    """
+    CO2 amount [mol] that with the impurities u (..., n_scenarios, n_species;
+    CO2 column ignored) fills V at P_Pa: Newton on the extensive PR equation
+    P = N RT / (V - B) - A / (V**2 + 2 V B - B**2), where A is quadratic and
+    N and B are linear in the CO2 amount c.
+    """
+    imp = u[..., 1:]
+    a_cc = a_ij[:, 0, 0]
+    a_ci = np.einsum("sj,...sj->...s", a_ij[:, 0, 1:], imp)
+    a_ii = (np.einsum("sij,...sj->...si", a_ij[:, 1:, 1:], imp) * imp).sum(-1)
+    B_imp = imp @ b[1:]
+    N_imp = imp.sum(-1)
+    c = N_guess - N_imp
+    for _ in range(50):
+        A = (a_cc * c + 2 * a_ci) * c + a_ii
+        B = B_imp + b[0] * c
+        N = N_imp + c
+        free = V - B
+        D = V ** 2 + 2 * V * B - B ** 2
+        residual = N * RT / free - A / D - P_Pa
+        slope = RT / free + N * RT * b[0] / free ** 2 - (2 * (a_cc * c + a_ci) * D - A * 2 * (V - B) * b[0]) / D ** 2
+        c = c - residual / slope
+        if np.max(np.abs(residual / P_Pa)) < 1e-13:
+            return c
+    raise RuntimeError("Peng-Robinson CO2 make-up did not converge")
+
+
+def simulate_species(scenarios=None, **overrides):
+    """
+    Accumulation of every feed impurity and H2 in the purged headspace with a
+    Peng-Robinson mixture instead of pure-gas volumes.
+
+    Each step the feed is added, CO2 (the make-up gas) fills the headspace to
+    the pressure and the purge takes every species at its mole fraction. For
+    a known total amount N(t) the impurities follow a linear recursion,
+        u[k+1] = (1 - purge dt / N[k]) u[k] + F dt,
+    which is summed in closed form over all steps at once; N(t) then follows
+    from the EOS for all steps at once, and the two are iterated to a fixed
+    point (a few passes, the impurities change N only slightly). vol% is the
+    mole fraction in percent, as a gas analyser reports it.
+
+    Parameters:
+    -----------
+    scenarios : list of dict, optional
+        Per-scenario overrides of config (time_h and dt are shared); all
+        scenarios are solved together. Default one scenario.
+    overrides :
+        Applied to every scenario.
+
+    Returns:
+    --------
+    dict with time_h (n_steps,), species (CO2 first, H2 last), vol_pct
+    (n_steps, n_scenarios, n_species), Z and purge_weight_kgph
+    (n_steps, n_scenarios), and feeds_molph (n_scenarios, n_species).
+    """
+    import peng_robinson as pr
+
+    params = [resolve(**{**overrides, **s}) for s in (scenarios or [{}])]
+    for key in ("time_h", "dt"):
+        if len({p[key] for p in params}) > 1:
+            raise ValueError(f"{key} must be the same for all scenarios")
+    dt = params[0]["dt"]
+    n_steps = int(params[0]["time_h"] / dt)
+
+    feeds = [_species_feeds(p) for p in params]
+    species = ["CO2"] + sorted({name for f, _ in feeds for name in f} - {"CO2", "H2"}) + ["H2"]
+    F = np.array([[f.get(name, 0.0) for name in species] for f, _ in feeds])
+    purge = np.array([purge_molph for _, purge_molph in feeds])
+    T_K = np.array([p["temperature_C"] + 273.15 for p in params])
+    P_Pa = np.array([p["pressure_bar"] * 1e5 for p in params])
+    V = np.array([p["headspace_volume_L"] / 1000 for p in params])
+
+    # Mixture parameters per scenario temperature (cached), stacked to (n_scenarios, n, n)
+    mixtures = [pr.mixture(tuple(species), T) for T in T_K]
+    a_ij = np.stack([m["a_ij"] for m in mixtures])
+    b, M = mixtures[0]["b"], mixtures[0]["M"]
+    RT = pr.R * T_K
+
+    # Pure CO2 at the start fixes the first guess of N(t)
+    N0 = V / np.array([pr.molar_volume(m, np.eye(len(species))[0], P)[0] for m, P in zip(mixtures, P_Pa)])
+    N = np.broadcast_to(N0, (n_steps, len(params)))
+    for _ in range(50):
+        # Impurities after each step's feed, before its purge: u = F dt exp(L) cumsum(exp(-L))
+        L = np.cumsum(np.log1p(-purge * dt / N), axis=0)
+        L = np.vstack([np.zeros((1, len(params))), L[:-1]])
+        u = F * dt * (np.exp(L) * np.cumsum(np.exp(-L), axis=0))[..., None]
+        n = u.copy()
+        n[..., 0] = _makeup_co2(u, a_ij, b, V, RT, P_Pa, N)
+        if np.any(n[..., 0] < 0):
+            raise ValueError("The impurities alone exceed the headspace pressure")
+        N_new = n.sum(-1)
+        converged = np.max(np.abs(N_new / N - 1)) < 1e-13
+        N = N_new
+        if converged:
+            break
+    else:
+        raise RuntimeError("Headspace inventory did not converge")
+
+    x = n / N[..., None]
+    return {
+        "time_h": np.arange(n_steps) * dt,
+        "species": species,
+        "vol_pct": 100 * x,
+        "Z": P_Pa * V / (N * RT),
+        "purge_weight_kgph": purge * (x @ M) / 1000,
+        "feeds_molph": F,
+    }
+
+
+def species_dataframe(results, scenario=0):
+    """One scenario of simulate_species: Time (h), "<species> vol%" per species, Z and Purge (kg/h)."""
+    import pandas as pd
+
+    df = pd.DataFrame({"Time (h)": results["time_h"]})
+    for i, name in enumerate(results["species"]):
+        df[f"{name} vol%"] = results["vol_pct"][:, scenario, i]
+    df["Z"] = results["Z"][:, scenario]
+    df["Purge (kg/h)"] = results["purge_weight_kgph"][:, scenario]
+    return df
+
+
+def to_dataframe(results):
+    """The script's CSV table: Time (h), N2 vol%, H2 vol%, plus the purge in kg/h."""
+    import pandas as pd
+
     df = pd.DataFrame({
-        "Time (h)": time_series,
-        "N2 vol%": vol_pct_N2,
-        "H2 vol%": vol_pct_H2
+        "Time (h)": results["time_h"],
+        "N2 vol%": results["vol_pct_N2"],
+        "H2 vol%": results["vol_pct_H2"],
     })
-    df.to_csv("reactor_headspace_gas_accumulation.csv", index=False)
-    print("Saved results to reactor_headspace_gas_accumulation.csv")
+    if results["purge_weight_kgph"].size == len(df):
+        df["Purge (kg/h)"] = results["purge_weight_kgph"]
+    return df
 
 
-# %%
+# -----------------------------
+# Plotting
+# -----------------------------
+def plot(results):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 5))
+    plt.plot(results["time_h"], results["vol_pct_N2"], label="N₂ vol%")
+    plt.plot(results["time_h"], results["vol_pct_H2"], label="H₂ vol%")
+    plt.axhline(H2_LEL_WARNING_PCT, color='red', linestyle='--', label="10% LEL H₂ (0.4%)")
+    plt.xlabel("Time [h]")
+    plt.ylabel("Gas Volume % in Headspace")
+    plt.title("Inert Gas Accumulation with 5 wt% CO₂ Purge")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    return plt.gcf()
+
+
+def run(**overrides):
+    """Single run as the script's results table."""
+    return to_dataframe(simulate(**overrides))
+
+
+def main(argv=None):
+    """Command line entry point (headspace): the time series with --set overrides."""
+    import model_cli
+
+    return model_cli.run(run, "Reactor headspace N2 / H2 accumulation with purge", argv, store_name="headspace")
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    print_derived(derived())
+    print(f"Simulation started at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    results = simulate()
+
+    if config["debug"]:
+        for k in np.flatnonzero(results["vol_pct_H2"] > H2_LEL_WARNING_PCT):
+            print(f"[WARNING] H2 exceeds 10% LEL at {results['time_h'][k]:.2f} hours: "
+                  f"{results['vol_pct_H2'][k]:.3f}%")
+
+    mixture = simulate_species()
+    print(f"Peng-Robinson mixture after {config['time_h']} h: " + ", ".join(
+        f"{name} {pct:.3f} vol%" for name, pct in zip(mixture["species"], mixture["vol_pct"][-1, 0])))
+
+    # Headspace over the OBX heat-up / reaction / cool-down cycle
+    import time
+
+    import obx_heat_model
+
+    cycle = obx_heat_model.run()
+    simulate_trajectory(cycle)  # builds the molar volume and solubility tables
+    start = time.perf_counter()
+    batch = simulate_trajectory(cycle)
+    print(f"OBX cycle ({len(batch['time_h'])} steps) in {(time.perf_counter() - start) * 1000:.1f} ms: "
+          f"CO2 molar volume {batch['Vmol_CO2'].min() * 1e6:.0f}..{batch['Vmol_CO2'].max() * 1e6:.0f} cm³/mol, "
+          f"CO2 feed {batch['CO2_feed_molph'].min():.0f}..{batch['CO2_feed_molph'].max():.0f} mol/h, "
+          f"H2 {batch['vol_pct_H2'][-1]:.5f} vol% at the end")
+
+    plot(results)
+    plt.show()
+
+    # -----------------------------
+    # Optional CSV Export
+    # -----------------------------
+    if config["save_to_csv"]:
+        to_dataframe(results)[["Time (h)", "N2 vol%", "H2 vol%"]].to_csv("reactor_headspace_gas_accumulation.csv",
+                                                                        index=False)
+        print("Saved results to reactor_headspace_gas_accumulation.csv")
@@ -0,0 +1,342 @@
+"""
+Result Store
+
+Persistent store of model runs. A run is keyed by a hash of the model's
+source code and its fully resolved inputs: asking for the same inputs again
+returns the stored table without recomputing it, and any change to an input
+or to the model's source files gives a new key (and so a new run). Past runs
+stay queryable: their inputs as a table, and the stored results of many runs
+read back as one table.
+
+Layout under the store directory (default .results next to the modules):
+
+    index.sqlite              one row per run: key, model, version, inputs (JSON),
+                              created, elapsed_s, rows, file
+    <model>/<key>.parquet     the result table (.csv.gz without pyarrow)
+
+Usage:
+    from result_store import ResultStore
+
+    store = ResultStore()
+    df = store.run("obx", oil_max_temp=250)          # computed once, then read back
+    store.runs("obx", current=True)                  # runs of the current code, inputs as columns
+    store.scan("obx", columns=["time_hours", "T_reactor"])   # all stored runs in one table
+
+    headspace --store --set time_h=500                # any model command line with --store
+    result-store runs --model headspace
+    result-store prune                               # drop runs of outdated model versions
+
+Required packages:
+pip install pandas (pyarrow for parquet files)
+"""
+
+import datetime
+import hashlib
+import importlib
+import json
+import math
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+# name: (module, function, source files that determine its results)
+# Every module has resolve(**overrides) returning the fully merged inputs.
+models = {
+    "headspace": ("reactor_headspace_simulation", "run", ("reactor_headspace_simulation.py", "co2_solubility.py")),
+    "obx": ("obx_heat_model", "run",
+            ("obx_heat_model.py", "heat_exchanger.py", "obx_controller.py", "obx_instrumentation.py")),
+    "permco2": ("permco2_sizing", "size_coils", ("permco2_sizing.py", "heat_exchanger.py")),
+    "tank_levels": ("tank_levels", "run", ("tank_levels.py",)),
+}
+
+here = os.path.dirname(os.path.abspath(__file__))
+default_root = os.path.join(here, ".results")
+
+_schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    version TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    created TEXT NOT NULL,
+    elapsed_s REAL,
+    rows INTEGER,
+    file TEXT NOT NULL,
+    layout TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_model_version ON runs (model, version);
+"""
+
+
+# -----------------------------
+# Keys
+# -----------------------------
+def _model(name):
+    if name not in models:
+        raise KeyError(f"Unknown model: {name} (stored models: {sorted(models)})")
+    return models[name]
+
+
+def version(name):
+    """Hash of the model's source files."""
+    digest = hashlib.sha256()
+    for source in _model(name)[2]:
+        with open(os.path.join(here, source), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _plain(value):
+    """Inputs as JSON types: numpy arrays and scalars, tuples and datetimes included."""
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _plain(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.timedelta)):
+        return str(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    return value
+
+
+def resolved_inputs(name, **inputs):
+    """The model's configuration with the inputs merged, as JSON types."""
+    module = importlib.import_module(_model(name)[0])
+    return _plain(module.resolve(**inputs))
+
+
+def run_key(name, inputs, model_version=None):
+    payload = json.dumps({"model": name, "version": model_version or version(name), "inputs": inputs},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+# -----------------------------
+# Files
+# -----------------------------
+def _write_table(df, path_stem):
+    """Parquet, or csv.gz without pyarrow; returns (file name, layout for reading it back)."""
+    import pandas as pd
+
+    index = [] if isinstance(df.index, pd.RangeIndex) else [n if n is not None else "index" for n in df.index.names]
+    if index:
+        df = df.reset_index()
+    df.columns = [str(c) for c in df.columns]
+    layout = {"index": index, "dtypes": {c: str(t) for c, t in df.dtypes.items()}}
+    try:
+        path = path_stem + ".parquet"
+        df.to_parquet(path, index=False)
+    except ImportError:
+        path = path_stem + ".csv.gz"
+        df.to_csv(path, index=False)
+    return os.path.basename(path), layout
+
+
+def _read_table(path, layout, columns=None):
+    import pandas as pd
+
+    dtypes = layout["dtypes"]
+    wanted = None if columns is None else list(dict.fromkeys(layout["index"] + list(columns)))
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=wanted)
+    else:
+        # Text columns keep their empty strings; numbers and dates get their dtype back
+        text = {c for c, t in dtypes.items() if t in ("object", "str", "string")}
+        numeric = {c: ["", "NaN", "nan"] for c in dtypes if c not in text}
+        # round_trip: floats read back bit for bit (the default parser can be off in the last digit)
+        df = pd.read_csv(path, usecols=wanted, keep_default_na=False, na_values=numeric,
+                         float_precision="round_trip")
+        for c in df.columns:
+            if c in text:
+                continue
+            if dtypes[c].startswith("datetime64"):
+                df[c] = pd.to_datetime(df[c])
+            else:
+                df[c] = df[c].astype(dtypes[c])
+    if layout["index"]:
+        df = df.set_index(layout["index"])
+        if df.index.names == ["index"]:
+            df.index.name = None
+    return df
+
+
+# -----------------------------
+# Store
+# -----------------------------
+class ResultStore:
+    """Model runs memoized on disk; see the module docstring."""
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or default_root)
+        os.makedirs(self.root, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_schema)
+
+    def _connect(self):
+        db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _path(self, row):
+        return os.path.join(self.root, row["model"], row["file"])
+
+    def key(self, model, **inputs):
+        """Key of a run of model with these inputs against the current source."""
+        return run_key(model, resolved_inputs(model, **inputs))
+
+    def get(self, key, columns=None):
+        """Stored result of a run, or None."""
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM runs WHERE key = ?", (key,)).fetchone()
+        if row is None or not os.path.exists(self._path(row)):
+            return None
+        return _read_table(self._path(row), json.loads(row["layout"]), columns)
+
+    def run(self, model, force=False, **inputs):
+        """
+        Result of model(**inputs): read back if this run is stored, else computed and stored.
+
+        Parameters:
+        -----------
+        model : name in models
+        force : recompute and replace a stored run
+        inputs : overrides of the model's configuration
+        """
+        module_name, function, _ = _model(model)
+        model_version = version(model)
+        params = resolved_inputs(model, **inputs)
+        key = run_key(model, params, model_version)
+        if not force:
+            stored = self.get(key)
+            if stored is not None:
+                return stored
+
+        start = time.perf_counter()
+        result = getattr(importlib.import_module(module_name), function)(**inputs)
+        elapsed = time.perf_counter() - start
+
+        # The file is written before its index row, so the index never points at a missing run
+        os.makedirs(os.path.join(self.root, model), exist_ok=True)
+        file, layout = _write_table(result.copy(), os.path.join(self.root, model, key))
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                       (key, model, model_version, json.dumps(params, sort_keys=True, default=str),
+                        datetime.datetime.now().isoformat(timespec="seconds"), elapsed, len(result), file,
+                        json.dumps(layout)))
+        return result
+
+    def _rows(self, model=None, current=False):
+        query, args = "SELECT * FROM runs", []
+        if model is not None:
+            _model(model)
+            query, args = query + " WHERE model = ?", [model]
+        with self._connect() as db:
+            rows = db.execute(query + " ORDER BY created", args).fetchall()
+        if current:
+            versions = {name: version(name) for name in {row["model"] for row in rows} if name in models}
+            rows = [row for row in rows if versions.get(row["model"]) == row["version"]]
+        return rows
+
+    def runs(self, model=None, current=False):
+        """
+        Stored runs as a DataFrame: key, model, version, created, elapsed_s, rows
+        and one column per input (nested inputs as "section.key").
+
+        current : only runs of the current source of their model
+        """
+        import pandas as pd
+
+        rows = self._rows(model, current)
+        meta = pd.DataFrame([{k: row[k] for k in ("key", "model", "version", "created", "elapsed_s", "rows")}
+                             for row in rows], columns=["key", "model", "version", "created", "elapsed_s", "rows"])
+        inputs = pd.json_normalize([json.loads(row["inputs"]) for row in rows])
+        return pd.concat([meta, inputs], axis=1).set_index("key")
+
+    def scan(self, model, columns=None, keys=None, current=False):
+        """
+        Stored results of a model in one table, with the run key as first column.
+
+        Parameters:
+        -----------
+        columns : result columns to read (all by default; parquet reads only these)
+        keys : runs to read (all stored runs of the model by default)
+        current : only runs of the current source
+        """
+        import pandas as pd
+
+        tables = []
+        for row in self._rows(model, current):
+            if keys is not None and row["key"] not in keys:
+                continue
+            df = _read_table(self._path(row), json.loads(row["layout"]), columns).reset_index(
+                drop=not json.loads(row["layout"])["index"])
+            df.insert(0, "run", row["key"])
+            tables.append(df)
+        if not tables:
+            return pd.DataFrame(columns=["run"] + list(columns or []))
+        return pd.concat(tables, ignore_index=True)
+
+    def delete(self, key):
+        """Remove one run (file and index row)."""
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM runs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            db.execute("DELETE FROM runs WHERE key = ?", (key,))
+        if os.path.exists(self._path(row)):
+            os.remove(self._path(row))
+        return True
+
+    def prune(self, model=None):
+        """Remove the runs of outdated model versions (and of models no longer registered); returns their keys."""
+        current = {row["key"] for row in self._rows(model, current=True)}
+        stale = [row["key"] for row in self._rows(model) if row["key"] not in current]
+        for key in stale:
+            self.delete(key)
+        return stale
+
+
+def main(argv=None):
+    """Command line entry point (result-store): list or prune stored runs."""
+    import argparse
+
+    import model_cli
+
+    p = argparse.ArgumentParser(description="Stored model runs")
+    p.add_argument("command", choices=["runs", "prune"])
+    p.add_argument("--store", default=None, help=f"store directory (default {default_root})")
+    p.add_argument("--model", choices=sorted(models), default=None)
+    p.add_argument("--current", action="store_true", help="only runs of the current model source")
+    p.add_argument("-o", "--output", help="write the run list to .csv, .parquet or .json")
+    args = p.parse_args(argv)
+    store = ResultStore(args.store)
+    if args.command == "prune":
+        removed = store.prune(args.model)
+        print(f"Removed {len(removed)} outdated runs")
+        return removed
+    runs = store.runs(args.model, args.current)
+    model_cli.write_result(runs, args.output)
+    return runs
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as root:
+        store = ResultStore(root)
+        for label in ("first run", "same inputs", "other inputs"):
+            start = time.perf_counter()
+            df = store.run("tank_levels", hours=24 if label == "other inputs" else 48)
+            print(f"{label:>12}: {len(df)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+        print(store.runs("tank_levels")[["created", "elapsed_s", "rows", "hours"]].to_string())
+        print(store.scan("tank_levels", columns=["FeedTank1", "SlurryTank"]).groupby("run").min())
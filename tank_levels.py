@@ -0,0 +1,224 @@
+"""
+Tank Level Schedule
+
+Importable version of the simulation cell of Tank_Levels_simple.ipynb: the
+feed tanks, slurry tank and filtrate tank of the EMU / Larox line stepped at
+a fixed time step, with events (batch make-up, EMU runs, Larox fill and wash)
+that fill one tank and drain another, and triggers on the tank levels that
+start and stop them. See the notebook's "Overall Logic" cell for the rules.
+
+Same results as the notebook cell (checked by the tank_schedule benchmark),
+with the inputs as overridable dicts and the log as arrays instead of deep
+copies of the tank dicts per step.
+
+Required packages:
+pip install pandas (for to_dataframe)
+"""
+
+import copy
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+tank_volumes = {  # liters
+    "FeedTank1": 6000,
+    "FeedTank2": 6000,
+    "SlurryTank": 6000,
+    "FiltrateTank": 6000,
+}
+
+initial_levels = {  # fraction of the tank volume
+    "FeedTank1": 0.10,
+    "FeedTank2": 0.50,
+    "SlurryTank": 0.20,
+    "FiltrateTank": 0.90,
+}
+
+flow_rates = {  # liters per hour
+    "InputBatch_Rate": 2000,
+    "InputEMU_Rate": 300,
+    "OutputEMU_Rate": 316,
+    "InputLarox_Rate": 1000,
+    "OutputLarox_Rate": 1000,
+    "FlushLarox_Rate": 1000,
+    "WashLarox_Rate": 300,
+    "ClothLarox_Rate": 1000,
+    "FiltrateDischarge_Rate": 2000,
+}
+
+durations = {  # minutes
+    "MakeBatch_Duration": 120,
+    "FillLarox_Duration": 10,
+    "FlushLarox_Duration": 10,
+    "WashLarox_Duration": 20,
+    "ClothLarox_Duration": 10,
+    "CakeLarox_Duration": 10,
+}
+
+simulation = {
+    "start": datetime(2024, 8, 18, 6, 0),
+    "time_step_min": 5,
+    "hours": 48,
+    "low_level": 0.20,  # feed tank level that starts a batch and switches the EMU
+    "larox_level": 0.30,  # slurry tank level that starts a Larox fill
+}
+
+tank_names = list(tank_volumes)
+
+
+def resolve(**overrides):
+    """Merge overrides into the configuration dicts; returns one flat dict."""
+    sections = {"tank_volumes": tank_volumes, "initial_levels": initial_levels}
+    params = {name: copy.deepcopy(section) for name, section in sections.items()}
+    params.update(flow_rates)
+    params.update(durations)
+    params.update(simulation)
+    unknown = set(overrides) - set(params)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {sorted(unknown)}")
+    for key, value in overrides.items():
+        if key in sections:
+            params[key].update(value)
+        else:
+            params[key] = value
+    return params
+
+
+def _event(description, start, stop, fill_tank, fill_rate, drain_tank, drain_rate):
+    return {"Description": description, "StartTime": start, "StopTime": stop, "FillTank": fill_tank,
+            "FillRate": fill_rate, "DrainTank": drain_tank, "DrainRate": drain_rate}
+
+
+def _running(events, description, now):
+    """Events of that description still active or scheduled (no stop time or stopping after now)."""
+    return [e for e in events if e["Description"] == description and (e["StopTime"] is None or e["StopTime"] > now)]
+
+
+# -----------------------------
+# Simulation
+# -----------------------------
+def simulate(**overrides):
+    """
+    Step the tank levels over the schedule.
+
+    Returns:
+    --------
+    dict with time (datetimes), level_perc (n_steps, n_tanks) at the end of
+    each step in tank_names order, active (list of active event descriptions
+    per step), triggers (list of (time, label)) and events (every event with
+    its start and stop time).
+    """
+    p = resolve(**overrides)
+    step = timedelta(minutes=p["time_step_min"])
+    step_min = step.total_seconds() / 60
+    start = p["start"]
+    end = start + timedelta(hours=p["hours"])
+    volume = p["tank_volumes"]
+    level = {tank: p["initial_levels"][tank] * volume[tank] for tank in tank_names}  # liters
+    low, larox = p["low_level"], p["larox_level"]
+
+    def perc(tank):
+        return level[tank] / volume[tank]
+
+    def make_batch(n, now):
+        return _event(f"MakeBatch{n}", now + step, now + step + timedelta(minutes=p["MakeBatch_Duration"]),
+                      f"FeedTank{n}", p["InputBatch_Rate"], "FiltrateTank", p["FiltrateDischarge_Rate"])
+
+    def switch_emu(now, start_desc, drain_tank):
+        active_emu = [e for e in events if e["Description"].startswith("RunEMU") and e["StopTime"] is None]
+        if len(active_emu) != 1:
+            raise Exception(f"There should only be one active RunEMU event. Found: {len(active_emu)}")
+        active_emu[0]["StopTime"] = now
+        events.append(_event(start_desc, now + step, None, "SlurryTank", p["OutputEMU_Rate"],
+                             drain_tank, p["InputEMU_Rate"]))
+
+    def check_triggers(now):
+        for n in (1, 2):
+            if perc(f"FeedTank{n}") < low and not _running(events, f"MakeBatch{n}", now):
+                fired.append((now, f"Trigger MakeBatch{n}"))
+                events.append(make_batch(n, now))
+        # A low feed tank switches the EMU to the other one
+        for n, other in ((1, 2), (2, 1)):
+            if perc(f"FeedTank{n}") < low and not _running(events, f"RunEMU{other}", now):
+                fired.append((now, f"Trigger RunEMU{other}"))
+                switch_emu(now, f"RunEMU{other}", f"FeedTank{other}")
+        if perc("SlurryTank") > larox and not _running(events, "FillLarox", now):
+            fired.append((now, "Trigger FillLarox"))
+            fill_stop = now + step + timedelta(minutes=p["FillLarox_Duration"])
+            events.append(_event("FillLarox", now + step, fill_stop, "FiltrateTank", p["OutputLarox_Rate"],
+                                 "SlurryTank", p["InputLarox_Rate"]))
+            events.append(_event("WashLarox", fill_stop, fill_stop + timedelta(minutes=p["WashLarox_Duration"]),
+                                 "FiltrateTank", p["WashLarox_Rate"], None, None))
+
+    events = [
+        _event("RunEMU2", start, None, "SlurryTank", p["OutputEMU_Rate"], "FeedTank2", p["InputEMU_Rate"]),
+        _event("MakeBatch1", start + timedelta(minutes=3), start + timedelta(minutes=3 + p["MakeBatch_Duration"]),
+               "FeedTank1", p["InputBatch_Rate"], "FiltrateTank", p["FiltrateDischarge_Rate"]),
+    ]
+    times, levels, active_log, triggers = [], [], [], []
+    now = start
+    while now < end:
+        active = [e for e in events if e["StartTime"] <= now and (e["StopTime"] is None or e["StopTime"] > now)]
+        descriptions = [e["Description"] for e in active]
+        duplicates = {d for d in descriptions if descriptions.count(d) > 1}
+        if duplicates:
+            raise Exception(f"Duplicate active events found for descriptions: {duplicates}")
+
+        fired = []
+        # As in the notebook, the triggers are checked after every processed event
+        for e in active:
+            if e["FillTank"]:
+                level[e["FillTank"]] += e["FillRate"] * step_min / 60
+            if e["DrainTank"]:
+                level[e["DrainTank"]] -= e["DrainRate"] * step_min / 60
+            check_triggers(now)
+
+        times.append(now)
+        levels.append([perc(tank) for tank in tank_names])
+        active_log.append(descriptions)
+        triggers.extend(fired)
+        now += step
+
+    return {"time": times, "level_perc": np.array(levels), "active": active_log, "triggers": triggers,
+            "events": events}
+
+
+def to_dataframe(results):
+    """Levels per step (fraction per tank), active events and the triggers fired in the step."""
+    import pandas as pd
+
+    df = pd.DataFrame(results["level_perc"], columns=tank_names)
+    df.insert(0, "time", pd.to_datetime(results["time"]))
+    df["active_events"] = [", ".join(a) for a in results["active"]]
+    fired = {}
+    for time, label in results["triggers"]:
+        fired.setdefault(time, []).append(label.removeprefix("Trigger "))
+    df["triggers"] = [", ".join(fired.get(t, [])) for t in results["time"]]
+    return df
+
+
+def run(**overrides):
+    """Single schedule as a DataFrame."""
+    return to_dataframe(simulate(**overrides))
+
+
+def main(argv=None):
+    """Command line entry point (tank-levels): the level table with --set overrides."""
+    import model_cli
+
+    return model_cli.run(run, "Tank level schedule of the EMU / Larox line", argv, store_name="tank_levels")
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    results = simulate()
+    print(f"{len(results['time'])} steps in {(time.perf_counter() - start) * 1000:.1f} ms")
+    df = to_dataframe(results)
+    print(df[df["triggers"] != ""].to_string(index=False))
+    print(f"\nLowest levels: {df[tank_names].min().round(3).to_dict()}")
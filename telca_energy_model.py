@@ -0,0 +1,498 @@
+"""
+TELCA Energy Model
+
+The energy methods of "telca snippets.ipynb" (de-watering, drying, CO2 pump
+and heater, imported power, reactor, unavoidable CO2) on a lazy, memoized
+evaluation graph.
+
+In the snippets every method calls get_model_inputs() again, once per
+value it needs, and each call recomputes the CoolProp density and walks
+self.config. calculate_co2_heater alone evaluates get_model_inputs six
+times plus once more through calculate_co2_pump. Here:
+
+- every quantity (each model input, each CoolProp property, each method)
+  is a graph node, computed once per input_type and cached
+- reads of other nodes and of config values are recorded while a node
+  evaluates, so the dependency graph builds itself
+- set_value() changes one config value and drops only the cached nodes
+  that depend on it, directly or through other nodes
+
+A full energy_report() therefore calls each CoolProp property exactly once
+(see model.evaluations).
+
+Every method also works on arrays: hourly() puts the columns of a profile
+(e.g. 8760 rows of co2_feed_rate, slurry_feed_rate and
+co2_storage_temperature following the ambient) into the config as arrays and
+evaluates the graph once. CoolProp is called on the unique states of the
+profile only, so a year of hours takes milliseconds to a fraction of a second
+instead of a Python loop over days.
+
+The class in the TELCA package (paebbl.telca) is not part of this repository.
+Config layout and get_value follow the snippets,
+config[section]["design_default_type"][key]. Where the snippets call methods
+that are not in the notebook (calculate_total_wet/dry_product_usage_per_hour),
+these read the rates from the config. default_config holds example values
+only; pass the TELCA config for real numbers.
+
+Units as in the snippets: °C, barg, kg/h, m3/h, kW, kWh/day.
+
+Required packages:
+pip install coolprop numpy pandas
+"""
+
+import copy
+import functools
+from collections import Counter, defaultdict
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block (example values)
+# -----------------------------
+default_config = {
+    "reactor": {
+        "design_default_type": {
+            "co2_storage_temperature": {"default": -20.0},  # °C
+            "co2_storage_pressure": {"default": 19.0},  # barg
+            "co2_feed_rate": {"default": 1000.0},  # kg/h
+            "co2_inflow_pressure": {"default": 100.0},  # barg
+            "co2_evaporator_temperature": {"default": 35.0},  # °C
+            "slurry_feed_rate": {"default": 10.0},  # m3/h
+            "slurry_input_pressure": {"default": 2.0},  # barg
+            "instrument_air": {"default": 5.0},  # kW
+            "steam_consumption": {"default": 0.0},  # kW
+            "co2_emission_factor": {"default": 1.0},  # % of the CO2 feed purged
+        }
+    },
+    "de-watering": {
+        "design_default_type": {
+            "wet_product_rate": {"default": 2000.0},  # kg/h water removed by mechanical de-watering
+            "power_efficiency": {"default": 100.0},  # %
+            "energy_usage_per_tonne": {"default": 11.7},  # kWh/t (42 MJ/t)
+        }
+    },
+    "drying": {
+        "design_default_type": {
+            "dry_product_rate": {"default": 500.0},  # kg/h water evaporated
+            "power_efficiency": {"default": 100.0},  # %
+            "energy_usage_per_tonne": {"default": 630.0},  # kWh/t water evaporated
+        }
+    },
+}
+
+# Fixed values of get_model_inputs (placeholders in the snippets, still to be confirmed)
+fixed_inputs = {
+    "slurry_discharge_average_heat_capacity": 3.49,
+    "slurry_heater_to_reactor_average_heat_capacity": 3.49,
+    "slurry_heater_to_reactor_temperature": 36.0,
+    "slurry_discharge_temperature": 36.0,
+    "circulation_water_outlet_flow_rate": 175.0,
+    "circulation_water_outlet_average_heat_capacity": 4.18,
+    "circulation_water_outlet_temperature": 175.0,
+    "circulation_water_cooled_temperature": 36.0,
+    "product_cooler_mass_flow_rate": 0.0,
+    "product_cooler_average_heat_capacity": 4.18,
+    "reactor_to_product_cooler_temperature": 36.0,
+    "product_cooler_to_outlet_temperature": 36.0,
+}
+
+co2_discharge_margin = 6.0  # bar above co2_inflow_pressure
+slurry_discharge_margin = 3.8  # bar above co2_inflow_pressure
+co2_pump_efficiency = 0.5
+slurry_pump_efficiency = 0.897 * 0.911
+
+
+def get_value(entry, input_type="default"):
+    """Value of a config entry for an input type; plain values and missing types fall back to the entry/default."""
+    if isinstance(entry, dict):
+        return entry.get(input_type, entry["default"])
+    return entry
+
+
+def _props(output, name1, value1, name2, value2):
+    """CO2 property from CoolProp; arrays are evaluated on their unique input pairs only."""
+    from CoolProp import CoolProp as CP
+
+    if np.ndim(value1) == 0 and np.ndim(value2) == 0:
+        return CP.PropsSI(output, name1, value1, name2, value2, "CO2")
+    value1, value2 = np.broadcast_arrays(np.asarray(value1, dtype=float), np.asarray(value2, dtype=float))
+    states, inverse = np.unique(np.column_stack([value1.ravel(), value2.ravel()]), axis=0, return_inverse=True)
+    values = np.asarray(CP.PropsSI(output, name1, states[:, 0], name2, states[:, 1], "CO2"))
+    return values[inverse.ravel()].reshape(value1.shape)
+
+
+def _pa(barg):
+    return (barg + 1.01325) * 100000
+
+
+# -----------------------------
+# Evaluation graph
+# -----------------------------
+def node(method):
+    """Make a method(self, input_type="default") a cached graph node."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, input_type="default"):
+        return self._evaluate((name, input_type), lambda: method(self, input_type))
+
+    return wrapper
+
+
+class TelcaEnergyModel:
+    """
+    TELCA energy methods with memoized, dependency-tracked evaluation.
+
+    evaluations counts how often each node was computed (a CoolProp node
+    counts once per call of PropsSI).
+    """
+
+    def __init__(self, config=None):
+        self.config = copy.deepcopy(default_config if config is None else config)
+        self.evaluations = Counter()
+        self._cache = {}
+        self._dependents = defaultdict(set)
+        self._stack = []
+
+    def _evaluate(self, key, compute):
+        if self._stack:
+            self._dependents[key].add(self._stack[-1])
+        if key in self._cache:
+            return self._cache[key]
+        self._stack.append(key)
+        try:
+            value = compute()
+        finally:
+            self._stack.pop()
+        self._cache[key] = value
+        self.evaluations[key[0]] += 1
+        return value
+
+    def value(self, section, name, input_type="default"):
+        """Config value section/design_default_type/name, recorded as a dependency."""
+        if self._stack:
+            self._dependents[("config", section, name)].add(self._stack[-1])
+        return get_value(self.config[section]["design_default_type"][name], input_type)
+
+    def set_value(self, section, name, value, input_type="default"):
+        """Change one config value and invalidate the nodes that depend on it."""
+        entry = self.config[section]["design_default_type"][name]
+        if isinstance(entry, dict):
+            entry[input_type] = value
+        else:
+            self.config[section]["design_default_type"][name] = value
+        self.invalidate(("config", section, name))
+
+    def invalidate(self, key):
+        """Drop the cached value of key and of everything downstream of it."""
+        pending = [key]
+        while pending:
+            key = pending.pop()
+            self._cache.pop(key, None)
+            pending.extend(self._dependents.pop(key, ()))
+
+    def clear(self):
+        self._cache.clear()
+        self._dependents.clear()
+
+    # -----------------------------
+    # Model inputs
+    # -----------------------------
+    @node
+    def co2_storage_temperature(self, input_type="default"):
+        return self.value("reactor", "co2_storage_temperature", input_type)
+
+    @node
+    def co2_storage_pressure(self, input_type="default"):
+        return self.value("reactor", "co2_storage_pressure", input_type)
+
+    @node
+    def co2_mass_flow_rate(self, input_type="default"):
+        return self.value("reactor", "co2_feed_rate", input_type)
+
+    @node
+    def co2_discharge_pressure(self, input_type="default"):
+        return self.value("reactor", "co2_inflow_pressure", input_type) + co2_discharge_margin
+
+    @node
+    def slurry_discharge_pressure(self, input_type="default"):
+        return self.value("reactor", "co2_inflow_pressure", input_type) + slurry_discharge_margin
+
+    @node
+    def co2_evaporator_temperature(self, input_type="default"):
+        return self.value("reactor", "co2_evaporator_temperature", input_type)
+
+    @node
+    def slurry_feed_rate(self, input_type="default"):
+        return self.value("reactor", "slurry_feed_rate", input_type)
+
+    @node
+    def slurry_discharge_rate(self, input_type="default"):
+        """Slurry leaving the reactor [kg/h]: the feed rate, as in the snippets (not yet confirmed)."""
+        return self.slurry_feed_rate(input_type)
+
+    @node
+    def slurry_input_pressure(self, input_type="default"):
+        return self.value("reactor", "slurry_input_pressure", input_type)
+
+    # -----------------------------
+    # CoolProp properties
+    # -----------------------------
+    @node
+    def co2_density(self, input_type="default"):
+        return _props("D", "T", self.co2_storage_temperature(input_type) + 273.15,
+                      "P", _pa(self.co2_storage_pressure(input_type)))
+
+    @node
+    def co2_storage_enthalpy(self, input_type="default"):
+        return _props("H", "T", self.co2_storage_temperature(input_type) + 273.15,
+                      "P", _pa(self.co2_storage_pressure(input_type)))
+
+    @node
+    def co2_pump_discharge_temperature(self, input_type="default"):
+        """CO2 temperature [°C] after the pump: storage enthalpy plus the pump work."""
+        # Pump work per kg, calculate_co2_pump * 1000 / (co2_mass_flow_rate / 3600) without
+        # dividing by the flow, so hours without CO2 feed stay finite
+        dP = self.co2_discharge_pressure(input_type) - self.co2_storage_pressure(input_type)
+        h = self.co2_storage_enthalpy(input_type) + dP * 1e5 / (self.co2_density(input_type) * co2_pump_efficiency)
+        return _props("T", "H", h, "P", _pa(self.co2_discharge_pressure(input_type))) - 273.15
+
+    @node
+    def co2_pump_discharge_enthalpy(self, input_type="default"):
+        return _props("H", "T", self.co2_pump_discharge_temperature(input_type) + 273.15,
+                      "P", _pa(self.co2_discharge_pressure(input_type)))
+
+    @node
+    def co2_evaporator_enthalpy(self, input_type="default"):
+        return _props("H", "T", self.co2_evaporator_temperature(input_type) + 273.15,
+                      "P", _pa(self.co2_discharge_pressure(input_type)))
+
+    @node
+    def get_model_inputs(self, input_type="default"):
+        """Calculate the fundamental inputs of the system (same keys as the snippet)."""
+        names = ["co2_storage_temperature", "co2_storage_pressure", "co2_density", "co2_mass_flow_rate",
+                 "co2_discharge_pressure", "co2_evaporator_temperature", "slurry_discharge_pressure",
+                 "slurry_feed_rate", "slurry_discharge_rate", "slurry_input_pressure"]
+        inputs = {name: getattr(self, name)(input_type) for name in names}
+        inputs.update(fixed_inputs)
+        return inputs
+
+    # -----------------------------
+    # Energy methods
+    # -----------------------------
+    @node
+    def calculate_total_wet_product_usage_per_hour(self, input_type="default"):
+        return self.value("de-watering", "wet_product_rate", input_type)
+
+    @node
+    def calculate_total_dry_product_usage_per_hour(self, input_type="default"):
+        return self.value("drying", "dry_product_rate", input_type)
+
+    @node
+    def calculate_energy_requirement_for_dewatering_per_day(self, input_type="default"):
+        """Energy required by the de-watering unit in kWh/day."""
+        wet_product = self.calculate_total_wet_product_usage_per_hour(input_type) * 24
+        power_efficiency = self.value("de-watering", "power_efficiency", input_type)
+        energy_usage_per_tonne = self.value("de-watering", "energy_usage_per_tonne", input_type)
+        return energy_usage_per_tonne * power_efficiency / 100 * wet_product / 1000
+
+    @node
+    def calculate_energy_requirement_for_drying_per_day(self, input_type="default"):
+        """Energy required by the drying unit in kWh/day."""
+        dry_product = self.calculate_total_dry_product_usage_per_hour(input_type) * 24
+        power_efficiency = self.value("drying", "power_efficiency", input_type)
+        energy_usage_per_tonne = self.value("drying", "energy_usage_per_tonne", input_type)
+        return energy_usage_per_tonne * power_efficiency / 100 * dry_product / 1000
+
+    @node
+    def calculate_co2_pump(self, input_type="default"):
+        """Energy usage by CO2 pumped into the reactor in kWh."""
+        co2_volume_flow_rate = self.co2_mass_flow_rate(input_type) / self.co2_density(input_type)
+        dP = self.co2_discharge_pressure(input_type) - self.co2_storage_pressure(input_type)
+        return co2_volume_flow_rate * dP / 36 / co2_pump_efficiency
+
+    @node
+    def calculate_co2_heater(self, input_type="default"):
+        """Energy usage by CO2 heater in kWh."""
+        dh = self.co2_evaporator_enthalpy(input_type) - self.co2_pump_discharge_enthalpy(input_type)
+        return dh * self.co2_mass_flow_rate(input_type) / 3600 / 1000
+
+    @node
+    def calculate_power_imported(self, input_type="default"):
+        """Energy imported in kWh."""
+        x = fixed_inputs
+        F100 = (self.slurry_feed_rate(input_type)
+                * (self.slurry_discharge_pressure(input_type) - self.slurry_input_pressure(input_type))
+                / 36 / slurry_pump_efficiency)
+        H101 = (self.slurry_discharge_rate(input_type) / 3600
+                * (x["slurry_discharge_average_heat_capacity"] + x["slurry_heater_to_reactor_average_heat_capacity"])
+                / 2 * (x["slurry_heater_to_reactor_temperature"] - x["slurry_discharge_temperature"]))
+        J102 = (x["circulation_water_outlet_flow_rate"] / 3600 * x["circulation_water_outlet_average_heat_capacity"]
+                * (x["circulation_water_outlet_temperature"] - x["circulation_water_cooled_temperature"]))
+        Y100 = (x["product_cooler_mass_flow_rate"] / 3600 * x["product_cooler_average_heat_capacity"]
+                * (x["reactor_to_product_cooler_temperature"] - x["product_cooler_to_outlet_temperature"]))
+        instrument_air = self.value("reactor", "instrument_air", input_type)
+        steam_consumption = self.value("reactor", "steam_consumption", input_type)
+        return F100 + H101 + J102 + Y100 + instrument_air + steam_consumption
+
+    @node
+    def calculate_energy_requirement_for_reactor_per_day(self, input_type="default"):
+        """Energy required by the reactor in kWh/day."""
+        return (self.calculate_co2_pump(input_type) + self.calculate_co2_heater(input_type)
+                + self.calculate_power_imported(input_type)) * 24
+
+    @node
+    def calculate_unavoidable_co2(self, input_type="default"):
+        """Calculate the unavoidable CO2 emissions in kg/day."""
+        co2_emission_factor = self.value("reactor", "co2_emission_factor", input_type) / 100
+        return (self.co2_mass_flow_rate(input_type) * co2_emission_factor + 0.000001) * 24
+
+    def energy_report(self, input_type="default"):
+        """Plant energy in kWh/day per unit, and the unavoidable CO2 in kg/day."""
+        report = {
+            "dewatering_kWh_per_day": self.calculate_energy_requirement_for_dewatering_per_day(input_type),
+            "drying_kWh_per_day": self.calculate_energy_requirement_for_drying_per_day(input_type),
+            "co2_pump_kW": self.calculate_co2_pump(input_type),
+            "co2_heater_kW": self.calculate_co2_heater(input_type),
+            "power_imported_kW": self.calculate_power_imported(input_type),
+            "reactor_kWh_per_day": self.calculate_energy_requirement_for_reactor_per_day(input_type),
+            "unavoidable_co2_kg_per_day": self.calculate_unavoidable_co2(input_type),
+        }
+        report["total_kWh_per_day"] = (report["dewatering_kWh_per_day"] + report["drying_kWh_per_day"]
+                                       + report["reactor_kWh_per_day"])
+        return report
+
+    def _locate(self, column):
+        """(section, key) of a profile column: "section/key" or a key that is unique over the sections."""
+        if "/" in column:
+            section, key = column.split("/", 1)
+            if key in self.config.get(section, {}).get("design_default_type", {}):
+                return section, key
+            raise KeyError(f"Unknown parameters: {[column]}")
+        found = [(section, column) for section, block in self.config.items()
+                 if column in block["design_default_type"]]
+        if len(found) != 1:
+            raise KeyError(f"Unknown parameters: {[column]}" if not found else
+                           f"Ambiguous parameter {column}, use one of {['/'.join(f) for f in found]}")
+        return found[0]
+
+    def hourly(self, profile, input_type="default", electricity_price=None):
+        """
+        Per-hour energy of a production profile in one vectorized pass.
+
+        Parameters:
+        -----------
+        profile : DataFrame, one row per hour; columns are config keys
+            ("co2_feed_rate" or "reactor/co2_feed_rate"), other values come
+            from this model's config for input_type
+        electricity_price : per kWh; scalar, array, or None to use a
+            profile column "electricity_price" if there is one
+
+        Returns:
+        --------
+        DataFrame on the profile index: kWh per unit and in total for each
+        hour, unavoidable CO2 in kg, and cost when a price is given.
+        """
+        import pandas as pd
+
+        profile = pd.DataFrame(profile)
+        if electricity_price is None and "electricity_price" in profile:
+            electricity_price = profile["electricity_price"].to_numpy(dtype=float)
+        columns = [c for c in profile.columns if c != "electricity_price"]
+        config = copy.deepcopy(self.config)
+        for column in columns:
+            section, key = self._locate(column)
+            config[section]["design_default_type"][key] = profile[column].to_numpy(dtype=float)
+        model = TelcaEnergyModel(config)
+        n = len(profile)
+
+        def per_hour(value):
+            return np.broadcast_to(np.asarray(value, dtype=float), (n,))
+
+        # kW over one hour is kWh; the per-day methods are 24 h of the hourly rate
+        result = pd.DataFrame({
+            "dewatering_kWh": per_hour(model.calculate_energy_requirement_for_dewatering_per_day(input_type) / 24),
+            "drying_kWh": per_hour(model.calculate_energy_requirement_for_drying_per_day(input_type) / 24),
+            "co2_pump_kWh": per_hour(model.calculate_co2_pump(input_type)),
+            "co2_heater_kWh": per_hour(model.calculate_co2_heater(input_type)),
+            "power_imported_kWh": per_hour(model.calculate_power_imported(input_type)),
+            "unavoidable_co2_kg": per_hour(model.calculate_unavoidable_co2(input_type) / 24),
+        }, index=profile.index)
+        result.insert(5, "reactor_kWh", result[["co2_pump_kWh", "co2_heater_kWh", "power_imported_kWh"]].sum(axis=1))
+        result.insert(6, "total_kWh", result[["dewatering_kWh", "drying_kWh", "reactor_kWh"]].sum(axis=1))
+        if electricity_price is not None:
+            result["cost"] = result["total_kWh"] * electricity_price
+        return result
+
+    def dependents(self, section, name):
+        """Names of the cached nodes downstream of a config value."""
+        seen, pending = set(), [("config", section, name)]
+        while pending:
+            for key in self._dependents.get(pending.pop(), ()):
+                if key not in seen:
+                    seen.add(key)
+                    pending.append(key)
+        return sorted({key[0] for key in seen})
+
+
+def main(argv=None):
+    """
+    Command line entry point (telca-energy): energy_report with --set
+    parameter=value (names as the hourly() profile columns, "section/key"
+    where ambiguous) and optionally --set input_type=...
+    """
+    import model_cli
+
+    def report(input_type="default", **overrides):
+        model = TelcaEnergyModel()
+        for column, value in overrides.items():
+            model.set_value(*model._locate(column), value, input_type)
+        return model.energy_report(input_type)
+
+    return model_cli.run(report, "TELCA plant energy report", argv)
+
+
+if __name__ == "__main__":
+    import time
+
+    import CoolProp  # noqa: F401  (import time is not model time)
+    import pandas as pd
+
+    model = TelcaEnergyModel()
+    start = time.perf_counter()
+    report = model.energy_report()
+    elapsed = time.perf_counter() - start
+    for key, value in report.items():
+        print(f"{key:>28}: {value:12.2f}")
+    coolprop = {k: v for k, v in model.evaluations.items() if "enthalpy" in k or k in ("co2_density",
+                                                                                     "co2_pump_discharge_temperature")}
+    print(f"\nFull report in {elapsed * 1000:.1f} ms, CoolProp calls: {coolprop}")
+
+    model.evaluations.clear()
+    model.energy_report()
+    print(f"Second report: {sum(model.evaluations.values())} node evaluations")
+
+    print(f"\nDependents of drying/energy_usage_per_tonne: {model.dependents('drying', 'energy_usage_per_tonne')}")
+    model.set_value("reactor", "co2_evaporator_temperature", 40.0)
+    model.energy_report()
+    print(f"After changing co2_evaporator_temperature, recomputed: {sorted(model.evaluations)}")
+
+    # One year of hours: feed rates with downtime, CO2 storage following the ambient (0.1 °C sensor)
+    rng = np.random.default_rng(0)
+    hours = pd.date_range("2026-01-01", periods=8760, freq="h")
+    day = hours.dayofyear.to_numpy()
+    running = rng.random(8760) > 0.05
+    profile = pd.DataFrame({
+        "co2_feed_rate": np.where(running, rng.normal(1000, 50, 8760), 0.0),
+        "slurry_feed_rate": np.where(running, rng.normal(10, 0.5, 8760), 0.0),
+        "wet_product_rate": np.where(running, 2000.0, 0.0),
+        "dry_product_rate": np.where(running, 500.0, 0.0),
+        "co2_storage_temperature": np.round(-23 + 2 * np.sin(2 * np.pi * (day - 100) / 365), 1),
+        "electricity_price": 0.12 + 0.08 * (hours.hour.isin(range(8, 20))),
+    }, index=hours)
+    start = time.perf_counter()
+    year = TelcaEnergyModel().hourly(profile)
+    elapsed = time.perf_counter() - start
+    print(f"\n8760 hours in {elapsed * 1000:.0f} ms")
+    print(year.resample("QS").sum().round(0).to_string())
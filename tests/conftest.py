@@ -0,0 +1,12 @@
+"""
+Unit tests of the calculation modules (the engines' timings and golden
+outputs are in benchmarks/). The modules are top-level files of the
+repository root, importable without installing the package.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,79 @@
+"""bottlerack_inventory: the closed-form batch filter against the per-sample update()."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("CoolProp")
+
+import bottlerack_inventory as bri  # noqa: E402
+
+
+def _readings(n=20_000, seed=0):
+    """A rack emptying at ~15 kg/h with irregular logging, repeated timestamps and a 3-day gap."""
+    rng = np.random.default_rng(seed)
+    dt = rng.choice([0.0, 5.0, 10.0, 30.0, 120.0], size=n, p=[0.02, 0.5, 0.3, 0.15, 0.03])
+    dt[n // 3] = 3 * 86400  # decay far above the 300 units of one _ewma block
+    t = 1.7e9 + np.cumsum(dt)
+    weight = bri.rack["tare_weight"] + 600 - 15 * (t - t[0]) / 3600 * (t - t[0] < 30 * 3600)
+    weight = np.maximum(weight, bri.rack["tare_weight"] + 40) + rng.normal(0, 0.5, n)
+    temperature = 15 + 5 * np.sin(2 * np.pi * (t - t[0]) / 86400) + rng.normal(0, 0.1, n)
+    return t, weight, temperature
+
+
+def _per_sample(t, weight, temperature):
+    estimator = bri.RackInventoryEstimator()
+    return pd.DataFrame(list(estimator.run(zip(t.tolist(), weight.tolist(), temperature.tolist()))))
+
+
+def _assert_same(batch, reference):
+    # The rate differences smoothed masses of ~600 kg, so the two summation orders agree to ~1e-9 kg/h
+    assert list(batch.columns) == list(reference.columns)
+    for column in reference:
+        np.testing.assert_allclose(batch[column], reference[column], rtol=1e-7, atol=1e-8, err_msg=column)
+
+
+def test_update_batch_matches_update():
+    t, weight, temperature = _readings()
+    reference = _per_sample(t, weight, temperature)
+    _assert_same(bri.RackInventoryEstimator().update_batch(t, weight, temperature), reference)
+    # The filters do something: a consumption rate close to the 15 kg/h drawn, then idle
+    assert reference["consumption_kgph"].iloc[len(t) // 6] == pytest.approx(15, rel=0.1)
+    assert np.isinf(reference["run_time_h"].iloc[-1])
+
+
+@pytest.mark.parametrize("split", [1, 137, 6_666, 6_667, 19_999])
+def test_update_batch_carries_state_between_calls(split):
+    t, weight, temperature = _readings()
+    reference = _per_sample(t, weight, temperature)
+    estimator = bri.RackInventoryEstimator()
+    first = estimator.update_batch(t[:split], weight[:split], temperature[:split])
+    second = estimator.update_batch(t[split:], weight[split:], temperature[split:])
+    _assert_same(pd.concat([first, second], ignore_index=True), reference)
+    # Per-sample updates continue from a batch
+    estimator = bri.RackInventoryEstimator()
+    estimator.update_batch(t[:split], weight[:split], temperature[:split])
+    last = estimator.update(t[split], weight[split], temperature[split])
+    assert last["consumption_kgph"] == pytest.approx(reference["consumption_kgph"].iloc[split], abs=1e-8)
+
+
+def test_ewma_against_loop():
+    rng = np.random.default_rng(1)
+    x, decay = rng.normal(size=2_000), rng.exponential(0.5, 2_000)
+    decay[[10, 500]] = [0.0, 700.0]
+    y, expected = bri._ewma(x, decay, 3.0), []
+    previous = 3.0
+    for value, d in zip(x, decay):
+        a = -np.expm1(-d)
+        previous = a * value + (1 - a) * previous
+        expected.append(previous)
+    np.testing.assert_allclose(y, expected, rtol=1e-10, atol=1e-12)
+
+
+def test_empty_batch_keeps_state():
+    t, weight, temperature = _readings(100)
+    estimator = bri.RackInventoryEstimator()
+    estimator.update_batch(t[:50], weight[:50], temperature[:50])
+    assert estimator.update_batch([], [], []).empty
+    rest = estimator.update_batch(t[50:], weight[50:], temperature[50:])
+    _assert_same(rest, _per_sample(t, weight, temperature).iloc[50:].reset_index(drop=True))
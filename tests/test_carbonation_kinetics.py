@@ -0,0 +1,91 @@
+"""carbonation_kinetics: shrinking-core limits and inverse, the PSD and the reactor conversions."""
+
+import numpy as np
+import pytest
+
+import carbonation_kinetics as ck
+
+
+def test_shrinking_core_diffusion_control():
+    # tau_d (1 - 3 xi**2 + 2 xi**3) = t at t / tau_d = 0.5: xi = 0.5
+    X, rate = ck.shrinking_core(0.5, 0, 1)
+    assert float(X) == pytest.approx(0.875)
+    assert float(rate) == pytest.approx(0.5)
+
+
+def test_shrinking_core_reaction_control():
+    t = np.linspace(0, 2, 9)
+    X, rate = ck.shrinking_core(t, 2.0, 0)
+    np.testing.assert_allclose(X, 1 - (1 - t / 2) ** 3, atol=1e-12)
+    np.testing.assert_allclose(rate, 3 * (1 - t / 2) ** 2 / 2, atol=1e-12)
+
+
+def test_shrinking_core_inverts_time():
+    rng = np.random.default_rng(0)
+    tau_r, tau_d, X = rng.uniform(0.1, 10, 200), rng.uniform(0.1, 10, 200), rng.uniform(0, 1, 200)
+    xi = np.cbrt(1 - X)
+    t = tau_r * (1 - xi) + tau_d * (1 - 3 * xi ** 2 + 2 * xi ** 3)
+    X_solved, rate = ck.shrinking_core(t, tau_r, tau_d)
+    np.testing.assert_allclose(X_solved, X, atol=1e-10)
+    # The rate is dX/dt
+    X_later, _ = ck.shrinking_core(t + 1e-6, tau_r, tau_d)
+    np.testing.assert_allclose(rate, (X_later - X_solved) / 1e-6, rtol=1e-3, atol=1e-6)
+
+
+def test_shrinking_core_complete():
+    X, rate = ck.shrinking_core([0, 2, 5], 1.0, 1.0)
+    np.testing.assert_allclose(X, [0, 1, 1])
+    np.testing.assert_allclose(rate, [3, 0, 0])
+
+
+def test_time_constants_scaling():
+    c = ck.config
+    tau_r, tau_d = ck.time_constants("forsterite", c["T_ref_C"], [c["d_ref_um"], 2 * c["d_ref_um"]])
+    np.testing.assert_allclose(tau_r, [c["forsterite_tau_reaction_h"], 2 * c["forsterite_tau_reaction_h"]])
+    np.testing.assert_allclose(tau_d, [c["forsterite_tau_diffusion_h"], 4 * c["forsterite_tau_diffusion_h"]])
+    hot_r, _ = ck.time_constants("forsterite", c["T_ref_C"] + 20, c["d_ref_um"])
+    assert hot_r < tau_r[0]
+    with pytest.raises(KeyError):
+        ck.time_constants("olivine", 175, 10)
+
+
+def test_psd_bins_quantiles():
+    D10, D50, D90 = ck.config["D10_um"], ck.config["D50_um"], ck.config["D90_um"]
+    d_um, mass_fraction = ck.psd_bins(D10, D50, D90)
+    assert mass_fraction.sum() == pytest.approx(1.0)
+    # Log-spaced bins: upper edges at the geometric mid-points, the cumulative mass through the quantiles
+    upper = d_um * np.sqrt(d_um[1] / d_um[0])
+    d10, d50, d90 = np.exp(np.interp([0.1, 0.5, 0.9], np.cumsum(mass_fraction), np.log(upper)))
+    # Median at D50, spread D90 / D10 (a log-normal is symmetric in log d, so D10 and D90 are not both matched)
+    assert d50 == pytest.approx(D50, rel=0.01)
+    assert d90 / d10 == pytest.approx(D90 / D10, rel=0.02)
+    with pytest.raises(ValueError):
+        ck.psd_bins(D50, D10, D90)
+
+
+def test_headspace_conversions():
+    # The example time constants reproduce the headspace model's fixed conversions
+    conversions = ck.headspace_conversions()
+    assert conversions["forsterite_conversion"] == pytest.approx(0.98, abs=0.005)
+    assert conversions["fayalite_conversion"] == pytest.approx(0.33, abs=0.005)
+    # Back-mixing lowers the conversion of a concave X(t)
+    cstr = ck.headspace_conversions(reactor="cstr")
+    assert all(cstr[name] < conversions[name] for name in conversions)
+    with pytest.raises(ValueError):
+        ck.headspace_conversions(reactor="batch")
+    with pytest.raises(KeyError):
+        ck.simulate(residence_h=2)
+
+
+def test_batch_simulate():
+    results = ck.simulate(temperature_C=[150, 175, 200])
+    t = np.linspace(0.25, 6, 24)
+    before, after = ck.simulate(t - 1e-6, [150, 175, 200]), ck.simulate(t + 1e-6, [150, 175, 200])
+    for mineral in ck.minerals:
+        X = results[f"{mineral}_conversion"]
+        assert X.shape == (3, ck.config["time_points"])
+        assert np.all(np.diff(X, axis=1) >= 0) and np.all(np.diff(X, axis=0) >= 0)
+        # The PSD-weighted rate is the derivative of the PSD-weighted conversion
+        dX = (after[f"{mineral}_conversion"] - before[f"{mineral}_conversion"]) / 2e-6
+        np.testing.assert_allclose(ck.simulate(t, [150, 175, 200])[f"{mineral}_rate_per_h"], dX,
+                                   rtol=1e-4, atol=1e-7)
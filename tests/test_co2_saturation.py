@@ -0,0 +1,64 @@
+"""co2_saturation: the spline table against CoolProp, and subcooling_for_npsh against the notebook's fsolve."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("CoolProp")
+
+from CoolProp.CoolProp import PropsSI  # noqa: E402
+
+import co2_saturation as cs  # noqa: E402
+
+# From well below the pump conditions up to 0.1 K under the critical point
+T_check = np.array([218.0, 230.0, 253.15, 280.0, 300.0, 304.0])
+
+
+@pytest.fixture(scope="module")
+def table():
+    return cs.get_saturation_table()
+
+
+def test_saturation_line(table):
+    P = PropsSI("P", "T", T_check, "Q", 0, "CO2")
+    np.testing.assert_allclose(table.P_sat(T_check), P, rtol=1e-6)
+    np.testing.assert_allclose(table.T_sat(P), T_check, atol=1e-4)
+
+
+@pytest.mark.parametrize("prop, output, Q", [
+    ("rho_liq", "D", 0),
+    ("rho_vap", "D", 1),
+    ("h_liq", "H", 0),
+    ("h_vap", "H", 1),
+])
+def test_saturated_properties(table, prop, output, Q):
+    expected = PropsSI(output, "T", T_check, "Q", Q, "CO2")
+    np.testing.assert_allclose(table.saturated(prop, T=T_check), expected, rtol=1e-6)
+    P = PropsSI("P", "T", T_check, "Q", 0, "CO2")
+    np.testing.assert_allclose(table.saturated(prop, P=P), expected, rtol=1e-5)
+
+
+def test_outside_the_line(table):
+    assert np.isnan(table.P_sat([200.0, 310.0])).all()
+    assert np.isnan(table.T_sat([1e5, 8e6])).all()
+
+
+def test_subcooling_for_npsh_matches_fsolve(table):
+    # Subcooling cell of CO2 properties.ipynb: saturated at -20 °C, NPSHr = 5 m -> T_target = 252.31 K
+    from scipy.optimize import fsolve
+
+    T_initial, NPSHr = 253.15, 5.0
+    P_inlet = PropsSI("P", "T", T_initial, "Q", 0, "CO2")
+
+    def npsh_residual(T):
+        P_sat_T = PropsSI("P", "T", T, "Q", 0, "CO2")
+        rho_T = PropsSI("D", "T", T, "Q", 0, "CO2")
+        return (P_inlet - P_sat_T) / (rho_T * cs.g) - NPSHr
+
+    T_fsolve = fsolve(npsh_residual, T_initial - 3.0)[0]
+    T_target = table.subcooling_for_npsh(T_initial, NPSHr)
+    assert T_target == pytest.approx(T_fsolve, abs=1e-5)
+    assert T_target == pytest.approx(252.31, abs=0.005)
+    # Arrays in one go, NaN when even the triple point is not cold enough
+    targets = table.subcooling_for_npsh([T_initial, T_initial], [NPSHr, 1e4])
+    assert targets[0] == pytest.approx(T_target)
+    assert np.isnan(targets[1])
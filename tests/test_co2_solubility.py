@@ -0,0 +1,65 @@
+"""co2_solubility: Duan & Sun (2003) against reference solubilities, and the table against the direct model."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("CoolProp")
+
+import co2_solubility as cs  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def table():
+    return cs.get_solubility_table()
+
+
+def test_pure_water_at_one_atmosphere():
+    # 0.0339 mol/kg per atm of CO2 at 25 °C (Henry's law, Carroll et al. 1991), at y_CO2 = 0.969
+    assert float(cs.duan_sun_molality(25, 1.01325)) == pytest.approx(0.0329, rel=0.03)
+
+
+def test_salting_out_by_nacl():
+    # Duan & Sun (2003): 1 m NaCl lowers the solubility at 25 °C and 1 atm to 0.83 of pure water, the
+    # Setschenow salting-out of the measured data (0.80 .. 0.83)
+    ratio = cs.duan_sun_molality(25, 1.01325, 1.0) / cs.duan_sun_molality(25, 1.01325)
+    assert float(ratio) == pytest.approx(0.82, rel=0.03)
+    # Salting out is analytic in m_NaCl: exp(-2 lambda m - zeta m**2)
+    T_K, P = 323.15, 100.0
+    lam, zeta = cs._par("lambda_CO2_Na", T_K, P), cs._par("zeta_CO2_Na_Cl", T_K, P)
+    for m in (1.0, 2.0, 4.0):
+        assert float(cs.duan_sun_molality(50, P, m) / cs.duan_sun_molality(50, P)) == pytest.approx(
+            np.exp(-2 * lam * m - zeta * m ** 2), rel=1e-12)
+
+
+def test_solubility_trends():
+    # More CO2 with pressure; less with temperature at moderate pressure
+    P = np.array([10, 50, 100, 200, 400])
+    assert np.all(np.diff(cs.duan_sun_molality(50, P)) > 0)
+    assert np.all(np.diff(cs.duan_sun_molality(np.array([40, 60, 80, 100]), 50)) < 0)
+
+
+def test_table_matches_direct_model(table):
+    rng = np.random.default_rng(0)
+    T, P, m_NaCl = rng.uniform(35, 255, 300), rng.uniform(2, 399, 300), rng.uniform(0, 4, 300)
+    direct = cs.duan_sun_molality(T, P, m_NaCl)
+    np.testing.assert_allclose(table.molality(T, P, m_NaCl), direct, rtol=1e-3)
+    # Scalar queries take the plain-float path
+    for k in range(0, 300, 30):
+        assert table.molality(float(T[k]), float(P[k]), float(m_NaCl[k])) == pytest.approx(direct[k], rel=1e-3)
+
+
+def test_table_near_water_vapour_pressure(table):
+    # P_sat,water(175 °C) = 8.9 bar: the table interpolates the smooth part and keeps ln(P - P_sat) exact
+    for P in (9.0, 10.0, 12.0):
+        assert table.molality(175.0, P) == pytest.approx(float(cs.duan_sun_molality(175, P)), rel=1e-2)
+    assert table.molality(175.0, 8.5) == 0.0
+    assert float(cs.duan_sun_molality(175, 8.5)) == 0.0
+    np.testing.assert_allclose(cs.solubility_kg_per_100L(np.array([175.0]), 10.0),
+                               cs.duan_sun_molality(175, 10.0) * cs.CO2_M / 10, rtol=1e-2)
+    assert np.isnan(table.molality(300.0, 100.0))
+
+
+def test_table_save_load(table, tmp_path):
+    loaded = cs.SolubilityTable.load(table.save(tmp_path / "solubility.npz"))
+    T, P = np.meshgrid(np.linspace(20, 250, 7), np.linspace(5, 300, 5))
+    np.testing.assert_array_equal(loaded.molality(T, P, 1.5), table.molality(T, P, 1.5))
@@ -0,0 +1,59 @@
+"""reactor_headspace_simulation.simulate_species: ideal-gas limit, mole balance and the EOS closure."""
+
+import numpy as np
+import pytest
+
+import peng_robinson as pr
+import reactor_headspace_simulation as headspace
+
+
+@pytest.mark.parametrize("pressure_bar, rtol", [(1.5, 3e-3), (5.0, 8e-3)])
+def test_low_pressure_matches_simulate(pressure_bar, rtol):
+    # Near ideal gas, mole fractions equal simulate()'s partial volume fractions
+    stepped = headspace.simulate(pressure_bar=pressure_bar)
+    species = headspace.simulate_species(pressure_bar=pressure_bar)
+    assert species["species"] == ["CO2", "N2", "H2"]
+    np.testing.assert_allclose(species["time_h"], stepped["time_h"], atol=1e-9)
+    late = slice(len(stepped["time_h"]) // 10, None)  # skip the first hours, where both are ~0
+    np.testing.assert_allclose(species["vol_pct"][late, 0, 1], stepped["vol_pct_N2"][late], rtol=rtol)
+    np.testing.assert_allclose(species["vol_pct"][late, 0, 2], stepped["vol_pct_H2"][late], rtol=rtol)
+    assert np.all(np.abs(species["Z"] - 1) < 0.01 * pressure_bar / 5)
+
+
+def test_mole_balance_and_eos():
+    overrides = {"feed_impurities": {"N2": 0.002, "O2": 0.0005, "Ar": 0.0005}, "time_h": 100}
+    out = headspace.simulate_species(**overrides)
+    c = headspace.resolve(**overrides)
+    T_K, P_Pa, V = c["temperature_C"] + 273.15, c["pressure_bar"] * 1e5, c["headspace_volume_L"] / 1000
+    x = out["vol_pct"][:, 0] / 100
+    np.testing.assert_allclose(x.sum(-1), 1, rtol=1e-12)
+
+    # Total amount from Z, and Z from the Peng-Robinson mixture at each step's composition
+    N = P_Pa * V / (out["Z"][:, 0] * pr.R * T_K)
+    v, Z = pr.molar_volume(pr.mixture(tuple(out["species"]), T_K), x, P_Pa)
+    np.testing.assert_allclose(Z, out["Z"][:, 0], rtol=1e-9)
+
+    # Each impurity: n[k] = n[k-1] (1 - purge dt / N[k-1]) + F dt, from n = 0
+    dt = c["dt"]
+    n = x * N[:, None]
+    F = out["feeds_molph"][0]
+    purge = headspace._species_feeds(c)[1]
+    for i, name in enumerate(out["species"]):
+        if name == "CO2":
+            continue
+        expected = n[:-1, i] * (1 - purge * dt / N[:-1]) + F[i] * dt
+        np.testing.assert_allclose(n[1:, i], expected, rtol=1e-9, err_msg=name)
+        assert n[0, i] == pytest.approx(F[i] * dt, rel=1e-9)
+    # Feeds in proportion to the impurity fractions
+    assert F[out["species"].index("O2")] / F[out["species"].index("N2")] == pytest.approx(0.25)
+
+
+def test_scenarios_solved_together():
+    scenarios = [{"pressure_bar": 60}, {"pressure_bar": 100, "temperature_C": 150}]
+    batch = headspace.simulate_species(scenarios, time_h=50)
+    for k, scenario in enumerate(scenarios):
+        one = headspace.simulate_species(time_h=50, **scenario)
+        np.testing.assert_allclose(batch["vol_pct"][:, k], one["vol_pct"][:, 0], rtol=1e-10)
+        np.testing.assert_allclose(batch["Z"][:, k], one["Z"][:, 0], rtol=1e-12)
+    with pytest.raises(ValueError, match="time_h"):
+        headspace.simulate_species([{"time_h": 10}, {"time_h": 20}])
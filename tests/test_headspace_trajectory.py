@@ -0,0 +1,51 @@
+"""reactor_headspace_simulation.simulate_trajectory against simulate() and across scenarios."""
+
+import numpy as np
+import pytest
+
+import reactor_headspace_simulation as headspace
+
+
+@pytest.fixture(scope="module")
+def stepped():
+    return headspace.simulate()
+
+
+def test_constant_trajectory_matches_simulate(stepped):
+    # simulate() runs at the configured 175 °C / 100 bar
+    assert (headspace.config["temperature_C"], headspace.config["pressure_bar"]) == (175, 100)
+    out = headspace.simulate_trajectory({"time_hours": [0, stepped["time_h"][-1]], "T_reactor": [175, 175]})
+    np.testing.assert_allclose(out["time_h"], stepped["time_h"], atol=1e-9)
+    # Differences are the molar volume table interpolation (~1e-5 relative)
+    np.testing.assert_allclose(out["vol_pct_H2"], stepped["vol_pct_H2"], atol=1e-6)
+    np.testing.assert_allclose(out["vol_pct_N2"], stepped["vol_pct_N2"], rtol=1e-4, atol=1e-6)
+    np.testing.assert_allclose(out["purge_weight_kgph"], stepped["purge_weight_kgph"], rtol=1e-4)
+    for name in ("Vmol_CO2", "Vmol_N2", "Vmol_H2", "CO2_feed_molph"):
+        np.testing.assert_allclose(out[name], stepped["derived"][name], rtol=1e-4)
+
+
+def test_pressure_column_and_column_names():
+    base = headspace.simulate_trajectory({"time_hours": [0, 24], "T_reactor": [25, 175]}, pressure_bar=60)
+    renamed = headspace.simulate_trajectory({"t": [0, 24], "T": [25, 175], "P": [60, 60]},
+                                            columns={"time_h": "t", "temperature_C": "T", "pressure_bar": "P"})
+    for name in ("vol_pct_N2", "vol_pct_H2", "purge_weight_kgph"):
+        np.testing.assert_allclose(renamed[name], base[name], rtol=1e-12)
+    np.testing.assert_allclose(base["temperature_C"][[0, -1]], [25, 175])
+
+
+def test_scenario_columns():
+    time = np.array([0, 4, 20, 24])
+    T = np.array([[25, 25], [175, 150], [175, 150], [40, 60]])
+    batch = headspace.simulate_trajectory({"time_hours": time, "T_reactor": T})
+    assert batch["vol_pct_H2"].shape == (len(batch["time_h"]), 2)
+    for k in range(2):
+        one = headspace.simulate_trajectory({"time_hours": time, "T_reactor": T[:, k]})
+        np.testing.assert_allclose(batch["vol_pct_H2"][:, k], one["vol_pct_H2"], rtol=1e-10)
+        np.testing.assert_allclose(batch["vol_pct_N2"][:, k], one["vol_pct_N2"], rtol=1e-10)
+
+
+def test_invalid_trajectories():
+    with pytest.raises(ValueError, match="increasing"):
+        headspace.simulate_trajectory({"time_hours": [0, 2, 1], "T_reactor": [25, 175, 175]})
+    with pytest.raises(ValueError, match="molar volume table"):
+        headspace.simulate_trajectory({"time_hours": [0, 1], "T_reactor": [25, 300]})
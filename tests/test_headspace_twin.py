@@ -0,0 +1,56 @@
+"""headspace_twin: parameter estimation on synthetic plant data with a known truth."""
+
+import math
+
+import numpy as np
+import pytest
+
+import headspace_twin as twin_model
+import headspace_uncertainty
+
+truth = {"h2_yield": 0.008, "purge_effectiveness": 0.8}
+
+
+@pytest.fixture(scope="module")
+def estimates():
+    measurements = twin_model.synthetic_measurements(10 * 24, step_s=60, **truth)
+    return twin_model.HeadspaceTwin().run(measurements, 3600)
+
+
+def test_estimates_converge_to_truth(estimates):
+    assert list(estimates.columns) == twin_model.estimate_columns
+    error = (estimates["h2_yield"] - truth["h2_yield"]).abs().to_numpy()
+    assert error[-1] < 0.1 * error[0]
+    assert error[-1] == pytest.approx(0, abs=2e-4)
+    # The purge effectiveness is weakly observable in 10 days, but moves from 1.0 towards the truth
+    eta = estimates["purge_effectiveness"].to_numpy()
+    assert abs(eta[-1] - truth["purge_effectiveness"]) < 0.5 * abs(eta[0] - truth["purge_effectiveness"])
+    assert np.all(np.diff(estimates["h2_yield_sd"]) <= 1e-12)
+    assert estimates["purge_effectiveness_sd"].iloc[-1] < estimates["purge_effectiveness_sd"].iloc[0]
+
+
+def test_state_tracks_headspace(estimates):
+    true_purge = twin_model.headspace.config["CO2_purge_wt_fraction"] * truth["purge_effectiveness"]
+    hours = estimates["time_s"].to_numpy() / 3600
+    closed = headspace_uncertainty.h2_peak(time_h=hours, CO2_purge_wt_fraction=true_purge,
+                                           h2_yield_per_fayalite=truth["h2_yield"])
+    sd = twin_model.twin_settings["analyser_sd_vol_pct"]
+    np.testing.assert_allclose(estimates["h2_vol_pct"], closed["vol_pct_H2"], atol=sd["H2"])
+    np.testing.assert_allclose(estimates["n2_vol_pct"], closed["vol_pct_N2"], atol=sd["N2"])
+
+
+def test_missing_readings():
+    measurements = list(twin_model.synthetic_measurements(6, step_s=60, **truth))
+    # Without analyser readings the parameters stay at the prior and only their uncertainty grows
+    twin = twin_model.HeadspaceTwin()
+    twin.run([(t, feed, purge, math.nan, math.nan) for t, feed, purge, _, _ in measurements])
+    start = twin_model.HeadspaceTwin().estimate()
+    assert twin.estimate()["h2_yield"] == start["h2_yield"]
+    assert twin.estimate()["purge_effectiveness"] == start["purge_effectiveness"]
+    assert twin.estimate()["h2_yield_sd"] > twin_model.twin_settings["initial_sd"]["h2_yield"]
+    # H2 readings every tenth sample still move the yield towards the truth
+    twin = twin_model.HeadspaceTwin()
+    twin.run([(t, feed, purge, h2 if i % 10 == 0 else math.nan, n2)
+              for i, (t, feed, purge, h2, n2) in enumerate(measurements)])
+    assert abs(twin.estimate()["h2_yield"] - truth["h2_yield"]) < abs(start["h2_yield"] - truth["h2_yield"])
+    assert twin.samples == len(measurements)
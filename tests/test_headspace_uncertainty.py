@@ -0,0 +1,55 @@
+"""headspace_uncertainty: the closed form against the time-stepped simulate(), sampling and Sobol indices."""
+
+import numpy as np
+import pytest
+
+import headspace_uncertainty as uq
+import reactor_headspace_simulation as headspace
+
+corner = {"h2_yield_per_fayalite": 0.02, "CO2_purge_wt_fraction": 0.005}
+
+
+@pytest.mark.parametrize("inputs", [{}, corner], ids=["config", "corner"])
+def test_h2_peak_against_simulate(inputs):
+    stepped = headspace.simulate(**inputs)
+    closed = uq.h2_peak(time_h=len(stepped["time_h"]) * headspace.config["dt"], **inputs)
+    assert float(closed["vol_pct_H2"]) == pytest.approx(stepped["vol_pct_H2"][-1], rel=1e-4)
+    assert float(closed["vol_pct_N2"]) == pytest.approx(stepped["vol_pct_N2"][-1], rel=1e-4)
+
+
+def test_hours_to_threshold_against_simulate():
+    inputs = {**corner, "time_h": 600}
+    stepped = headspace.simulate(**inputs)
+    first = np.argmax(stepped["vol_pct_H2"] >= headspace.H2_LEL_WARNING_PCT)
+    assert stepped["vol_pct_H2"][first] >= headspace.H2_LEL_WARNING_PCT
+    hours = float(uq.h2_peak(**inputs)["hours_to_threshold"])
+    assert hours == pytest.approx(stepped["time_h"][first], abs=2 * headspace.config["dt"])
+    # Steady state below the warning level at the configured point
+    assert np.isinf(uq.h2_peak()["hours_to_threshold"])
+
+
+def test_h2_peak_vectorized():
+    inputs = uq.sample(8, seed=1)
+    out = uq.h2_peak(**inputs)
+    for i in range(8):
+        one = uq.h2_peak(**{name: values[i] for name, values in inputs.items()})
+        for name in out:
+            assert out[name][i] == pytest.approx(float(one[name]), rel=1e-12)
+
+
+@pytest.mark.parametrize("method", ["sobol", "lhs"])
+def test_sample_bounds(method):
+    inputs = uq.sample(1000, method=method)
+    assert all(values.size == (1024 if method == "sobol" else 1000) for values in inputs.values())
+    for name, (_, low, high) in uq.uncertainty.items():
+        assert low <= inputs[name].min() and inputs[name].max() <= high
+    with pytest.raises(ValueError):
+        uq.sample(16, method="random")
+
+
+def test_sobol_indices():
+    table = uq.sobol_indices(2 ** 10)
+    assert table["total"].idxmax() == "h2_yield_per_fayalite"
+    assert table.loc["h2_yield_per_fayalite", "first_order"] > 0.5
+    assert table.loc["CO2_feed_purity", "total"] == pytest.approx(0, abs=1e-3)
+    assert 0 <= table.attrs["exceedance_probability"] <= 1
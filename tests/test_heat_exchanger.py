@@ -0,0 +1,123 @@
+"""heat_exchanger: e-NTU against the closed forms, sizing round trips and limit codes."""
+
+import numpy as np
+import pytest
+
+import heat_exchanger as hx
+
+rng = np.random.default_rng(0)
+n = 200
+T_hot = rng.uniform(80, 250, n)
+T_cold = rng.uniform(5, 70, n)
+C_hot = rng.uniform(500, 5e4, n)
+C_cold = rng.uniform(500, 5e4, n)
+UA = rng.uniform(50, 2e4, n)
+
+
+def lmtd(dT1, dT2):
+    # Logarithmic mean; the closed form cancels badly as dT1 -> dT2, use the series there
+    r = dT2 / dT1 - 1
+    series = dT1 * (1 + r / 2 - r**2 / 12 + r**3 / 24)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        closed = (dT1 - dT2) / np.log(dT1 / dT2)
+    return np.where(np.abs(r) < 1e-3, series, closed)
+
+
+@pytest.mark.parametrize("arrangement", ["counterflow", "parallel"])
+def test_ntu_matches_lmtd(arrangement):
+    Q, T_hot_out, T_cold_out, _ = hx.exchange(T_hot, T_cold, C_hot, C_cold, UA, arrangement=arrangement)
+    if arrangement == "counterflow":
+        dT = lmtd(T_hot - T_cold_out, T_hot_out - T_cold)
+    else:
+        dT = lmtd(T_hot - T_cold, T_hot_out - T_cold_out)
+    np.testing.assert_allclose(Q, UA * dT, rtol=1e-6)
+    # Energy balance on both sides
+    np.testing.assert_allclose(C_hot * (T_hot - T_hot_out), Q, rtol=1e-12)
+    np.testing.assert_allclose(C_cold * (T_cold_out - T_cold), Q, rtol=1e-12)
+
+
+def test_counterflow_balanced_streams():
+    # Cr = 1: constant temperature difference along the exchanger, Q = UA * dT_out
+    Q, T_hot_out, T_cold_out, _ = hx.exchange(150.0, 50.0, 1000.0, 1000.0, 3000.0)
+    assert float(Q) == pytest.approx(3000 * (150 - float(T_cold_out)), rel=1e-12)
+    assert float(T_hot_out) - 50 == pytest.approx(150 - float(T_cold_out), rel=1e-12)
+
+
+@pytest.mark.parametrize("arrangement, Cr, limit", [
+    ("counterflow", 0.0, 1.0),
+    ("counterflow", 0.5, 1.0),
+    ("counterflow", 1.0, 1.0),
+    ("parallel", 0.5, 1 / 1.5),
+    ("parallel", 1.0, 0.5),
+    ("isothermal", 0.7, 1.0),
+])
+def test_effectiveness_limits(arrangement, Cr, limit):
+    assert float(hx.effectiveness(0.0, Cr, arrangement)) == 0.0
+    assert float(hx.effectiveness(1e4, Cr, arrangement)) == pytest.approx(limit, rel=1e-3)
+    eps = hx.effectiveness(np.logspace(-3, 3, 50), Cr, arrangement)
+    assert np.all(np.diff(eps) >= 0) and np.all(eps <= limit * (1 + 1e-15))
+
+
+@pytest.mark.parametrize("arrangement", hx.arrangements)
+def test_ntu_from_effectiveness_inverts(arrangement):
+    NTU = np.logspace(-2, 1, 30)[:, None]
+    Cr = np.array([0.0, 0.3, 0.99, 1.0])[None, :]
+    eps = hx.effectiveness(NTU, Cr, arrangement)
+    np.testing.assert_allclose(hx.ntu_from_effectiveness(eps, Cr, arrangement), NTU + 0 * Cr, rtol=1e-6)
+
+
+def test_isothermal_side():
+    # A bath (C = inf) keeps its temperature; the stream relaxes towards it with eps = 1 - exp(-NTU)
+    Q, T_hot_out, T_cold_out, _ = hx.exchange(T_hot, T_cold, C_hot, np.inf, UA, arrangement="isothermal")
+    np.testing.assert_array_equal(T_cold_out, T_cold)
+    np.testing.assert_allclose(Q, C_hot * (1 - np.exp(-UA / C_hot)) * (T_hot - T_cold), rtol=1e-12)
+    np.testing.assert_allclose(Q, UA * lmtd(T_hot - T_cold, T_hot_out - T_cold), rtol=1e-6)
+    # Same for an isothermal hot side
+    Q, T_hot_out, _, _ = hx.exchange(T_hot, T_cold, np.inf, C_cold, UA, arrangement="isothermal")
+    np.testing.assert_array_equal(T_hot_out, T_hot)
+    np.testing.assert_allclose(Q, C_cold * (1 - np.exp(-UA / C_cold)) * (T_hot - T_cold), rtol=1e-12)
+
+
+@pytest.mark.parametrize("arrangement", ["counterflow", "parallel", "isothermal"])
+def test_required_area_round_trip(arrangement):
+    U = 350.0
+    C_c = np.inf if arrangement == "isothermal" else C_cold
+    Q, _, _, _ = hx.exchange(T_hot, T_cold, C_hot, C_c, UA, arrangement=arrangement)
+    area = hx.required_area(Q, T_hot, T_cold, C_hot, C_c, U, arrangement)
+    np.testing.assert_allclose(area * U, UA, rtol=1e-6)
+
+
+def test_required_UA_unreachable_duty():
+    # More than C_min * dT cannot be transferred by any area
+    assert np.isnan(hx.required_UA(1.1 * 1000 * 100, 150.0, 50.0, 1000.0, 2000.0))
+
+
+def test_limit_codes_ntu():
+    T_h = np.array([50.0, 150.0, 150.0, 150.0, 150.0])
+    T_c = np.array([60.0, 50.0, 50.0, 50.0, 50.0])
+    C_h = np.array([1000.0, 1000.0, 1000.0, 1000.0, 4000.0])
+    C_c = np.array([1000.0, 1000.0, 4000.0, 1000.0, 1000.0])
+    UA_ = np.array([1000.0, 500.0, 3000.0, 1e5, 3000.0])
+    max_duty = np.array([np.inf, np.inf, np.inf, 5e3, np.inf])
+    Q, _, _, limit = hx.exchange(T_h, T_c, C_h, C_c, UA_, max_duty=max_duty)
+    assert limit.dtype == np.int8
+    assert limit.tolist() == [hx.NO_TRANSFER, hx.AREA, hx.HOT_FLOW, hx.DEVICE, hx.COLD_FLOW]
+    assert Q[0] == 0.0 and Q[3] == 5e3
+    assert hx.limit_labels(limit).tolist() == ["no transfer", "area", "hot flow", "device", "cold flow"]
+
+
+def test_limit_codes_limits_method():
+    # Q = min(UA dT, C_hot dT, C_cold dT) with the original precedence area, hot flow, cold flow
+    UA_ = np.array([500.0, 2000.0, 2000.0, 1000.0, 2000.0])
+    C_h = np.array([1000.0, 1000.0, 3000.0, 1000.0, 3000.0])
+    C_c = np.array([1000.0, 3000.0, 1000.0, 1000.0, 3000.0])
+    Q, T_hot_out, T_cold_out, limit = hx.exchange(150.0, 50.0, C_h, C_c, UA_, max_duty=1.5e5, method="limits")
+    assert limit.tolist() == [hx.AREA, hx.HOT_FLOW, hx.COLD_FLOW, hx.AREA, hx.DEVICE]
+    np.testing.assert_allclose(Q, [5e4, 1e5, 1e5, 1e5, 1.5e5])
+
+
+def test_unknown_arrangement_and_method():
+    with pytest.raises(ValueError):
+        hx.exchange(100.0, 20.0, 1.0, 1.0, 1.0, arrangement="crossflow")
+    with pytest.raises(ValueError):
+        hx.exchange(100.0, 20.0, 1.0, 1.0, 1.0, method="lmtd")
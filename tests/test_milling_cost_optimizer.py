@@ -0,0 +1,38 @@
+"""milling_cost_optimizer: the price sweep against the single-point optimizer."""
+
+import numpy as np
+import pytest
+
+import milling_cost_optimizer as mco
+
+d = np.logspace(0, 2, 40)
+T_C = np.arange(120, 240.01, 2.0)
+
+
+@pytest.fixture(scope="module")
+def energy():
+    return mco.evaluate_energy(d[None, :], T_C[:, None])
+
+
+@pytest.mark.parametrize("sweep_kwargs, overrides", [
+    ({}, {}),
+    ({"heater_efficiency": 0.6}, {"heater_efficiency": 0.6}),
+    ({"heat_prices": 0.05}, {"heat_price": 0.05}),
+])
+def test_sweep_matches_optimize(energy, sweep_kwargs, overrides):
+    electricity_prices = np.array([0.08, 0.15, 0.30])
+    sweep = mco.price_sweep(energy, electricity_prices, **sweep_kwargs)
+    for row, p_el in zip(sweep.itertuples(), electricity_prices):
+        best, _ = mco.optimize(d, T_C, electricity_price=p_el, **overrides)
+        s = mco._settings({"electricity_price": p_el, **overrides})
+        assert row.heat_price == pytest.approx(s["heat_price"])
+        assert (row.d, row.T_C) == (best["d"], best["T_C"])
+        assert row.cost_per_t == pytest.approx(best["cost_per_t"], rel=1e-12)
+
+
+def test_heater_efficiency_raises_heat_cost(energy):
+    # A lossy heater makes heat dearer than electricity, so the default sweep must not ignore it
+    ideal = mco.price_sweep(energy, 0.15)
+    lossy = mco.price_sweep(energy, 0.15, heater_efficiency=0.5)
+    assert lossy["heat_price"].iloc[0] == pytest.approx(0.30)
+    assert lossy["cost_per_t"].iloc[0] > ideal["cost_per_t"].iloc[0]
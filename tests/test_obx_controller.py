@@ -0,0 +1,47 @@
+"""obx_controller: anti-windup while the heater is saturated, and its effect on overshoot."""
+
+import numpy as np
+import pytest
+
+import obx_controller as controller
+
+
+def _saturated_integrals(anti_windup, n_steps=2000, dt=5.0):
+    """Integral of a PI controller held at a constant error that keeps u above u_max."""
+    state = controller.new_state(1)
+    active = np.ones(1, dtype=bool)
+    integrals = []
+    for _ in range(n_steps):
+        u = controller.pid_output(state, np.array([10.0]), active, 10.0, 1e-3, 0.0, dt, 50.0, anti_windup)
+        assert u[0] > 50.0
+        integrals.append(state["integral"][0])
+    return np.array(integrals)
+
+
+def test_integral_bounded_while_saturated():
+    # Clamp holds the integral. Back-calculation (T_t = T_i without D) bleeds it towards
+    # K_i * integral = u_max with time constant T_i = 1e4 s, never beyond.
+    np.testing.assert_array_equal(_saturated_integrals("clamp"), 0.0)
+    back = _saturated_integrals("back_calculation", n_steps=20000)
+    assert np.all(np.diff(back) > 0)
+    assert back.max() <= 50.0 / 1e-3
+    assert back[-1] == pytest.approx(50.0 / 1e-3, rel=1e-3)
+    none = _saturated_integrals("none", n_steps=20000)
+    np.testing.assert_allclose(none, 10.0 * 5.0 * np.arange(1, none.size + 1))
+    assert back[-1] < none[-1] / 10
+
+
+def test_anti_windup_reduces_overshoot():
+    # The module's example: big Huber with 250 °C oil, PI K_p = 5, K_i = 1e-3
+    case = {"heater_max_duty": 96e3, "oil_flow_m3_per_h": 10, "oil_max_temp": 250}
+    overshoot = {mode: controller.evaluate_gains(5.0, 1e-3, anti_windup=mode, **case)["overshoot"].iloc[0]
+                 for mode in controller.anti_windup_modes}
+    assert overshoot["none"] > 0
+    assert overshoot["back_calculation"] < overshoot["none"]
+    assert overshoot["clamp"] < overshoot["none"]
+
+
+def test_unknown_anti_windup():
+    with pytest.raises(ValueError, match="Unknown anti_windup"):
+        controller.pid_output(controller.new_state(1), np.ones(1), np.ones(1, dtype=bool), 1.0, 1e-3, 0.0, 1.0,
+                              10.0, "integrator_reset")
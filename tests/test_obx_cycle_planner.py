@@ -0,0 +1,24 @@
+"""obx_cycle_planner: smoke test of the schedule search and the short-horizon error."""
+
+import numpy as np
+import pytest
+
+import obx_cycle_planner as planner
+
+
+def test_optimize_schedule_small_grid():
+    best, table = planner.optimize_schedule(n_grid=2, refine=0)
+    assert list(table.columns) == ["cutoff", "reheat_lead_min", "batches_per_day", "cycle_time_h", "first_batch_h",
+                                   "batches_first_24h", "heater_kWh_per_batch", "cooler_kWh_per_batch"]
+    assert len(table) == 4
+    assert np.isfinite(table["batches_per_day"]).all()
+    assert table["batches_per_day"].is_monotonic_decreasing
+    assert best["batches_per_day"] == table["batches_per_day"].max()
+    # The steady period and the batch rate describe the same cycle
+    np.testing.assert_allclose(table["batches_per_day"] * table["cycle_time_h"], 24, rtol=1e-12)
+    assert table["cutoff"].between(*planner.planner["cutoff_range"]).all()
+
+
+def test_short_horizon_raises():
+    with pytest.raises(ValueError, match="horizon of 12 h"):
+        planner.optimize_schedule(n_grid=3, refine=0, horizon=12 * 3600)
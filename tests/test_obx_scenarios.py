@@ -0,0 +1,49 @@
+"""obx_scenarios: the scenario file against the script's committed result pages, and where runs write."""
+
+import base64
+import json
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import obx_heat_model
+import obx_scenarios
+
+SCENARIO_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "OBX heating",
+                             "scenarios.toml")
+
+
+def _page_traces(path):
+    """{trace name: y array} of a plotly page written by the script."""
+    with open(path, encoding="utf-8") as f:
+        html = f.read()
+    start = html.index("[", html.rindex("Plotly.newPlot("))
+    data, _ = json.JSONDecoder().raw_decode(html, start)
+
+    def values(v):
+        if isinstance(v, dict):  # typed array
+            return np.frombuffer(base64.b64decode(v["bdata"]), dtype=v["dtype"])
+        return np.asarray(v, dtype=float)
+
+    return {trace["name"]: values(trace["y"]) for trace in data}
+
+
+@pytest.mark.parametrize("name", list(obx_scenarios.load_scenarios(SCENARIO_FILE)))
+def test_scenario_reproduces_committed_page(name):
+    params, report = obx_scenarios.load_scenarios(SCENARIO_FILE)[name]
+    page = _page_traces(os.path.join(os.path.dirname(SCENARIO_FILE), report["filename"]))
+    df = obx_heat_model.run(**params)
+    for column in obx_heat_model.temperature_columns + obx_heat_model.duty_columns:
+        np.testing.assert_allclose(df[column], page[column], rtol=1e-9, atol=1e-6, err_msg=column)
+
+
+def test_default_output_dir(tmp_path):
+    path = tmp_path / "scenarios.toml"
+    shutil.copy(SCENARIO_FILE, path)
+    obx_scenarios.run_scenarios(str(path), workers=1, only=["small_huber"])
+    output = tmp_path / obx_scenarios.output_dirname
+    assert (output / "simulation_results_small_huber.html").exists()
+    assert (output / f"{obx_scenarios.report_basename}.html").exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [obx_scenarios.output_dirname, "scenarios.toml"]
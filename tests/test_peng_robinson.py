@@ -0,0 +1,56 @@
+"""peng_robinson: pure gases against CoolProp, the cubic root and the extensive form."""
+
+import numpy as np
+import pytest
+
+import peng_robinson as pr
+
+T_K, P_Pa = 175 + 273.15, 100e5
+
+
+@pytest.mark.parametrize("name", ["CO2", "N2", "H2", "O2", "Ar", "CH4"])
+def test_pure_gas_volume_against_coolprop(name):
+    from CoolProp.CoolProp import PropsSI
+
+    v, _ = pr.molar_volume(pr.mixture((name,), T_K), [1.0], P_Pa)
+    v_coolprop = PropsSI("M", name) / PropsSI("D", "T", T_K, "P", P_Pa, name)
+    assert float(v) == pytest.approx(v_coolprop, rel=0.015)
+
+
+def test_compressibility_is_largest_real_root():
+    A, B = np.meshgrid(np.linspace(0.01, 1.5, 40), np.linspace(0.005, 0.2, 40))
+    Z = pr.compressibility(A, B)
+    for a, b, z in zip(A.ravel(), B.ravel(), Z.ravel()):
+        roots = np.roots([1, -(1 - b), a - 3 * b**2 - 2 * b, -(a * b - b**2 - b**3)])
+        assert z == pytest.approx(roots[np.abs(roots.imag) < 1e-9].real.max(), rel=1e-9)
+
+
+def test_ideal_gas_limit():
+    _, Z = pr.molar_volume(pr.mixture(("CO2", "N2", "H2"), T_K), [0.9, 0.05, 0.05], 1.0)
+    assert float(Z) == pytest.approx(1.0, abs=1e-6)
+
+
+def test_pressure_inverts_molar_volume():
+    species = ("CO2", "N2", "H2", "O2", "Ar")
+    params = pr.mixture(species, T_K)
+    x = np.random.default_rng(0).dirichlet([50, 1, 1, 0.5, 0.5], size=100)
+    P = np.linspace(10e5, 200e5, 100)
+    v, _ = pr.molar_volume(params, x, P)
+    # 3 mol of each composition in 3 molar volumes
+    np.testing.assert_allclose(pr.pressure(params, 3 * x, 3 * v), P, rtol=1e-9)
+
+
+def test_mixture_parameters():
+    species = ("CO2", "H2")
+    params = pr.mixture(species, T_K)
+    np.testing.assert_allclose(params["a_ij"], params["a_ij"].T)
+    a_geometric = np.sqrt(params["a_ij"][0, 0] * params["a_ij"][1, 1])
+    assert params["a_ij"][0, 1] == pytest.approx(a_geometric * (1 - pr.kij_matrix(species)[0, 1]))
+    # A one-component "mixture" is the pure gas
+    a, b = pr.mix(params, [1.0, 0.0])
+    assert (a, b) == (pytest.approx(params["a_ij"][0, 0]), pytest.approx(params["b"][0]))
+
+
+def test_unknown_species():
+    with pytest.raises(KeyError):
+        pr.parameters(("CO2", "He"), T_K)
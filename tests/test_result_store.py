@@ -0,0 +1,58 @@
+"""result_store: memoized runs read back identical to the computed result."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import result_store
+
+
+@pytest.fixture
+def csv_only(monkeypatch):
+    """The .csv.gz fallback, as without pyarrow."""
+    def no_parquet(*args, **kwargs):
+        raise ImportError("pyarrow")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", no_parquet)
+
+
+def test_csv_round_trip_is_exact(csv_only, tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "x": rng.random(1000) * 10.0 ** rng.integers(-8, 8, 1000),
+        "third": np.arange(1000) / 3,
+        "gap": np.where(np.arange(1000) % 7 == 0, np.nan, 0.1 + 0.2),
+        "n": np.arange(1000, dtype=np.int64),
+        "label": ["", "a"] * 500,
+    }, index=pd.Index(np.arange(1000) * 0.1, name="t"))
+    file, layout = result_store._write_table(df.copy(), str(tmp_path / "run"))
+    assert file == "run.csv.gz"
+    back = result_store._read_table(str(tmp_path / file), layout)
+    pd.testing.assert_frame_equal(back, df, check_exact=True)
+
+
+def test_permco2_miss_store_hit(csv_only, tmp_path, monkeypatch):
+    pytest.importorskip("CoolProp")
+    import permco2_sizing
+
+    calls = []
+    size_coils = permco2_sizing.size_coils
+
+    def counted(**inputs):
+        calls.append(inputs)
+        return size_coils(**inputs)
+
+    monkeypatch.setattr(permco2_sizing, "size_coils", counted)
+    store = result_store.ResultStore(tmp_path)
+    key = store.key("permco2")
+    assert store.get(key) is None  # miss
+
+    computed = store.run("permco2")
+    assert len(calls) == 1
+    assert sorted(p.name for p in (tmp_path / "permco2").iterdir()) == [f"{key}.csv.gz"]
+
+    stored = store.run("permco2")  # hit
+    assert len(calls) == 1
+    assert stored.equals(computed)
+    pd.testing.assert_frame_equal(stored, computed, check_exact=True)
+    assert store.get(key).equals(computed)
@@ -0,0 +1,88 @@
+"""telca_energy_model: set_value recomputes exactly the nodes downstream of the changed input."""
+
+import copy
+
+import numpy as np
+import pytest
+
+pytest.importorskip("CoolProp")
+
+import telca_energy_model as tem  # noqa: E402
+
+reactor_energy = {"calculate_co2_pump", "calculate_co2_heater", "calculate_energy_requirement_for_reactor_per_day",
+                  "get_model_inputs"}
+
+
+def _evaluate(model):
+    return {**model.energy_report(), **model.get_model_inputs()}
+
+
+@pytest.mark.parametrize("section, name, value, recomputed", [
+    ("reactor", "co2_feed_rate", 2000.0,
+     reactor_energy | {"co2_mass_flow_rate", "calculate_unavoidable_co2"}),
+    ("reactor", "co2_storage_temperature", -10.0,
+     reactor_energy | {"co2_storage_temperature", "co2_density", "co2_storage_enthalpy",
+                       "co2_pump_discharge_temperature", "co2_pump_discharge_enthalpy"}),
+    ("reactor", "co2_inflow_pressure", 80.0,
+     reactor_energy | {"co2_discharge_pressure", "slurry_discharge_pressure", "co2_pump_discharge_temperature",
+                       "co2_pump_discharge_enthalpy", "co2_evaporator_enthalpy", "calculate_power_imported"}),
+    ("drying", "dry_product_rate", 1.0,
+     {"calculate_total_dry_product_usage_per_hour", "calculate_energy_requirement_for_drying_per_day"}),
+])
+def test_set_value_recomputes_dependents_only(section, name, value, recomputed):
+    model = tem.TelcaEnergyModel()
+    _evaluate(model)
+    before = model.evaluations.copy()
+    assert set(model.dependents(section, name)) == recomputed
+
+    model.set_value(section, name, value)
+    result = _evaluate(model)
+    counts = model.evaluations - before
+    assert set(counts) == recomputed
+    # CoolProp nodes count one PropsSI call each; everything else is evaluated once
+    assert all(count == 1 for count in counts.values())
+
+    # Same values as a model built with the changed config
+    config = copy.deepcopy(tem.default_config)
+    config[section]["design_default_type"][name]["default"] = value
+    fresh = _evaluate(tem.TelcaEnergyModel(config))
+    assert result.keys() == fresh.keys()
+    for key in fresh:
+        assert result[key] == pytest.approx(fresh[key], rel=1e-12), key
+
+    # A second report is served from the cache
+    cached = model.evaluations.copy()
+    _evaluate(model)
+    assert model.evaluations == cached
+
+
+def test_changes_propagate_through_several_values():
+    model = tem.TelcaEnergyModel()
+    pump = model.calculate_co2_pump()
+    model.set_value("reactor", "co2_feed_rate", 2 * tem.default_config["reactor"]["design_default_type"]
+                    ["co2_feed_rate"]["default"])
+    assert model.calculate_co2_pump() == pytest.approx(2 * pump)
+    model.set_value("reactor", "co2_storage_temperature", -10.0)
+    model.set_value("reactor", "co2_storage_temperature", -20.0)
+    assert model.calculate_co2_pump() == pytest.approx(2 * pump)
+
+
+def test_input_types():
+    model = tem.TelcaEnergyModel()
+    default = model.calculate_co2_heater()
+    model.set_value("reactor", "co2_feed_rate", 500.0, input_type="minimum")
+    assert model.calculate_co2_heater() == default
+    assert model.calculate_co2_heater("minimum") == pytest.approx(default / 2)
+
+
+def test_hourly_matches_report():
+    model = tem.TelcaEnergyModel()
+    profile = {"co2_feed_rate": [1000.0, 500.0, 1000.0], "co2_storage_temperature": [-20.0, -20.0, -10.0]}
+    hourly = model.hourly(profile)
+    for k, (feed, temperature) in enumerate(zip(*profile.values())):
+        point = tem.TelcaEnergyModel()
+        point.set_value("reactor", "co2_feed_rate", feed)
+        point.set_value("reactor", "co2_storage_temperature", temperature)
+        report = point.energy_report()
+        np.testing.assert_allclose(hourly["co2_heater_kWh"].iloc[k], report["co2_heater_kW"], rtol=1e-12)
+        np.testing.assert_allclose(hourly["total_kWh"].iloc[k], report["total_kWh_per_day"] / 24, rtol=1e-12)
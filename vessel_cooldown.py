@@ -0,0 +1,225 @@
+"""
+Vessel Cool-Down Simulator
+
+Transient replacement for "CC cooldown guestimate.ipynb", which estimates the
+cooling time as Q_total / (h * A * dT_initial), i.e. with the initial
+temperature difference held for the whole cool-down, plus a separate
+back-of-envelope for the water evaporated between 175 and 100 °C.
+
+Lumped model: vessel steel and water contents at one temperature, losing heat
+to ambient by convection (h * A * (T - T_ambient)). Per phase the answer is a
+closed form, so no time stepping is needed:
+
+1. Flash (vented vessels above the boiling point only): the contents boil at
+   T_boil and the evaporation removes the sensible heat down to T_boil. With
+   C = M_vessel*c_vessel + m_water*c_water, dm*L = C*dT integrates to
+       C(T) = C0 * exp(c_water * (T - T0) / L)
+   which gives the water evaporated. If the water runs out first, the dry
+   vessel continues from the temperature at which it did. Without a vent rate
+   the flash is instantaneous; with one it lasts m_evaporated / vent_rate.
+2. Newton cooling below that point (or all the way for sealed vessels):
+       T(t) = T_amb + (T_start - T_amb) * exp(-h*A*t / C)
+       t_final = C / (h*A) * ln((T_start - T_amb) / (T_final - T_amb))
+   Evaporation below the boiling point is neglected.
+
+Reaching ambient exactly takes infinitely long, hence a T_final above T_ambient.
+
+Every input broadcasts, so a whole fleet of vessels times a set of h values is
+one array evaluation (see fleet_cooldown_table).
+
+Required packages:
+pip install numpy pandas
+"""
+
+import numpy as np
+
+
+# -----------------------------
+# Configuration Block
+# -----------------------------
+# Defaults: the small reactor of the notebook
+vessel = {
+    "radius": 0.075,  # m
+    "height": 0.2,  # m
+    "mass_vessel": 10,  # kg
+    "c_vessel": 500,  # J/kg·K (stainless steel)
+    "mass_water": 0.3,  # kg
+    "T_vessel_initial": 220,  # °C
+    "T_water_initial": 175,  # °C
+}
+
+cooldown_settings = {
+    "h": 5,  # W/m²·K, natural convection (50 for forced)
+    "T_ambient": 20,  # °C
+    "T_final": 40,  # °C, safe to handle
+    "vented": False,
+    "vent_rate_kg_per_s": None,  # None: flash is instantaneous
+    "c_water": 4180,  # J/kg·K
+    "L_evap": 2260e3,  # J/kg
+    "T_boil": 100,  # °C at the vent pressure
+}
+
+
+def surface_area(radius, height):
+    """Shell plus top and bottom, as in the notebook [m²]."""
+    return 2 * np.pi * radius * height + 2 * np.pi * radius**2
+
+
+# -----------------------------
+# Closed-form cool-down
+# -----------------------------
+def cooldown_times(**params):
+    """
+    Cool-down of lumped vessels; every parameter broadcasts against the others.
+
+    Parameters:
+    -----------
+    params :
+        Any key of vessel or cooldown_settings, scalars or arrays
+
+    Returns:
+    --------
+    DataFrame, one row per case: the inputs, T_start (mixed initial temperature),
+    water_evaporated_kg, flash_time_h, T_after_flash, time_to_final_h and
+    guestimate_h (the notebook's Q_total / (h*A*dT_initial) for comparison).
+    """
+    import pandas as pd
+
+    unknown = set(params) - set(vessel) - set(cooldown_settings)
+    if unknown:
+        raise KeyError(f"Unknown parameters: {sorted(unknown)}")
+    p = dict(vessel)
+    p.update(cooldown_settings)
+    p.update(params)
+    vent_rate = p.pop("vent_rate_kg_per_s")
+    keys = list(p)
+    arrays = np.broadcast_arrays(*(np.asarray(p[k], dtype=float) for k in keys))
+    a = {k: v.ravel() for k, v in zip(keys, arrays)}
+    vented = a["vented"].astype(bool)
+
+    C_vessel = a["mass_vessel"] * a["c_vessel"]
+    C_water = a["mass_water"] * a["c_water"]
+    C0 = C_vessel + C_water
+    T0 = (C_vessel * a["T_vessel_initial"] + C_water * a["T_water_initial"]) / C0
+    hA = a["h"] * surface_area(a["radius"], a["height"])
+
+    # Phase 1: flash to the boiling point
+    flashing = vented & (T0 > a["T_boil"])
+    T_flash_end = np.where(flashing, a["T_boil"], T0)
+    C1 = C0 * np.exp(a["c_water"] * (T_flash_end - T0) / a["L_evap"])
+    water_evaporated = (C0 - C1) / a["c_water"]
+    dry = water_evaporated > a["mass_water"]
+    with np.errstate(divide="ignore"):
+        T_dry = T0 + a["L_evap"] / a["c_water"] * np.log(C_vessel / C0)
+    T_after_flash = np.where(dry, T_dry, T_flash_end)
+    C_after_flash = np.where(dry, C_vessel, C1)
+    water_evaporated = np.where(dry, a["mass_water"], water_evaporated)
+    if vent_rate is None:
+        flash_time_s = np.zeros_like(T0)
+    else:
+        flash_time_s = water_evaporated / np.asarray(vent_rate, dtype=float)
+
+    # Phase 2: Newton cooling
+    excess = T_after_flash - a["T_ambient"]
+    target_excess = a["T_final"] - a["T_ambient"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        newton_s = C_after_flash / hA * np.log(excess / target_excess)
+    newton_s = np.where(T_after_flash <= a["T_final"], 0.0, newton_s)
+    newton_s = np.where((target_excess <= 0) & (T_after_flash > a["T_final"]), np.inf, newton_s)
+
+    # Notebook estimate: all heat removed at the initial temperature difference
+    Q_total = C0 * (T0 - a["T_final"])
+    guestimate_s = Q_total / (hA * (T0 - a["T_ambient"]))
+
+    result = pd.DataFrame({k: v for k, v in a.items()})
+    result["vented"] = vented
+    result["vent_rate_kg_per_s"] = np.nan if vent_rate is None else vent_rate
+    result["T_start"] = T0
+    result["water_evaporated_kg"] = water_evaporated
+    result["flash_time_h"] = flash_time_s / 3600
+    result["T_after_flash"] = T_after_flash
+    result["time_constant_h"] = C_after_flash / hA / 3600
+    result["time_to_final_h"] = (flash_time_s + newton_s) / 3600
+    result["guestimate_h"] = guestimate_s / 3600
+    return result
+
+
+def temperature_curves(result, t_h):
+    """
+    Temperature [°C] of every case in a cooldown_times() result at times t_h [h].
+
+    During a flash with finite vent rate the temperature is taken to fall
+    linearly to T_after_flash. Returns a DataFrame indexed by time, one column per case.
+    """
+    import pandas as pd
+
+    t = np.asarray(t_h, dtype=float)[:, None]
+    T_start = result["T_start"].to_numpy()[None, :]
+    T_after = result["T_after_flash"].to_numpy()[None, :]
+    t_flash = result["flash_time_h"].to_numpy()[None, :]
+    tau = result["time_constant_h"].to_numpy()[None, :]
+    T_amb = result["T_ambient"].to_numpy()[None, :]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        in_flash = np.clip(t / t_flash, 0.0, 1.0)
+    in_flash = np.where(t_flash > 0, in_flash, 1.0)
+    T_flash = T_start + (T_after - T_start) * in_flash
+    T_newton = T_amb + (T_after - T_amb) * np.exp(-np.maximum(t - t_flash, 0.0) / tau)
+    T = np.where(t < t_flash, T_flash, T_newton)
+    return pd.DataFrame(T, index=pd.Index(np.ravel(t_h), name="time_h"))
+
+
+def fleet_cooldown_table(fleet, h_values, **params):
+    """
+    Cool-down times for every vessel of a fleet at every heat transfer coefficient.
+
+    fleet is a DataFrame with a name column and any vessel keys (radius, height,
+    mass_vessel, ...); missing keys take the defaults. Returns one row per
+    (vessel, h) with time_to_final_h, in a single vectorized evaluation.
+    """
+    h_values = np.asarray(h_values, dtype=float)
+    columns = [c for c in fleet.columns if c in vessel or c in cooldown_settings]
+    expanded = {c: np.repeat(fleet[c].to_numpy(), h_values.size) for c in columns}
+    expanded["h"] = np.tile(h_values, len(fleet))
+    expanded.update(params)
+    result = cooldown_times(**expanded)
+    result.insert(0, "name", np.repeat(fleet["name"].to_numpy(), h_values.size))
+    return result
+
+
+def main(argv=None):
+    """Command line entry point (vessel-cooldown): cooldown_times with --set overrides."""
+    import model_cli
+
+    return model_cli.run(cooldown_times, "Vessel cool-down times", argv)
+
+
+if __name__ == "__main__":
+    # The notebook's cases: natural and forced convection, sealed and vented
+    result = cooldown_times(h=[5, 50, 5, 50], vented=[False, False, True, True])
+    print(result[["h", "vented", "T_start", "water_evaporated_kg", "T_after_flash",
+                  "time_to_final_h", "guestimate_h"]].round(3).to_string(index=False))
+
+    curves = temperature_curves(result, np.linspace(0, 24, 7))
+    print("\nTemperature (°C) over time:")
+    print(curves.round(1).to_string())
+
+    # Fleet table: 1000 vessels x 4 h values in one call
+    import time
+
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    n = 1000
+    fleet = pd.DataFrame({
+        "name": [f"R{i:04d}" for i in range(n)],
+        "radius": rng.uniform(0.05, 0.8, n),
+        "height": rng.uniform(0.2, 2.5, n),
+        "mass_vessel": rng.uniform(10, 3000, n),
+        "mass_water": rng.uniform(0.3, 500, n),
+    })
+    start = time.perf_counter()
+    table = fleet_cooldown_table(fleet, [5, 10, 25, 50], vented=True, T_vessel_initial=175)
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(table)} fleet cool-downs in {elapsed * 1000:.1f} ms")
+    print(table.pivot(index="name", columns="h", values="time_to_final_h").head().round(2).to_string())